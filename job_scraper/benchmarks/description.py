@@ -0,0 +1,88 @@
+"""Compare description extraction: selector-and-join against the lxml walk.
+
+Builds Greenhouse detail pages with large synthetic descriptions and extracts
+the description from each one with the old approach (select every text node
+under the description element and join them with spaces) and with
+normalize_description, reporting time per page and peak traced allocation.
+
+Run from the directory containing scrapy.cfg:
+
+    python -m benchmarks.description
+    python -m benchmarks.description --paragraphs 200 --pages 50
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from scrapy.http import HtmlResponse
+
+from job_scraper.htmltext import normalize_description
+
+from . import synthetic
+
+
+def selector_join(response):
+    parts = response.css('.job__description *::text').getall()
+    return ' '.join(part.strip() for part in parts if part.strip())
+
+
+def lxml_walk(response):
+    return normalize_description(response.css('.job__description'))
+
+
+def pages(count, paragraphs):
+    rng = random.Random(0)
+    responses = []
+    for index in range(count):
+        job = {
+            'title': 'Senior Software Engineer',
+            'location': {'name': 'Remote'},
+            'content': synthetic.description_html(rng, paragraphs) + "<h3>Requirements</h3><ul><li>Python</li></ul>",
+        }
+        url = f"https://job-boards.greenhouse.io/acme/jobs/{index}"
+        body = synthetic.greenhouse_detail_html(job).encode('utf-8')
+        responses.append(HtmlResponse(url=url, body=body, encoding='utf-8'))
+    return responses
+
+
+def measure(extract, responses):
+    # Parse the documents first so only the extraction is measured
+    for response in responses:
+        response.selector
+    started = time.perf_counter()
+    for response in responses:
+        extract(response)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for response in responses:
+        extract(response)
+        peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed / len(responses), peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=100)
+    parser.add_argument('--paragraphs', type=int, default=100, help='description length in paragraphs')
+    args = parser.parse_args(argv)
+
+    responses = pages(args.pages, args.paragraphs)
+    size = sum(len(response.body) for response in responses) / len(responses)
+    print(f"{args.pages} pages of {size / 1024:.0f} KB")
+
+    results = {}
+    for name, extract in (('selector-and-join', selector_join), ('lxml walk', lxml_walk)):
+        seconds, peak = measure(extract, responses)
+        results[name] = seconds
+        print(f"{name:<18} {seconds * 1000:8.2f} ms/page  peak {peak / 1024:8.0f} KB")
+    print(f"lxml walk takes {results['lxml walk'] / results['selector-and-join']:.0%} of the selector time")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
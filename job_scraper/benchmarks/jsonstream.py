@@ -0,0 +1,113 @@
+"""Compare streaming and whole-document decoding of large board API payloads.
+
+Builds Lever postings, Greenhouse board and Getro collection API payloads of
+10k postings each with benchmarks.synthetic, then reads every posting once
+with json.loads, as response.json() does, and once with iter_json_items and
+the spider's field list. Reports the time to the first posting, the total
+time and the peak memory allocated while reading, which for the streaming
+reader should stay near the size of one posting rather than the board.
+
+Run from the directory containing scrapy.cfg:
+
+    python -m benchmarks.jsonstream
+    python -m benchmarks.jsonstream --count 50000 --repeat 5
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from job_scraper.jsonstream import iter_json_items
+from job_scraper.spiders.getro_scraper import GetroJobsSpider
+from job_scraper.spiders.greenhouse_scraper import GreenhouseJobsSpider
+from job_scraper.spiders.lever_scraper import LeverJobsSpider
+
+from . import synthetic
+
+
+def payloads(count):
+    """(name, body, path to the postings, fields the spider reads) per API"""
+    return [
+        ('lever', json.dumps(synthetic.lever_postings(count)).encode('utf-8'),
+         (), LeverJobsSpider.POSTING_FIELDS),
+        ('greenhouse', json.dumps(synthetic.greenhouse_jobs(count)).encode('utf-8'),
+         ('jobs',), GreenhouseJobsSpider.JOB_FIELDS),
+        ('getro', json.dumps(synthetic.getro_api_page(synthetic.getro_jobs(count, camel_case=False))).encode('utf-8'),
+         ('results', 'jobs'), GetroJobsSpider.API_JOB_FIELDS),
+    ]
+
+
+def whole(body, path, fields):
+    document = json.loads(body)
+    for key in path:
+        document = document[key]
+    yield from document
+
+
+def streamed(body, path, fields):
+    return iter_json_items(body, path, fields)
+
+
+def timed(read, body, path, fields):
+    """(seconds to the first posting, seconds for all, postings)"""
+    started = time.perf_counter()
+    first = None
+    count = 0
+    for _ in read(body, path, fields):
+        if first is None:
+            first = time.perf_counter() - started
+        count += 1
+    return first, time.perf_counter() - started, count
+
+
+def peak_memory(read, body, path, fields):
+    """Peak bytes allocated while reading every posting, the body excluded"""
+    tracemalloc.start()
+    try:
+        for _ in read(body, path, fields):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=10000, help='postings per payload')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per reader, best kept')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, body, path, fields in payloads(args.count):
+        result = {'postings': args.count, 'body_bytes': len(body)}
+        for reader, read in (('json_loads', whole), ('streaming', streamed)):
+            runs = [timed(read, body, path, fields) for _ in range(args.repeat)]
+            first, total, count = min(runs, key=lambda run: run[1])
+            if count != args.count:
+                raise AssertionError(f"{name} {reader} read {count} of {args.count} postings")
+            result[reader] = {
+                'first_posting_ms': first * 1000,
+                'total_ms': total * 1000,
+                'postings_per_sec': count / total,
+                'peak_bytes': peak_memory(read, body, path, fields),
+            }
+        results[name] = result
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for name, result in results.items():
+        print(f"{name}: {result['postings']} postings, {result['body_bytes'] / 1e6:.1f} MB")
+        for reader in ('json_loads', 'streaming'):
+            stats = result[reader]
+            print(f"  {reader:<10}  first posting {stats['first_posting_ms']:8.2f} ms  "
+                  f"all {stats['total_ms']:8.1f} ms  {stats['postings_per_sec']:9.0f} postings/s  "
+                  f"peak {stats['peak_bytes'] / 1024:9.0f} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""End-to-end load test of the spiders against the local mock ATS server.
+
+Starts benchmarks.mockats on a free local port, then runs real `scrapy crawl`
+processes for LeverJobsSpider, GreenhouseJobsSpider and GetroJobsSpider with
+HostOverrideDownloadHandler sending every host to the mock server. Unlike
+benchmarks.replay this exercises the whole stack: scheduler, downloader,
+middlewares, retries, pipelines and the reactor. Reports requests/sec,
+items/sec, download latency percentiles and response statuses per spider,
+and writes a JSON report to benchmarks/results.
+
+Needs aiohttp for the mock server. Run from the directory containing scrapy.cfg:
+
+    python -m benchmarks.load
+    python -m benchmarks.load --board-size 2000 --latency lognormal:80:0.6 --error-rate 0.02
+    python -m benchmarks.load --spiders getro -s CONCURRENT_REQUESTS=64
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+import scrapy
+from scrapy.utils.project import get_project_settings
+
+from job_scraper.instrumentation import SECONDS_BUCKETS, Histogram
+from job_scraper.runner import parse_setting
+
+from .replay import RESULTS_DIR
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Spider and arguments per scenario; every host they reach is served by the mock server
+SCENARIOS = {
+    'lever': ('lever_jobs', {'company': 'acme', 'mode': 'html'}),
+    'greenhouse': ('greenhouse_jobs', {'company': 'acme', 'mode': 'html'}),
+    'getro': ('getro_jobs', {'company': 'acme', 'domain': 'acme.example'}),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, args):
+    command = [
+        sys.executable, '-m', 'benchmarks.mockats', '--port', str(port),
+        '--board-size', str(args.board_size), '--latency', args.latency,
+        '--error-rate', str(args.error_rate), '--throttle-rate', str(args.throttle_rate),
+        '--host-rate', str(args.host_rate),
+    ]
+    server = subprocess.Popen(command, cwd=PROJECT_DIR, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"mock server exited with status {server.returncode}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("mock server did not start listening within 15 seconds")
+
+
+def server_stats(port):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/__stats", timeout=5) as response:
+        return json.load(response)
+
+
+def crawl_settings(port, work_dir, overrides):
+    """Settings for a crawl against the mock server, on top of the project settings"""
+    settings = get_project_settings()
+    for name, value in overrides:
+        settings.set(name, value, priority='cmdline')
+
+    handler = 'job_scraper.handlers.HostOverrideDownloadHandler'
+    extensions = settings.getdict('EXTENSIONS')
+    extensions['job_scraper.extensions.StatsFileExtension'] = 0
+    downloader_middlewares = settings.getdict('DOWNLOADER_MIDDLEWARES')
+    downloader_middlewares.setdefault('job_scraper.middlewares.TimingDownloaderMiddleware', 950)
+    return [
+        ('HOST_OVERRIDES', json.dumps({'*': f"127.0.0.1:{port}"})),
+        ('DOWNLOAD_HANDLERS', json.dumps({'http': handler, 'https': handler})),
+        ('EXTENSIONS', json.dumps(extensions)),
+        ('DOWNLOADER_MIDDLEWARES', json.dumps(downloader_middlewares)),
+        ('TIMING_ENABLED', 'True'),
+        ('TIMING_REPORT_PATH', os.path.join(work_dir, 'timing.json')),
+        ('STATS_FILE', os.path.join(work_dir, 'stats.json')),
+        # Rates learned from the mock server must not replace the real hosts' state
+        ('THROTTLE_STATE_PATH', os.path.join(work_dir, 'throttle-state.json')),
+        ('LOG_LEVEL', 'WARNING'),
+        *overrides,
+    ]
+
+
+def latency_summary(timing):
+    """Download latency percentiles in ms over every host and callback"""
+    merged = Histogram(SECONDS_BUCKETS)
+    for entry in timing['metrics'].get('download_latency_seconds', []):
+        if not entry['count']:
+            continue
+        for index, count in enumerate(entry['buckets'].values()):
+            merged.counts[index] += count
+        merged.count += entry['count']
+        merged.sum += entry['sum']
+        merged.min = entry['min'] if merged.min is None else min(merged.min, entry['min'])
+        merged.max = entry['max'] if merged.max is None else max(merged.max, entry['max'])
+    if not merged.count:
+        return {'p50': None, 'p90': None, 'p99': None, 'max': None}
+    return {
+        'p50': merged.quantile(0.50) * 1000,
+        'p90': merged.quantile(0.90) * 1000,
+        'p99': merged.quantile(0.99) * 1000,
+        'max': merged.max * 1000,
+    }
+
+
+def run_scenario(name, port, overrides):
+    spider, spider_args = SCENARIOS[name]
+    with tempfile.TemporaryDirectory() as work_dir:
+        command = [sys.executable, '-m', 'scrapy', 'crawl', spider]
+        for arg, value in spider_args.items():
+            command += ['-a', f"{arg}={value}"]
+        for setting, value in crawl_settings(port, work_dir, overrides):
+            command += ['-s', f"{setting}={value}"]
+
+        started = time.perf_counter()
+        subprocess.run(command, cwd=PROJECT_DIR, check=True)
+        wall = time.perf_counter() - started
+
+        with open(os.path.join(work_dir, 'stats.json'), encoding='utf-8') as f:
+            stats = json.load(f)
+        with open(os.path.join(work_dir, 'timing.json'), encoding='utf-8') as f:
+            timing = json.load(f)
+
+    # Crawl time without interpreter start-up and project loading
+    elapsed = stats.get('elapsed_time_seconds') or wall
+    requests = stats.get('downloader/request_count', 0)
+    items = stats.get('item_scraped_count', 0)
+    prefix = 'downloader/response_status_count/'
+    return {
+        'spider': spider,
+        'elapsed_seconds': elapsed,
+        'wall_seconds': wall,
+        'requests': requests,
+        'items': items,
+        'requests_per_sec': requests / elapsed if elapsed else None,
+        'items_per_sec': items / elapsed if elapsed else None,
+        'retries': stats.get('retry/count', 0),
+        'statuses': {key[len(prefix):]: value for key, value in stats.items() if key.startswith(prefix)},
+        'download_latency_ms': latency_summary(timing),
+        'finish_reason': stats.get('finish_reason'),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--spiders', default=','.join(SCENARIOS),
+                        help=f"comma-separated scenarios out of {', '.join(SCENARIOS)}")
+    parser.add_argument('--board-size', type=int, default=500, help='jobs per mock board')
+    parser.add_argument('--latency', default='uniform:5:20',
+                        help='mock response delay: none, fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of mock responses failing with 5xx')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of mock responses failing with 429')
+    parser.add_argument('--host-rate', type=int, default=0, help='mock requests per second per host before 429s')
+    parser.add_argument('-s', '--set', dest='settings', type=parse_setting, action='append', default=[],
+                        metavar='NAME=VALUE', help='setting passed to every crawl')
+    parser.add_argument('--output', help='where to write the JSON report')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.spiders.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario {', '.join(unknown)}")
+
+    port = free_port()
+    server = start_server(port, args)
+    try:
+        results = {}
+        for name in names:
+            results[name] = run_scenario(name, port, args.settings)
+            if not args.json:
+                result = results[name]
+                latency = result['download_latency_ms']
+                print(
+                    f"{name:<12} {result['requests']:>7} requests {result['requests_per_sec']:>8.1f}/s  "
+                    f"{result['items']:>7} items {result['items_per_sec']:>8.1f}/s  "
+                    f"p50 {latency['p50'] or 0:>7.1f} ms  p99 {latency['p99'] or 0:>7.1f} ms  "
+                    f"retries {result['retries']}"
+                )
+        mock = server_stats(port)
+    finally:
+        server.terminate()
+        server.wait()
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'scrapy': scrapy.__version__,
+        'mock': {
+            'board_size': args.board_size,
+            'latency': args.latency,
+            'error_rate': args.error_rate,
+            'throttle_rate': args.throttle_rate,
+            'host_rate': args.host_rate,
+            'stats': mock['stats'],
+        },
+        'settings': dict(args.settings),
+        'scenarios': results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{datetime.now().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"\nMock server handled {mock['stats'].get('requests', 0)} requests, report written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
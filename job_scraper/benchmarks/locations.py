@@ -0,0 +1,111 @@
+"""Time location normalization with and without the LRU cache.
+
+Builds a few thousand distinct location strings in the shapes ATS boards use
+("Austin, TX", "Remote - US", "London or Berlin", "Toronto, ON, Canada"),
+draws postings from them with a skewed distribution, as real crawls repeat a
+small set of locations, and reports microseconds per posting for the
+gazetteer lookups alone and behind the cache, plus the index size and the
+time to compile and map it.
+
+Run from the directory containing scrapy.cfg:
+
+    python -m benchmarks.locations
+    python -m benchmarks.locations --count 500000 --distinct 5000
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from job_scraper.gazetteer import SOURCE_PATH, Gazetteer
+from job_scraper.locations import LocationNormalizer
+
+
+def location_strings(distinct, seed=0):
+    """Distinct location strings built from the gazetteer's cities and countries"""
+    with open(SOURCE_PATH, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    cities = [row for row in rows if row['kind'] == 'city']
+    countries = {row['code']: row['name'] for row in rows if row['kind'] == 'country'}
+
+    rng = random.Random(seed)
+    shapes = [
+        lambda c: f"{c['name']}, {c['region'] or c['country']}",
+        lambda c: f"{c['name']}, {countries.get(c['country'], c['country'])}",
+        lambda c: f"Remote - {c['country']}",
+        lambda c: f"{c['name']} or {rng.choice(cities)['name']}",
+        lambda c: f"Hybrid - {c['name']}",
+        lambda c: f"{c['name']}, {c['region'] or c['country']}; Remote",
+        lambda c: f"{c['name']} Office {rng.randint(1, 40)}",
+    ]
+    strings = set()
+    while len(strings) < distinct:
+        strings.add(rng.choice(shapes)(rng.choice(cities)))
+    return sorted(strings)
+
+
+def run(normalizer, postings):
+    started = time.perf_counter()
+    resolved = 0
+    for text in postings:
+        if normalizer.parse(text).locations:
+            resolved += 1
+    return time.perf_counter() - started, resolved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=200000, help='postings to normalize')
+    parser.add_argument('--distinct', type=int, default=3000, help='distinct location strings')
+    parser.add_argument('--cache-size', type=int, default=4096, help='LRU cache entries')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args(argv)
+
+    strings = location_strings(args.distinct)
+    rng = random.Random(1)
+    # Zipf-like: a few locations account for most postings
+    weights = [1 / (rank + 1) for rank in range(len(strings))]
+    postings = rng.choices(strings, weights=weights, k=args.count)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index_path = os.path.join(directory, 'gazetteer.idx')
+        started = time.perf_counter()
+        gazetteer = Gazetteer(index_path)
+        gazetteer.lookup('berlin')
+        open_seconds = time.perf_counter() - started
+
+        uncached, resolved = run(LocationNormalizer(gazetteer, cache_size=0), postings)
+        cached_normalizer = LocationNormalizer(gazetteer, cache_size=args.cache_size)
+        cached, _ = run(cached_normalizer, postings)
+        info = cached_normalizer.parse.cache_info()
+        results = {
+            'postings': args.count,
+            'distinct': len(strings),
+            'resolved': resolved / args.count,
+            'index_bytes': os.path.getsize(index_path),
+            'compile_and_open_ms': open_seconds * 1000,
+            'uncached_us': uncached / args.count * 1e6,
+            'cached_us': cached / args.count * 1e6,
+            'cache_hit_rate': info.hits / (info.hits + info.misses),
+        }
+        gazetteer.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{results['postings']} postings, {results['distinct']} distinct locations, "
+          f"{results['resolved']:.1%} resolved")
+    print(f"index {results['index_bytes'] / 1024:.1f} KB, compiled and mapped in "
+          f"{results['compile_and_open_ms']:.1f} ms")
+    print(f"gazetteer only {results['uncached_us']:7.1f} us/posting")
+    print(f"with LRU cache {results['cached_us']:7.1f} us/posting  ({results['cache_hit_rate']:.1%} hits)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
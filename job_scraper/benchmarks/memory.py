@@ -0,0 +1,111 @@
+"""Compare the memory footprint of JobItem and LeanJobItem.
+
+Builds the same synthetic Lever postings as both item types, from freshly
+decoded JSON so equal values are separate string objects as they are when
+parsed from real pages, and reports traced bytes per item, build time (with
+tracing on, so only comparable between the two) and JSON lines export time.
+
+Run from the directory containing scrapy.cfg:
+
+    python -m benchmarks.memory
+    python -m benchmarks.memory --count 200000 --paragraphs 1
+"""
+
+import argparse
+import gc
+import io
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from scrapy.exporters import JsonLinesItemExporter
+
+from job_scraper.items import JobItem, LeanJobItem
+
+from . import synthetic
+
+# Postings decoded and converted at a time, so the decoded JSON never dominates
+CHUNK = 5000
+
+
+def records_json(count, paragraphs, companies):
+    """JSON-encoded chunks of item field dicts, spread over a few companies"""
+    chunks = []
+    for start in range(0, count, CHUNK):
+        size = min(CHUNK, count - start)
+        company = f"company-{start // CHUNK % companies}"
+        records = []
+        for posting in synthetic.lever_postings(size, company=company, seed=start, paragraphs=paragraphs):
+            categories = posting['categories']
+            records.append({
+                'title': posting['text'],
+                'employment_type': categories['commitment'],
+                'workplace_type': posting['workplaceType'],
+                'location': categories['location'],
+                'department': categories['department'],
+                'url': posting['hostedUrl'],
+                'description': posting['descriptionPlain'],
+                'requirements': '',
+                'company': company,
+                'source': 'lever',
+            })
+        chunks.append(json.dumps(records))
+    return chunks
+
+
+def measure(item_cls, chunks):
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+
+    items = []
+    for chunk in chunks:
+        for record in json.loads(chunk):
+            items.append(item_cls(scraped_at=datetime.now().isoformat(), **record))
+
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    exporter = JsonLinesItemExporter(io.BytesIO())
+    for item in items:
+        exporter.export_item(item)
+    export_elapsed = time.perf_counter() - started
+    return {
+        'items': len(items),
+        'bytes_per_item': size / len(items),
+        'total_mb': size / 1024 / 1024,
+        'build_seconds': elapsed,
+        'export_seconds': export_elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000, help='items of each type to build')
+    parser.add_argument('--paragraphs', type=int, default=2, help='description length in paragraphs')
+    parser.add_argument('--companies', type=int, default=20, help='distinct company names')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args(argv)
+
+    chunks = records_json(args.count, args.paragraphs, args.companies)
+    results = {item_cls.__name__: measure(item_cls, chunks) for item_cls in (JobItem, LeanJobItem)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for name, result in results.items():
+        print(f"{name:<12} {result['bytes_per_item']:8.0f} B/item  {result['total_mb']:8.1f} MB  "
+              f"build {result['build_seconds']:6.2f} s  export {result['export_seconds']:6.2f} s")
+    saved = 1 - results['LeanJobItem']['bytes_per_item'] / results['JobItem']['bytes_per_item']
+    print(f"LeanJobItem uses {saved:.0%} less memory per item")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
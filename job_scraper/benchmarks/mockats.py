@@ -0,0 +1,309 @@
+"""Local mock ATS server for end-to-end crawl and load tests.
+
+Serves synthetic Lever, Greenhouse and Getro boards, job pages and JSON APIs
+built by benchmarks.synthetic, so the spiders' selectors and JSON lookups
+behave as they do against the real hosts. Requests are routed on their Host
+header, so point the spiders at it with HostOverrideDownloadHandler and
+HOST_OVERRIDES = {"*": "127.0.0.1:8700"}:
+
+    api.lever.co              /v0/postings/{company}[?mode=json]
+    jobs.lever.co             /{company}/{posting id}
+    boards-api.greenhouse.io  /v1/boards/{company}/jobs
+    job-boards.greenhouse.io  /{company} and /{company}/jobs/{job id}
+    api.getro.com             POST /api/v2/collections/{network id}/search/jobs
+    any other host            Getro board: /jobs and /companies/{org}/jobs/{slug}
+
+Every board has --board-size jobs. Job pages for ids that are not on a board,
+like the apply links of Getro jobs, are generated from the id. Responses are
+delayed by a latency distribution, a share of them fail with 429 or 5xx, and
+bodies carry ETags, answering If-None-Match with 304. GET /__stats on any host
+returns the request counts as JSON.
+
+Needs aiohttp. Run from the directory containing scrapy.cfg:
+
+    python -m benchmarks.mockats --port 8700
+    python -m benchmarks.mockats --board-size 2000 --latency lognormal:80:0.6 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import sys
+import time
+import zlib
+from collections import Counter, deque
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+from . import synthetic
+
+ERROR_STATUSES = (500, 502, 503)
+
+
+class Latency:
+    """Response delay distribution: "none", "fixed:MS", "uniform:LOW_MS:HIGH_MS" or "lognormal:MEDIAN_MS:SIGMA" """
+
+    def __init__(self, spec):
+        name, *params = spec.split(':')
+        try:
+            params = [float(param) for param in params]
+        except ValueError:
+            raise ValueError(f"Bad latency {spec!r}") from None
+        expected = {'none': 0, 'fixed': 1, 'uniform': 2, 'lognormal': 2}
+        if expected.get(name) != len(params):
+            raise ValueError(f"Bad latency {spec!r}, expected none, fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+        self.spec = spec
+        self.name = name
+        self.params = params
+
+    def sample(self, rng):
+        """Delay in seconds"""
+        if self.name == 'fixed':
+            return self.params[0] / 1000
+        if self.name == 'uniform':
+            return rng.uniform(*self.params) / 1000
+        if self.name == 'lognormal':
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma) / 1000
+        return 0.0
+
+
+def seed_for(*parts):
+    return zlib.crc32('/'.join(map(str, parts)).encode('utf-8'))
+
+
+class MockATS:
+    """Synthetic boards, rendered lazily and kept for the life of the server"""
+
+    def __init__(self, board_size=100, latency='none', error_rate=0.0, throttle_rate=0.0, retry_after=1,
+                 host_rate=0, paragraphs=4, seed=0):
+        self.board_size = board_size
+        self.latency = Latency(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.host_rate = host_rate
+        self.paragraphs = paragraphs
+        self.rng = random.Random(seed)
+        # (host, path, query, POST payload) -> (status, content type, body, etag)
+        self.responses = {}
+        self.lever_boards = {}
+        self.greenhouse_boards = {}
+        # company -> job id -> job
+        self.greenhouse_jobs = {}
+        self.getro_boards = {}
+        # Getro network id -> board host
+        self.getro_networks = {}
+        # host -> times of recent requests, for --host-rate
+        self.recent = {}
+        self.stats = Counter()
+        self.hosts = Counter()
+        self.started = time.time()
+
+    # Boards
+
+    def lever_board(self, company):
+        board = self.lever_boards.get(company)
+        if board is None:
+            postings = synthetic.lever_postings(
+                self.board_size, company=company, seed=seed_for('lever', company), paragraphs=self.paragraphs
+            )
+            board = self.lever_boards[company] = {posting['id']: posting for posting in postings}
+        return board
+
+    def lever_posting(self, company, posting_id):
+        # Apply links from Getro boards point at companies whose board is never listed
+        posting = self.lever_boards.get(company, {}).get(posting_id)
+        if posting is None:
+            posting = synthetic.lever_postings(1, company=company, seed=seed_for(company, posting_id),
+                                               paragraphs=self.paragraphs)[0]
+            posting.update(id=posting_id, hostedUrl=f"https://jobs.lever.co/{company}/{posting_id}")
+        return posting
+
+    def greenhouse_board(self, company):
+        board = self.greenhouse_boards.get(company)
+        if board is None:
+            board = self.greenhouse_boards[company] = synthetic.greenhouse_jobs(
+                self.board_size, company=company, seed=seed_for('greenhouse', company), paragraphs=self.paragraphs
+            )
+            self.greenhouse_jobs[company] = {str(job['id']): job for job in board['jobs']}
+        return board
+
+    def greenhouse_job(self, company, job_id):
+        job = self.greenhouse_jobs.get(company, {}).get(job_id)
+        if job is None:
+            job = synthetic.greenhouse_jobs(1, company=company, seed=seed_for(company, job_id),
+                                            paragraphs=self.paragraphs)['jobs'][0]
+            job.update(id=int(job_id), absolute_url=f"https://job-boards.greenhouse.io/{company}/jobs/{job_id}")
+        return job
+
+    def getro_board(self, host):
+        board = self.getro_boards.get(host)
+        if board is None:
+            network_id = seed_for('getro', host) % 100000
+            seed = seed_for('getro', host)
+            board = self.getro_boards[host] = {
+                'network_id': network_id,
+                # The embedded board state is camelCase, the collection API snake_case
+                'jobs': synthetic.getro_jobs(self.board_size, seed=seed),
+                'api_jobs': synthetic.getro_jobs(self.board_size, seed=seed, camel_case=False),
+            }
+            board['by_slug'] = {job['slug']: job for job in board['jobs']}
+            self.getro_networks[network_id] = host
+        return board
+
+    # Routes; each returns (status, content type, body)
+
+    def route(self, host, path, query, payload):
+        parts = [part for part in path.split('/') if part]
+        if host == 'api.lever.co' and len(parts) == 3 and parts[:2] == ['v0', 'postings']:
+            postings = list(self.lever_board(parts[2]).values())
+            if query.get('mode') == 'json':
+                return 200, 'application/json', json.dumps(postings)
+            return 200, 'text/html', synthetic.lever_list_html(postings)
+        if host == 'jobs.lever.co' and len(parts) == 2:
+            return 200, 'text/html', synthetic.lever_detail_html(self.lever_posting(*parts))
+
+        if host == 'boards-api.greenhouse.io' and len(parts) == 4 and parts[0:2] == ['v1', 'boards']:
+            return 200, 'application/json', json.dumps(self.greenhouse_board(parts[2]))
+        if host == 'job-boards.greenhouse.io':
+            if len(parts) == 1:
+                return 200, 'text/html', synthetic.greenhouse_board_html(self.greenhouse_board(parts[0]))
+            if len(parts) == 3 and parts[1] == 'jobs' and parts[2].isdigit():
+                return 200, 'text/html', synthetic.greenhouse_detail_html(self.greenhouse_job(parts[0], parts[2]))
+
+        if host == 'api.getro.com' and len(parts) == 6 and parts[-2:] == ['search', 'jobs']:
+            board_host = self.getro_networks.get(int(parts[3]) if parts[3].isdigit() else None)
+            if board_host is None:
+                return 404, 'application/json', json.dumps({'error': 'unknown collection'})
+            size = int(payload.get('hitsPerPage') or 20)
+            page = int(payload.get('page') or 0)
+            jobs = self.getro_board(board_host)['api_jobs'][page * size:(page + 1) * size]
+            return 200, 'application/json', json.dumps(synthetic.getro_api_page(jobs))
+        if parts == ['jobs']:
+            board = self.getro_board(host)
+            # The first page is embedded, the rest comes from the collection API
+            jobs = board['jobs'][:100]
+            html = synthetic.getro_board_html(jobs, total=len(board['jobs']), network_id=board['network_id'])
+            return 200, 'text/html', html
+        if len(parts) == 4 and parts[0] == 'companies' and parts[2] == 'jobs':
+            job = self.getro_board(host)['by_slug'].get(parts[3])
+            if job is not None:
+                return 200, 'text/html', synthetic.getro_detail_html(job, seed=job['id'], paragraphs=self.paragraphs)
+
+        return 404, 'text/html', '<html><body>Not found</body></html>'
+
+    def response_for(self, host, path, query, payload):
+        # POST bodies select the page, so they are part of the cache key
+        key = (host, path, tuple(sorted(query.items())), json.dumps(payload, sort_keys=True))
+        cached = self.responses.get(key)
+        if cached is None:
+            status, content_type, body = self.route(host, path, query, payload)
+            body = body.encode('utf-8')
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            cached = self.responses[key] = (status, content_type, body, etag)
+        return cached
+
+    def fault(self, host):
+        """An injected failure response, or None"""
+        if self.host_rate:
+            now = time.monotonic()
+            recent = self.recent.setdefault(host, deque())
+            while recent and now - recent[0] > 1.0:
+                recent.popleft()
+            if len(recent) >= self.host_rate:
+                self.stats['rate_limited'] += 1
+                return web.Response(status=429, headers={'Retry-After': str(self.retry_after)})
+            recent.append(now)
+        roll = self.rng.random()
+        if roll < self.throttle_rate:
+            self.stats['injected_429'] += 1
+            return web.Response(status=429, headers={'Retry-After': str(self.retry_after)})
+        if roll < self.throttle_rate + self.error_rate:
+            self.stats['injected_5xx'] += 1
+            return web.Response(status=self.rng.choice(ERROR_STATUSES))
+        return None
+
+    async def handle(self, request):
+        if request.path == '/__stats':
+            return web.json_response(self.report())
+
+        host = request.host.split(':')[0].lower()
+        self.stats['requests'] += 1
+        self.hosts[host] += 1
+        delay = self.latency.sample(self.rng)
+        if delay:
+            await asyncio.sleep(delay)
+
+        response = self.fault(host)
+        if response is None:
+            payload = {}
+            if request.can_read_body:
+                try:
+                    payload = await request.json()
+                except ValueError:
+                    payload = {}
+            status, content_type, body, etag = self.response_for(host, request.path, dict(request.query), payload)
+            if status == 200 and etag in request.headers.get('If-None-Match', ''):
+                self.stats['not_modified'] += 1
+                response = web.Response(status=304, headers={'ETag': etag})
+            else:
+                response = web.Response(status=status, body=body, content_type=content_type,
+                                        headers={'ETag': etag} if status == 200 else None)
+        self.stats[f'status_{response.status}'] += 1
+        return response
+
+    def report(self):
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'board_size': self.board_size,
+            'latency': self.latency.spec,
+            'stats': dict(self.stats),
+            'hosts': dict(self.hosts),
+        }
+
+    def app(self):
+        app = web.Application()
+        app.router.add_route('*', '/{path:.*}', self.handle)
+        return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1', help='interface to listen on')
+    parser.add_argument('--port', type=int, default=8700, help='port to listen on')
+    parser.add_argument('--board-size', type=int, default=100, help='jobs per board')
+    parser.add_argument('--paragraphs', type=int, default=4, help='description length in paragraphs')
+    parser.add_argument('--latency', default='none',
+                        help='response delay: none, fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of responses failing with 5xx')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of responses failing with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--host-rate', type=int, default=0,
+                        help='requests per second per host before answering 429 (0 for no limit)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for latency and failure injection')
+    args = parser.parse_args(argv)
+
+    if web is None:
+        parser.error("the mock server requires aiohttp (pip install aiohttp)")
+    try:
+        server = MockATS(
+            board_size=args.board_size, latency=args.latency, error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate, retry_after=args.retry_after, host_rate=args.host_rate,
+            paragraphs=args.paragraphs, seed=args.seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    web.run_app(server.app(), host=args.host, port=args.port, access_log=None,
+                print=lambda message: print(message, flush=True))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""Offline replay benchmarks for the spiders' parse callbacks.
+
+Builds responses from the recorded fixtures in benchmarks/fixtures and from
+synthetic boards, drives the spider callbacks directly (no reactor, no
+network) and reports pages/sec, items/sec, per-callback latency percentiles
+and peak RSS. Fixture cases are also checked against golden outputs in
+benchmarks/golden so selector changes that alter extracted fields show up.
+
+Run from the directory containing scrapy.cfg:
+
+    python -m benchmarks.replay
+    python -m benchmarks.replay --quick --cases lever
+    python -m benchmarks.replay --update-golden
+    python -m benchmarks.replay --compare benchmarks/results/replay-20261018T120000.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import time
+from datetime import datetime
+
+import scrapy
+from itemadapter import ItemAdapter
+from scrapy.http import HtmlResponse, Request, TextResponse
+
+from job_scraper.spiders.getro_scraper import GetroJobsSpider
+from job_scraper.spiders.greenhouse_scraper import GreenhouseJobsSpider
+from job_scraper.spiders.lever_scraper import LeverJobsSpider
+
+from . import synthetic
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, 'fixtures')
+GOLDEN_DIR = os.path.join(HERE, 'golden')
+RESULTS_DIR = os.path.join(HERE, 'results')
+
+# Size of the large synthetic boards
+LARGE_BOARD = 5000
+# Number of synthetic detail pages per detail case
+DETAIL_PAGES = 200
+
+# Fields that change on every run and are left out of golden comparisons
+VOLATILE_FIELDS = ('scraped_at',)
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def html_response(url, body, meta=None):
+    request = Request(url, meta=meta or {})
+    return HtmlResponse(url=url, body=body.encode('utf-8'), encoding='utf-8', request=request)
+
+
+def json_response(url, body, meta=None):
+    if not isinstance(body, str):
+        body = json.dumps(body)
+    request = Request(url, meta=meta or {})
+    return TextResponse(
+        url=url,
+        body=body.encode('utf-8'),
+        encoding='utf-8',
+        headers={'Content-Type': 'application/json'},
+        request=request,
+    )
+
+
+class Case:
+    """One callback driven over a list of responses"""
+
+    def __init__(self, name, make_spider, callback, make_responses, golden=False, setup=None):
+        self.name = name
+        self.make_spider = make_spider
+        self.callback = callback
+        self.make_responses = make_responses
+        self.golden = golden
+        self.setup = setup
+
+
+def fixture_cases():
+    lever_url = 'https://api.lever.co/v0/postings/immuta'
+    greenhouse_job = 'https://job-boards.greenhouse.io/nomadhealth/jobs/5512345'
+    getro_job = 'https://jobs.4pt0.org/companies/acme-health/jobs/31090001-product-designer'
+    getro_meta = {
+        'getro_data': {'getro_title': 'Product Designer', 'secondary_company': 'Acme Health'},
+        'source_platform': 'greenhouse',
+        'getro_url': getro_job,
+    }
+
+    def lever(mode='json'):
+        return lambda: LeverJobsSpider(company='immuta', domain='immuta.com', mode=mode)
+
+    def greenhouse(mode='api'):
+        return lambda: GreenhouseJobsSpider(company='nomadhealth', domain='nomadhealth.com', mode=mode)
+
+    def getro():
+        return GetroJobsSpider(company='4pt0', domain='4pt0.org')
+
+    return [
+        Case('lever_list_html', lever('html'), 'parse',
+             lambda: [html_response(lever_url, fixture('lever_list.html'))], golden=True),
+        Case('lever_postings_json', lever(), 'parse_postings_json',
+             lambda: [json_response(lever_url + '?mode=json', fixture('lever_postings.json'))], golden=True),
+        Case('lever_detail', lever('html'), 'parse_job_details',
+             lambda: [html_response('https://jobs.lever.co/immuta/3f6a1a2e-8c2d-4b8e-9d7a-1f2e3d4c5b6a',
+                                    fixture('lever_detail.html'))], golden=True),
+        Case('greenhouse_board_html', greenhouse('html'), 'parse',
+             lambda: [html_response('https://job-boards.greenhouse.io/nomadhealth',
+                                    fixture('greenhouse_board.html'))], golden=True),
+        Case('greenhouse_board_api', greenhouse(), 'parse_board_api',
+             lambda: [json_response('https://boards-api.greenhouse.io/v1/boards/nomadhealth/jobs?content=true',
+                                    fixture('greenhouse_jobs.json'))], golden=True),
+        Case('greenhouse_detail', greenhouse('html'), 'parse_job_details',
+             lambda: [html_response(greenhouse_job, fixture('greenhouse_detail.html'))], golden=True),
+        Case('getro_board_state', getro, 'parse',
+             lambda: [html_response('https://jobs.4pt0.org/jobs', fixture('getro_board.html'))], golden=True),
+        Case('getro_board_links', getro, 'parse',
+             lambda: [html_response('https://jobs.4pt0.org/jobs', fixture('getro_board_links.html'))], golden=True),
+        Case('getro_api_page', getro, 'parse_jobs_api',
+             lambda: [json_response('https://api.getro.com/api/v2/collections/1843/search/jobs',
+                                    fixture('getro_api_page.json'))],
+             golden=True, setup=lambda spider: setattr(spider, 'pending_api_pages', 2)),
+        Case('getro_detail', getro, 'parse_job_details',
+             lambda: [html_response(getro_job, fixture('getro_detail.html'))], golden=True),
+        Case('getro_secondary_greenhouse', getro, 'parse_secondary_source',
+             lambda: [html_response('https://job-boards.greenhouse.io/acmehealth/jobs/7001234',
+                                    fixture('greenhouse_detail.html'), meta=getro_meta)], golden=True),
+        Case('getro_secondary_jsonld', getro, 'parse_secondary_source',
+             lambda: [html_response('https://careers.example.org/jobs/88', fixture('jsonld_detail.html'),
+                                    meta=dict(getro_meta, source_platform='jsonld'))], golden=True),
+    ]
+
+
+def synthetic_cases(board_size=LARGE_BOARD, detail_pages=DETAIL_PAGES):
+    lever_postings = synthetic.lever_postings(board_size)
+    greenhouse_payload = synthetic.greenhouse_jobs(board_size)
+    getro_jobs = synthetic.getro_jobs(board_size)
+
+    def lever(mode='json'):
+        return lambda: LeverJobsSpider(company='acme', domain='acme.com', mode=mode)
+
+    def greenhouse(mode='api'):
+        return lambda: GreenhouseJobsSpider(company='acme', domain='acme.com', mode=mode)
+
+    def getro():
+        return GetroJobsSpider(company='4pt0', domain='4pt0.org')
+
+    return [
+        Case(f'lever_list_html_{board_size}', lever('html'), 'parse',
+             lambda: [html_response('https://api.lever.co/v0/postings/acme',
+                                    synthetic.lever_list_html(lever_postings))]),
+        Case(f'lever_postings_json_{board_size}', lever(), 'parse_postings_json',
+             lambda: [json_response('https://api.lever.co/v0/postings/acme?mode=json', lever_postings)]),
+        Case('lever_detail_synthetic', lever('html'), 'parse_job_details',
+             lambda: [html_response(p['hostedUrl'], synthetic.lever_detail_html(p))
+                      for p in lever_postings[:detail_pages]]),
+        Case(f'greenhouse_board_html_{board_size}', greenhouse('html'), 'parse',
+             lambda: [html_response('https://job-boards.greenhouse.io/acme',
+                                    synthetic.greenhouse_board_html(greenhouse_payload))]),
+        Case(f'greenhouse_board_api_{board_size}', greenhouse(), 'parse_board_api',
+             lambda: [json_response('https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true',
+                                    greenhouse_payload)]),
+        Case('greenhouse_detail_synthetic', greenhouse('html'), 'parse_job_details',
+             lambda: [html_response(job['absolute_url'], synthetic.greenhouse_detail_html(job))
+                      for job in greenhouse_payload['jobs'][:detail_pages]]),
+        Case(f'getro_board_state_{board_size}', getro, 'parse',
+             lambda: [html_response('https://jobs.4pt0.org/jobs', synthetic.getro_board_html(getro_jobs))]),
+        Case(f'getro_board_links_{board_size}', getro, 'parse',
+             lambda: [html_response('https://jobs.4pt0.org/jobs', synthetic.getro_links_html(getro_jobs))]),
+        Case('getro_detail_synthetic', getro, 'parse_job_details',
+             lambda: [html_response(f"https://jobs.4pt0.org/companies/x/jobs/{job['slug']}",
+                                    synthetic.getro_detail_html(job, seed=index))
+                      for index, job in enumerate(getro_jobs[:detail_pages])]),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def output_record(result):
+    """Comparable form of a callback result, without volatile fields"""
+    if isinstance(result, scrapy.Request):
+        return {'request': result.url, 'method': result.method}
+    record = ItemAdapter(result).asdict()
+    for field in VOLATILE_FIELDS:
+        record.pop(field, None)
+    return record
+
+
+def run_case(case, repeat):
+    responses = case.make_responses()
+    latencies = []
+    items = requests = 0
+    outputs = []
+
+    started = time.perf_counter()
+    for iteration in range(repeat):
+        spider = case.make_spider()
+        if case.setup:
+            case.setup(spider)
+        callback = getattr(spider, case.callback)
+
+        for response in responses:
+            call_started = time.perf_counter()
+            results = list(callback(response) or ())
+            latencies.append(time.perf_counter() - call_started)
+
+            for result in results:
+                if isinstance(result, scrapy.Request):
+                    requests += 1
+                else:
+                    items += 1
+            if iteration == 0 and case.golden:
+                outputs.extend(output_record(result) for result in results)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pages = len(responses) * repeat
+    return {
+        'callback': case.callback,
+        'pages': pages,
+        'items': items,
+        'requests': requests,
+        'seconds': round(elapsed, 6),
+        'pages_per_sec': round(pages / elapsed, 2) if elapsed else None,
+        'items_per_sec': round(items / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 3),
+            'p90': round(percentile(latencies, 0.90) * 1000, 3),
+            'p99': round(percentile(latencies, 0.99) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3),
+        },
+        'peak_rss_kb': peak_rss_kb(),
+    }, outputs
+
+
+def check_golden(name, outputs, update):
+    path = os.path.join(GOLDEN_DIR, f'{name}.json')
+    if update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(outputs, f, indent=2, sort_keys=True, ensure_ascii=False)
+            f.write('\n')
+        return 'updated'
+    if not os.path.exists(path):
+        return 'missing'
+    with open(path, encoding='utf-8') as f:
+        expected = json.load(f)
+    # Round-trip through JSON so tuples and other containers compare like the stored golden
+    actual = json.loads(json.dumps(outputs))
+    return 'ok' if actual == expected else 'mismatch'
+
+
+def compare(results, previous_path):
+    with open(previous_path, encoding='utf-8') as f:
+        previous = json.load(f)['cases']
+    print(f"\nChange vs {previous_path}:")
+    for name, result in results.items():
+        before = previous.get(name)
+        if not before or not before.get('pages_per_sec') or not result.get('pages_per_sec'):
+            continue
+        change = (result['pages_per_sec'] / before['pages_per_sec'] - 1) * 100
+        p50 = result['latency_ms']['p50'] - before['latency_ms']['p50']
+        print(f"  {name:<34} pages/sec {change:+7.1f}%   p50 {p50:+9.3f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each fixture case')
+    parser.add_argument('--cases', help='only run cases whose name contains this text')
+    parser.add_argument('--quick', action='store_true', help='skip the large synthetic boards')
+    parser.add_argument('--board-size', type=int, default=LARGE_BOARD, help='postings per synthetic board')
+    parser.add_argument('--output', help='where to write the JSON report')
+    parser.add_argument('--update-golden', action='store_true', help='rewrite golden outputs')
+    parser.add_argument('--compare', help='earlier JSON report to compare against')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    cases = fixture_cases()
+    if not args.quick:
+        cases += synthetic_cases(args.board_size)
+    if args.cases:
+        cases = [case for case in cases if args.cases in case.name]
+
+    results = {}
+    mismatches = []
+    for case in cases:
+        # Synthetic cases are large enough that a single pass is representative
+        repeat = args.repeat if case.golden else 1
+        result, outputs = run_case(case, repeat)
+        if case.golden:
+            result['golden'] = check_golden(case.name, outputs, args.update_golden)
+            if result['golden'] == 'mismatch':
+                mismatches.append(case.name)
+        results[case.name] = result
+        print(
+            f"{case.name:<36} {result['pages_per_sec'] or 0:>10.1f} pages/s "
+            f"{result['items_per_sec'] or 0:>11.1f} items/s  "
+            f"p50 {result['latency_ms']['p50']:>9.3f} ms  p99 {result['latency_ms']['p99']:>9.3f} ms  "
+            f"{result.get('golden', '')}"
+        )
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'scrapy': scrapy.__version__,
+        'peak_rss_kb': peak_rss_kb(),
+        'cases': results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"replay-{datetime.now().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f"\nPeak RSS {report['peak_rss_kb']} KB, report written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if mismatches:
+        print(f"Golden output mismatch: {', '.join(mismatches)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
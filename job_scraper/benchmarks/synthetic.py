@@ -0,0 +1,238 @@
+"""Synthetic Lever, Greenhouse and Getro boards for offline benchmarks.
+
+Every generator is deterministic for a given seed and produces markup and JSON
+in the same shape as the recorded fixtures, so the spiders' selectors and JSON
+lookups behave as they do against the real hosts.
+"""
+
+import html
+import json
+import random
+import uuid
+
+TITLES = [
+    "Software Engineer", "Senior Software Engineer", "Staff Data Engineer",
+    "Product Manager", "Product Designer", "Account Executive", "Sales Engineer",
+    "Customer Success Manager", "Operations Lead", "Finance Associate",
+    "Recruiter", "Marketing Manager", "Site Reliability Engineer",
+]
+DEPARTMENTS = ["Engineering", "Product", "Design", "Sales", "Marketing", "Operations", "Finance"]
+LOCATIONS = [
+    "San Francisco, CA", "New York, NY", "Boston, MA", "Austin, TX", "Remote - US",
+    "London, United Kingdom", "Toronto, ON", "Berlin, Germany", "Remote",
+]
+COMMITMENTS = ["Full-time", "Part-time", "Contract", "Internship"]
+WORKPLACE_TYPES = ["remote", "hybrid", "on-site"]
+WORDS = (
+    "we build reliable systems that help teams ship data products faster while keeping "
+    "customers safe our platform processes billions of events every day and you will own "
+    "critical services collaborate across functions mentor engineers and improve quality"
+).split()
+
+
+def sentence(rng, words=18):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def description_html(rng, paragraphs=4, bullets=6):
+    """A description with paragraphs, headings and bullet lists"""
+    parts = []
+    for index in range(paragraphs):
+        parts.append(f"<p><strong>{sentence(rng, 3)}</strong></p>")
+        parts.append(f"<p>{sentence(rng)} {sentence(rng)}</p>")
+        if index % 2:
+            items = ''.join(f"<li>{sentence(rng, 8)}</li>" for _ in range(bullets))
+            parts.append(f"<ul>{items}</ul>")
+    return ''.join(parts)
+
+
+def lever_postings(count, company="acme", seed=0, paragraphs=4):
+    """Postings API entries as returned by /v0/postings/{company}?mode=json"""
+    rng = random.Random(seed)
+    postings = []
+    for _ in range(count):
+        posting_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        description = description_html(rng, paragraphs)
+        postings.append({
+            "id": posting_id,
+            "text": rng.choice(TITLES),
+            "categories": {
+                "commitment": rng.choice(COMMITMENTS),
+                "department": rng.choice(DEPARTMENTS),
+                "location": rng.choice(LOCATIONS),
+                "team": rng.choice(DEPARTMENTS),
+            },
+            "workplaceType": rng.choice(WORKPLACE_TYPES),
+            "createdAt": 1700000000000 + rng.randrange(10 ** 10),
+            "description": description,
+            "descriptionPlain": ' '.join(sentence(rng) for _ in range(paragraphs * 2)),
+            "lists": [
+                {"text": "Requirements", "content": ''.join(f"<li>{sentence(rng, 8)}</li>" for _ in range(6))},
+                {"text": "Nice to have", "content": ''.join(f"<li>{sentence(rng, 8)}</li>" for _ in range(3))},
+            ],
+            "additional": "<div>We are an equal opportunity employer.</div>",
+            "additionalPlain": "We are an equal opportunity employer.",
+            "hostedUrl": f"https://jobs.lever.co/{company}/{posting_id}",
+            "applyUrl": f"https://jobs.lever.co/{company}/{posting_id}/apply",
+        })
+    return postings
+
+
+def lever_list_html(postings):
+    """The HTML postings list served by /v0/postings/{company}"""
+    links = ''.join(
+        f'<a href="{posting["hostedUrl"]}">{html.escape(posting["text"])}</a>\n' for posting in postings
+    )
+    return f"<!DOCTYPE html><html><body><div class=\"postings-group\">\n{links}</div></body></html>"
+
+
+def lever_detail_html(posting):
+    """A jobs.lever.co posting page"""
+    categories = posting["categories"]
+    requirements = ''.join(
+        f'<div class="section page-centered"><h3>{html.escape(section["text"])}</h3>'
+        f'<ul class="posting-requirements plain-list">{section["content"]}</ul></div>'
+        for section in posting["lists"]
+    )
+    return (
+        "<!DOCTYPE html><html><body><div class=\"content-wrapper posting-page\">"
+        "<div class=\"posting-headline\">"
+        f"<h2>{html.escape(posting['text'])}</h2><div class=\"posting-categories\">"
+        f"<div class=\"posting-category location\">{html.escape(categories['location'])}</div>"
+        f"<div class=\"posting-category department\">{html.escape(categories['department'])}</div>"
+        f"<div class=\"posting-category commitment\">{html.escape(categories['commitment'])}</div>"
+        f"<div class=\"posting-category workplaceTypes\">{posting['workplaceType']}</div>"
+        "</div></div>"
+        f"<div class=\"section page-centered\" data-qa=\"job-description\">{posting['description']}</div>"
+        f"{requirements}</div></body></html>"
+    )
+
+
+def greenhouse_jobs(count, company="acme", seed=0, paragraphs=4):
+    """Board API payload as returned by /v1/boards/{company}/jobs?content=true"""
+    rng = random.Random(seed)
+    jobs = []
+    for index in range(count):
+        job_id = 4000000 + index
+        jobs.append({
+            "absolute_url": f"https://job-boards.greenhouse.io/{company}/jobs/{job_id}",
+            "internal_job_id": 2000000 + index,
+            "location": {"name": rng.choice(LOCATIONS)},
+            "metadata": [{"id": 1, "name": "Employment Type", "value": rng.choice(COMMITMENTS)}],
+            "id": job_id,
+            "updated_at": f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}T12:00:00-04:00",
+            "requisition_id": f"REQ-{index}",
+            "title": rng.choice(TITLES),
+            "content": html.escape(description_html(rng, paragraphs)),
+            "departments": [{"id": 1, "name": rng.choice(DEPARTMENTS)}],
+            "offices": [{"id": 1, "name": rng.choice(LOCATIONS)}],
+        })
+    return {"jobs": jobs, "meta": {"total": count}}
+
+
+def greenhouse_board_html(payload):
+    """The job-boards.greenhouse.io board page"""
+    rows = ''.join(
+        f'<tr class="job-post"><td class="cell"><a href="{job["absolute_url"]}">'
+        f'<p class="body body--medium">{html.escape(job["title"])}</p>'
+        f'<p class="body body__secondary body--metadata">{html.escape(job["location"]["name"])}</p>'
+        f'</a></td></tr>'
+        for job in payload["jobs"]
+    )
+    return f"<!DOCTYPE html><html><body><main class=\"job-board\"><table>{rows}</table></main></body></html>"
+
+
+def greenhouse_detail_html(job):
+    """A job-boards.greenhouse.io job page"""
+    return (
+        "<!DOCTYPE html><html><body><main class=\"main\"><div class=\"job__header\">"
+        f"<div class=\"job__title\"><h1>{html.escape(job['title'])}</h1>"
+        f"<div class=\"job__location\"><div>{html.escape(job['location']['name'])}</div></div></div></div>"
+        f"<div class=\"job__description body\">{html.unescape(job['content'])}</div>"
+        "</main></body></html>"
+    )
+
+
+def getro_jobs(count, seed=0, camel_case=True):
+    """Jobs in the shape of the embedded board state (camelCase) or the collection API"""
+    rng = random.Random(seed)
+    jobs = []
+    for index in range(count):
+        organization = f"company-{rng.randrange(200)}"
+        if rng.random() < 0.5:
+            apply_url = f"https://job-boards.greenhouse.io/{organization}/jobs/{5000000 + index}"
+        else:
+            apply_url = f"https://jobs.lever.co/{organization}/{uuid.UUID(int=rng.getrandbits(128), version=4)}"
+        work_mode = rng.choice(["remote", "hybrid", "on_site"])
+        employment = [rng.choice(["full_time", "part_time", "contract"])]
+        job = {
+            "id": 30000000 + index,
+            "title": rng.choice(TITLES),
+            "slug": f"{30000000 + index}-{rng.choice(TITLES).lower().replace(' ', '-')}",
+            "url": apply_url,
+            "organization": {"id": index, "name": organization.replace('-', ' ').title(), "slug": organization},
+            "locations": [rng.choice(LOCATIONS)],
+        }
+        if camel_case:
+            job.update({"workMode": work_mode, "employmentTypes": employment, "createdAt": 1727740800 + index})
+        else:
+            job.update({"work_mode": work_mode, "employment_types": employment, "created_at": 1727740800 + index})
+        jobs.append(job)
+    return jobs
+
+
+def getro_board_html(jobs, total=None, network_id=1000, links=True):
+    """A jobs.{domain}/jobs board page with embedded Next.js state"""
+    state = {
+        "props": {"pageProps": {"initialState": {
+            "network": {"id": network_id},
+            "jobs": {"found": jobs, "total": len(jobs) if total is None else total},
+        }}},
+    }
+    cards = ''
+    if links:
+        cards = ''.join(
+            f'<div class="job-card"><a href="/companies/{job["organization"]["slug"]}/jobs/{job["slug"]}">'
+            f'{html.escape(job["title"])}</a></div>'
+            for job in jobs
+        )
+    return (
+        f"<!DOCTYPE html><html><body><div id=\"__next\">{cards}</div>"
+        f"<script id=\"__NEXT_DATA__\" type=\"application/json\">{json.dumps(state)}</script>"
+        "</body></html>"
+    )
+
+
+def getro_links_html(jobs):
+    """A board page without embedded state, which only exposes job links"""
+    cards = ''.join(
+        f'<div class="job-card"><a href="/companies/{job["organization"]["slug"]}/jobs/{job["slug"]}">'
+        f'{html.escape(job["title"])}</a></div>'
+        for job in jobs
+    )
+    return f"<!DOCTYPE html><html><body><div id=\"__next\">{cards}</div></body></html>"
+
+
+def getro_api_page(jobs):
+    """One page of the collection search API"""
+    return {"results": {"count": len(jobs), "jobs": jobs}}
+
+
+def getro_detail_html(job, seed=0, paragraphs=4):
+    """A Getro job page with the info section and apply button"""
+    rng = random.Random(seed)
+    organization = html.escape(job["organization"]["name"])
+    return (
+        "<!DOCTYPE html><html><body><div id=\"__next\">"
+        f"<img data-testid=\"image\" alt=\"{organization}\">"
+        f"<h2 font-size=\"28px\">{html.escape(job['title'])}</h2>"
+        f"<div data-testid=\"content\"><div><p>{organization}</p></div>"
+        f"<div><span>{rng.choice(COMMITMENTS)}</span></div>"
+        f"<div><span>{rng.choice(WORKPLACE_TYPES)}</span></div>"
+        f"<div><span>{html.escape(job['locations'][0])}</span></div>"
+        f"<div><span>{rng.choice(DEPARTMENTS)}</span></div>"
+        f"{description_html(rng, paragraphs)}</div>"
+        f"<a data-testid=\"button-apply-now\" href=\"{job['url']}\">Apply now</a>"
+        "</div></body></html>"
+    )
@@ -0,0 +1,105 @@
+# Memory-mapped Bloom filters
+#
+# A Bloom filter answers "seen before?" for any number of keys in a bit array
+# sized up front from the expected number of keys and the accepted false
+# positive rate. It never forgets a key it was given. The bit array lives in
+# a memory-mapped file, so its size does not grow with the keys added, only
+# the pages actually touched are resident, and the bits reach the disk even if
+# the process is killed, as long as the machine stays up.
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+
+MAGIC = b'JSBLOOM1'
+# magic, number of bits, number of hash functions, keys added
+HEADER = struct.Struct('<8sQQQ')
+
+
+def optimal_parameters(capacity, error_rate):
+    """Number of bits and hash functions for `capacity` keys at `error_rate` false positives"""
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    bits = max(64, (bits + 7) // 8 * 8)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class BloomFilter:
+    """Bloom filter over bytes keys, stored in `path` or in anonymous memory when path is None"""
+
+    def __init__(self, path=None, capacity=100000, error_rate=1e-5):
+        self.path = path
+        self.capacity = capacity
+
+        if path is not None and os.path.exists(path):
+            with open(path, 'r+b') as f:
+                self.map = mmap.mmap(f.fileno(), 0)
+            magic, self.bits, self.hashes, self.count = HEADER.unpack_from(self.map)
+            if magic != MAGIC:
+                self.map.close()
+                raise ValueError(f"{path} is not a Bloom filter file")
+            return
+
+        self.bits, self.hashes = optimal_parameters(capacity, error_rate)
+        self.count = 0
+        size = HEADER.size + self.bits // 8
+        if path is None:
+            self.map = mmap.mmap(-1, size)
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w+b') as f:
+                # Sparse on filesystems that support it; pages are allocated when first set
+                f.truncate(size)
+                self.map = mmap.mmap(f.fileno(), size)
+        self.write_header()
+
+    def positions(self, key):
+        # Enhanced double hashing from one 128-bit digest; plain h1 + i * h2
+        # clusters when h2 shares factors with the number of bits
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little')
+        bits = self.bits
+        positions = []
+        for i in range(self.hashes):
+            positions.append(h1 % bits)
+            h1 += h2
+            h2 += i
+        return positions
+
+    def add(self, key):
+        """Add a key; return True if it was not in the filter before"""
+        data, offset = self.map, HEADER.size
+        added = False
+        for position in self.positions(key):
+            index = offset + (position >> 3)
+            mask = 1 << (position & 7)
+            byte = data[index]
+            if not byte & mask:
+                data[index] = byte | mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key):
+        data, offset = self.map, HEADER.size
+        return all(data[offset + (position >> 3)] & (1 << (position & 7)) for position in self.positions(key))
+
+    def __len__(self):
+        """Keys added, counting a false positive as not added"""
+        return self.count
+
+    def write_header(self):
+        HEADER.pack_into(self.map, 0, MAGIC, self.bits, self.hashes, self.count)
+
+    def flush(self):
+        self.write_header()
+        if self.path is not None:
+            self.map.flush()
+
+    def close(self):
+        self.flush()
+        self.map.close()
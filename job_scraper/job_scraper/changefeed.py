@@ -0,0 +1,105 @@
+# Snapshot index for the change feed
+#
+# Every posting's fields are hashed individually and stored in SQLite under
+# its stable posting key, so comparing a freshly scraped item with the last
+# snapshot is one indexed lookup and never needs the previous export in
+# memory. Each run stamps the rows it sees; rows of the (source, company) pairs
+# crawled in this run that were not stamped are the removed postings.
+
+import hashlib
+import json
+import sqlite3
+
+# Fields that change on every run or are added by later pipelines
+IGNORED_FIELDS = frozenset({'scraped_at', 'status', 'seen_on', 'duplicate_group', 'locations', 'remote'})
+
+
+def field_hashes(record):
+    """Short hash of every non-empty, non-ignored field"""
+    hashes = {}
+    for field, value in record.items():
+        if field in IGNORED_FIELDS or value in (None, '', [], {}):
+            continue
+        encoded = json.dumps(value, sort_keys=True, default=str).encode('utf-8')
+        hashes[field] = hashlib.blake2b(encoded, digest_size=8).hexdigest()
+    return hashes
+
+
+class SnapshotIndex:
+    """SQLite table of posting keys and their field hashes from the last snapshot"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS postings (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                source TEXT,
+                company TEXT,
+                hashes TEXT NOT NULL,
+                run TEXT NOT NULL,
+                removed INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS postings_scope ON postings (source, company, run)")
+
+    def compare(self, key, record, run):
+        """Record a posting for this run and return (event, changed field names)
+
+        event is 'added', 'modified' or None when nothing changed.
+        """
+        hashes = field_hashes(record)
+        row = self.conn.execute("SELECT hashes, removed FROM postings WHERE key = ?", (key,)).fetchone()
+
+        if row is None or row[1]:
+            event, changed = 'added', sorted(hashes)
+        else:
+            previous = json.loads(row[0])
+            changed = sorted(
+                field for field in set(previous) | set(hashes) if previous.get(field) != hashes.get(field)
+            )
+            event = 'modified' if changed else None
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO postings VALUES (?, ?, ?, ?, ?, ?, 0)",
+            (key, record.get('url'), record.get('source'), record.get('company'), json.dumps(hashes), run),
+        )
+        return event, changed
+
+    def mark_removed(self, key):
+        """Mark a posting removed; return its row, or None if it was unknown or already removed"""
+        row = self.conn.execute(
+            "SELECT key, url, source, company FROM postings WHERE key = ? AND removed = 0", (key,)
+        ).fetchone()
+        if row is not None:
+            self.conn.execute("UPDATE postings SET removed = 1 WHERE key = ?", (key,))
+        return row
+
+    def sweep(self, scopes, run):
+        """Mark every posting of the given (source, company) pairs not seen in this run removed, yielding their rows
+
+        A company listed on two platforms is two scopes, so sweeping one
+        leaves the other's postings alone.
+        """
+        for source, company in scopes:
+            rows = self.conn.execute(
+                "SELECT key, url, source, company FROM postings "
+                "WHERE source = ? AND company = ? AND run != ? AND removed = 0",
+                (source, company, run),
+            ).fetchall()
+            for row in rows:
+                yield row
+            self.conn.execute(
+                "UPDATE postings SET removed = 1 WHERE source = ? AND company = ? AND run != ? AND removed = 0",
+                (source, company, run),
+            )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,124 @@
+# Keyword classifier for free-text job metadata
+#
+# Job boards like Getro render employment type, workplace type, location and
+# department as loose text nodes. FieldClassifier compiles every keyword and
+# synonym into a single trie-shaped pattern up front, so each text node is
+# lower-cased once and scanned once for all keyword fields instead of once per
+# keyword. Sharing prefixes in the pattern lets the regex engine rule out most
+# positions on their first character, like an Aho-Corasick automaton would.
+
+import re
+
+from .locations import default_normalizer
+
+# Canonical value -> synonyms, per item field. The canonical value is what ends
+# up in the item, and always matches itself.
+DEFAULT_KEYWORDS = {
+    'employment_type': {
+        'full-time': ['full time', 'fulltime'],
+        'part-time': ['part time', 'parttime'],
+        'contract': ['contractor', 'freelance'],
+        'temporary': ['temp', 'seasonal'],
+        'internship': ['intern'],
+    },
+    'workplace_type': {
+        'remote': ['work from home', 'wfh'],
+        'hybrid': [],
+        'on-site': ['onsite', 'on site', 'in-office', 'in office'],
+    },
+    'department': {
+        'sales': [],
+        'engineering': [],
+        'marketing': [],
+        'product': [],
+        'design': [],
+        'operations': [],
+        'human resources': [],
+        'finance': [],
+        'business development': [],
+    },
+}
+
+# City/state pattern e.g. 'San Francisco, CA', for text nodes the gazetteer does
+# not recognize. Matches can only start where a run of letters and spaces
+# starts, which finds the same leftmost match as the bare pattern without
+# rescanning the run from every position inside it.
+LOCATION_PATTERN = re.compile(r'(?<![A-Za-z\s])[A-Za-z\s]+,\s*[A-Z]{2}')
+
+
+def trie_pattern(phrases):
+    """Build a regex alternation for phrases with common prefixes factored out"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A phrase ending here makes the rest of the branch optional
+        return '(?:' + pattern + ')?' if '' in node else pattern
+
+    return build(trie)
+
+
+class FieldClassifier:
+    """Fill employment_type, workplace_type, department and location from text nodes"""
+
+    def __init__(self, keywords=None, location_pattern=LOCATION_PATTERN, location_normalizer=None):
+        keywords = DEFAULT_KEYWORDS if keywords is None else keywords
+
+        # Map every lower-cased phrase to the field and canonical value it stands for
+        self.lookup = {}
+        for field, table in keywords.items():
+            for canonical, synonyms in table.items():
+                for phrase in [canonical, *synonyms]:
+                    self.lookup.setdefault(phrase.lower(), (field, canonical))
+
+        # Optional trie branches are greedy, so the longest phrase at a position wins
+        self.pattern = re.compile(r'\b' + trie_pattern(self.lookup) + r'\b')
+        self.location_pattern = location_pattern
+        # Recognizes whole text nodes that are locations, e.g. "Remote - US" or "London or Berlin"
+        self.location_normalizer = location_normalizer
+        self.keyword_fields = frozenset(keywords)
+
+    def classify(self, texts, skip=()):
+        """Return a dict of the first value found for each field across texts"""
+        found = dict.fromkeys(self.keyword_fields)
+        found['location'] = None
+        missing_keywords = len(self.keyword_fields)
+
+        for text in texts:
+            text = text.strip()
+            if not text or text in skip:
+                continue
+
+            if missing_keywords:
+                for match in self.pattern.finditer(text.lower()):
+                    field, canonical = self.lookup[match.group(0)]
+                    if found[field] is None:
+                        found[field] = canonical
+                        missing_keywords -= 1
+                        if not missing_keywords:
+                            break
+
+            if found['location'] is None:
+                if self.location_normalizer is not None and self.location_normalizer.match(text):
+                    found['location'] = text
+                else:
+                    match = self.location_pattern.search(text)
+                    if match:
+                        found['location'] = match.group(0)
+
+            # Stop as soon as every field has a value
+            if not missing_keywords and found['location'] is not None:
+                break
+
+        return found
+
+
+default_classifier = FieldClassifier(location_normalizer=default_normalizer)
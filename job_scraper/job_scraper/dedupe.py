@@ -0,0 +1,219 @@
+# Near-duplicate detection for postings seen on several sources
+#
+# The same job often shows up from Getro, Greenhouse and Lever with slightly
+# different text and company strings. Each posting's title and normalized
+# description are fingerprinted with MinHash, and an LSH index over signature
+# bands finds candidate matches without comparing against every stored
+# posting. The index lives in SQLite so it persists across runs and only the
+# pages SQLite caches are held in memory.
+
+import hashlib
+import json
+import re
+import sqlite3
+import zlib
+from array import array
+
+MASK64 = (1 << 64) - 1
+# Odd 64-bit constant used to spread the 32-bit shingle hashes over 64 bits
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_text(text):
+    """Lower-case text and collapse everything but letters and digits to single spaces"""
+    return NON_WORD.sub(' ', (text or '').lower()).strip()
+
+
+class MinHasher:
+    """One-permutation MinHash signatures over word shingles.
+
+    Each shingle is hashed once; the low bits pick one of `size` bins and the
+    remaining bits compete for that bin's minimum. Empty bins borrow the value
+    of the next filled bin (rotation densification), tagged with the distance
+    borrowed from, so signatures stay comparable position by position. This is
+    O(shingles + size) instead of the O(shingles * size) of k hash functions.
+    """
+
+    def __init__(self, size=64, shingle_size=3):
+        if size & (size - 1):
+            raise ValueError("The signature size must be a power of two")
+        self.size = size
+        self.shingle_size = shingle_size
+        self.bin_bits = size.bit_length() - 1
+        self.value_bits = 64 - self.bin_bits
+
+    def shingles(self, words):
+        size = min(self.shingle_size, len(words))
+        return {
+            zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) * GOLDEN_GAMMA & MASK64
+            for i in range(len(words) - size + 1)
+        }
+
+    def signature(self, words):
+        size, mask, shift = self.size, self.size - 1, self.bin_bits
+        bins = [None] * size
+        for shingle in self.shingles(words):
+            index, value = shingle & mask, shingle >> shift
+            current = bins[index]
+            if current is None or value < current:
+                bins[index] = value
+
+        if None not in bins:
+            return bins
+        if all(value is None for value in bins):
+            return [0] * size
+
+        signature = list(bins)
+        for index, value in enumerate(bins):
+            if value is None:
+                distance = 1
+                while bins[(index + distance) & mask] is None:
+                    distance += 1
+                signature[index] = distance << self.value_bits | bins[(index + distance) & mask]
+        return signature
+
+
+def key_namespace(key):
+    """The source part of a posting key, e.g. "lever" for "lever:<uuid>" """
+    return key.split(':', 1)[0] if ':' in key else key.split('/', 1)[0]
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+class DuplicateIndex:
+    """Persistent LSH index grouping postings into duplicate clusters.
+
+    Every posting belongs to a cluster, named after the key of its first
+    member. The cluster remembers its most complete member and every source
+    it has been seen on.
+    """
+
+    def __init__(self, path, hasher=None, bands=16, threshold=0.8):
+        self.hasher = hasher or MinHasher()
+        if self.hasher.size % bands:
+            raise ValueError("The signature size must be a multiple of the number of bands")
+        self.bands = bands
+        self.rows = self.hasher.size // bands
+        self.threshold = threshold
+
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS postings (
+                key TEXT PRIMARY KEY,
+                cluster TEXT NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS clusters (
+                cluster TEXT PRIMARY KEY,
+                best_key TEXT NOT NULL,
+                best_completeness REAL NOT NULL,
+                best_run TEXT NOT NULL,
+                sources TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, key)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def band_buckets(self, signature):
+        for band in range(self.bands):
+            rows = array('Q', signature[band * self.rows:(band + 1) * self.rows]).tobytes()
+            digest = hashlib.blake2b(rows, digest_size=8).digest()
+            yield band, int.from_bytes(digest, 'big', signed=True)
+
+    def find_match(self, key, signature):
+        """Return the key of the most similar posting from another source above the threshold.
+
+        Postings from the same source are never matched: companies often post
+        one description for several locations, and those are separate jobs.
+        """
+        namespace = key_namespace(key)
+        candidates = set()
+        for band, bucket in self.band_buckets(signature):
+            for (candidate,) in self.conn.execute(
+                "SELECT key FROM bands WHERE band = ? AND bucket = ?", (band, bucket)
+            ):
+                if key_namespace(candidate) != namespace:
+                    candidates.add(candidate)
+
+        best_key, best_similarity = None, self.threshold
+        for candidate in candidates:
+            row = self.conn.execute("SELECT signature FROM postings WHERE key = ?", (candidate,)).fetchone()
+            score = similarity(signature, array('Q', row[0]))
+            if score >= best_similarity:
+                best_key, best_similarity = candidate, score
+        return best_key
+
+    def add(self, key, words, source, completeness, run_id):
+        """Index a posting and return (cluster, is_best, best_run, sources) for it"""
+        signature = self.hasher.signature(words)
+
+        row = self.conn.execute("SELECT cluster FROM postings WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            # Already indexed on an earlier run or source: refresh its signature in place
+            cluster = row[0]
+            self.conn.execute("DELETE FROM bands WHERE key = ?", (key,))
+        else:
+            match = self.find_match(key, signature)
+            if match is not None:
+                cluster = self.conn.execute("SELECT cluster FROM postings WHERE key = ?", (match,)).fetchone()[0]
+            else:
+                cluster = key
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO postings VALUES (?, ?, ?)",
+            (key, cluster, array('Q', signature).tobytes()),
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO bands VALUES (?, ?, ?)",
+            [(band, bucket, key) for band, bucket in self.band_buckets(signature)],
+        )
+
+        row = self.conn.execute(
+            "SELECT best_key, best_completeness, best_run, sources FROM clusters WHERE cluster = ?", (cluster,)
+        ).fetchone()
+        if row is None:
+            best_key, best_completeness, best_run, sources = key, completeness, run_id, [source]
+        else:
+            best_key, best_completeness, best_run, sources = row
+            sources = json.loads(sources)
+            if source not in sources:
+                sources.append(source)
+            if best_key == key or completeness > best_completeness:
+                best_key, best_completeness, best_run = key, completeness, run_id
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO clusters VALUES (?, ?, ?, ?, ?)",
+            (cluster, best_key, best_completeness, best_run, json.dumps(sources)),
+        )
+        return cluster, best_key == key, best_run, sources
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def completeness(adapter):
+    """Score how complete an item is: filled fields first, then description length"""
+    fields = ('title', 'employment_type', 'workplace_type', 'location', 'department', 'description', 'requirements')
+    filled = sum(1 for field in fields if adapter.get(field))
+    return filled + min(len(adapter.get('description') or ''), 10000) / 10001
+
+
+def posting_words(adapter):
+    """Normalized words of an item's title and description"""
+    text = f"{adapter.get('title') or ''} {adapter.get('description') or ''}"
+    return normalize_text(text).split()
+
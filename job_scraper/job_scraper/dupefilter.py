@@ -0,0 +1,120 @@
+# Per-company persistent request dupefilter
+#
+# Scrapy's RFPDupeFilter keeps every request fingerprint in a Python set, so
+# its memory grows with the URLs seen, and with JOBDIR it reloads the whole
+# set on resume. CompanyBloomDupeFilter keeps one memory-mapped Bloom filter
+# per company instead, under JOBDIR/dupefilter: a fixed number of bits per
+# expected URL, nothing to load on resume, and a batch crawl that dies
+# picks up each company where it stopped.
+
+import logging
+import os
+import re
+import shutil
+import zlib
+from collections import OrderedDict
+
+from scrapy.dupefilters import RFPDupeFilter
+from scrapy.utils.job import job_dir
+
+from .bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+UNSAFE_FILENAME = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def filter_filename(key):
+    """A file name for a filter key, e.g. "lever:acme" -> "lever_acme-1a2b3c4d.bloom" """
+    return f"{UNSAFE_FILENAME.sub('_', key)[:80]}-{zlib.crc32(key.encode('utf-8')):08x}.bloom"
+
+
+class CompanyBloomDupeFilter(RFPDupeFilter):
+    """Request dupefilter with one Bloom filter per company.
+
+    Batch requests are keyed by their batch_target ("platform:company"), and
+    other spiders' requests by the spider name and company. The filters are
+    files under JOBDIR/dupefilter, of which at most `max_open` stay mapped,
+    and they are removed once a crawl finishes so the same JOBDIR can be
+    reused for the next one. Without JOBDIR there is nothing to resume and
+    no file to unmap a filter to, so it works like RFPDupeFilter, whose
+    fingerprint set grows with the requests seen rather than the companies.
+    """
+
+    def __init__(self, directory=None, debug=False, capacity=100000, error_rate=1e-5, max_open=256,
+                 *, fingerprinter=None, crawler=None):
+        super(CompanyBloomDupeFilter, self).__init__(None, debug, fingerprinter=fingerprinter)
+        self.directory = directory
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_open = max_open
+        self.crawler = crawler
+        # filter key -> BloomFilter, least recently used first
+        self.filters = OrderedDict()
+        self.over_capacity = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        path = job_dir(settings)
+        df = cls(
+            os.path.join(path, 'dupefilter') if path else None,
+            settings.getbool("DUPEFILTER_DEBUG"),
+            capacity=settings.getint("BLOOM_DUPEFILTER_CAPACITY", 100000),
+            error_rate=settings.getfloat("BLOOM_DUPEFILTER_ERROR_RATE", 1e-5),
+            max_open=settings.getint("BLOOM_DUPEFILTER_MAX_OPEN", 256),
+            fingerprinter=crawler.request_fingerprinter,
+            crawler=crawler,
+        )
+        # ResumeStartMiddleware checks start requests against the same filters
+        crawler.company_dupefilter = df
+        return df
+
+    @property
+    def persistent(self):
+        return self.directory is not None
+
+    def filter_key(self, request):
+        key = request.meta.get('batch_target')
+        if key:
+            return key
+        spider = self.crawler.spider if self.crawler is not None else None
+        if spider is None:
+            return 'default'
+        company = getattr(spider, 'company', None)
+        return f"{spider.name}:{company}" if company else spider.name
+
+    def filter_for(self, key):
+        bloom = self.filters.get(key)
+        if bloom is not None:
+            self.filters.move_to_end(key)
+            return bloom
+
+        bloom = BloomFilter(os.path.join(self.directory, filter_filename(key)), self.capacity, self.error_rate)
+        self.filters[key] = bloom
+        if len(self.filters) > self.max_open:
+            _, oldest = self.filters.popitem(last=False)
+            oldest.close()
+        return bloom
+
+    def request_seen(self, request):
+        if not self.persistent:
+            return super(CompanyBloomDupeFilter, self).request_seen(request)
+        key = self.filter_key(request)
+        bloom = self.filter_for(key)
+        if not bloom.add(self.fingerprinter.fingerprint(request)):
+            return True
+        if len(bloom) > self.capacity and key not in self.over_capacity:
+            self.over_capacity.add(key)
+            logger.warning(
+                f"Dupefilter for {key} holds more than {self.capacity} requests; "
+                f"raise BLOOM_DUPEFILTER_CAPACITY to keep false positives rare"
+            )
+        return False
+
+    def close(self, reason):
+        for bloom in self.filters.values():
+            bloom.close()
+        self.filters.clear()
+        if self.persistent and reason == 'finished':
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,41 @@
+# Define your extensions here
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+import json
+import os
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+
+class StatsFileExtension:
+    """Write the crawl stats to a JSON file when the spider closes.
+
+    Enabled by setting STATS_FILE. The multi-process runner uses it to collect
+    each worker's stats and to tell a finished worker from a crashed one.
+    """
+
+    def __init__(self, stats, path):
+        self.stats = stats
+        self.path = path
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("STATS_FILE")
+        if not path:
+            raise NotConfigured
+        s = cls(crawler.stats, path)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def spider_closed(self, spider, reason):
+        stats = dict(self.stats.get_stats())
+        stats["finish_reason"] = reason
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2, default=str)
+        os.replace(tmp_path, self.path)
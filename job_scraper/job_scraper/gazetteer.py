@@ -0,0 +1,264 @@
+# Offline gazetteer index
+#
+# The bundled gazetteer (data/gazetteer.csv) lists cities, regions, countries
+# and wider areas with their aliases. It is compiled once into a compact
+# index file: every normalized name and alias sorted and front-coded in
+# blocks of BLOCK_SIZE keys, so shared prefixes ("san francisco", "san jose",
+# "san juan") are stored once per block, followed by the place records. The
+# file is memory-mapped on the first lookup and searched in place: a binary
+# search over the first key of each block, then a short scan inside the
+# block. Nothing is parsed into Python objects up front.
+#
+# Keys are either folded names (lower-case ASCII words) or upper-case codes
+# ("CA", "NYC"), which only ever match text written in capitals, so "in" or
+# "me" in free text are never taken for India or Maine.
+
+import csv
+import mmap
+import os
+import re
+import struct
+import tempfile
+import unicodedata
+import zlib
+from collections import namedtuple
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gazetteer.csv')
+
+MAGIC = b'JSGAZ001'
+# magic, CRC32 of the source file, keys, blocks, places
+HEADER = struct.Struct('<8sIIII')
+OFFSET = struct.Struct('<I')
+# shared prefix length, suffix length; then the suffix and a PLACE_ID
+ENTRY = struct.Struct('<BB')
+PLACE_ID = struct.Struct('<H')
+BLOCK_SIZE = 16
+FIELD_SEPARATOR = '\x1f'
+
+# kind is 'city', 'region', 'country' or 'area'; region is the region's name and
+# country an ISO 3166 alpha-2 code
+Place = namedtuple('Place', 'kind city region region_code country')
+
+# Letters that NFKD does not decompose into a base letter and an accent
+FOLD_TABLE = str.maketrans({'ł': 'l', 'ø': 'o', 'æ': 'ae', 'đ': 'd', 'ı': 'i', 'œ': 'oe', 'þ': 'th'})
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+NON_CODE = re.compile(r'[^A-Z0-9]+')
+
+
+def fold(text):
+    """Lower-case ASCII words of a name, e.g. "Zürich" -> "zurich", "St. Louis" -> "st louis" """
+    text = unicodedata.normalize('NFKD', text.casefold().translate(FOLD_TABLE))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(NON_ALNUM.sub(' ', text).split())
+
+
+def is_code(text):
+    """Whether text is written like a code, e.g. "CA", "U.S.A." or "NYC" """
+    return text.isupper() and len(NON_CODE.sub('', text)) <= 4
+
+
+def code_key(text):
+    return NON_CODE.sub('', text)
+
+
+def index_key(name):
+    return code_key(name) if is_code(name) else fold(name)
+
+
+def default_index_path():
+    return os.path.join(tempfile.gettempdir(), 'job-scraper-gazetteer.idx')
+
+
+def source_checksum(source):
+    with open(source, 'rb') as f:
+        return zlib.crc32(f.read())
+
+
+def read_places(source):
+    """Places in source order, each with the index keys of its name, code and aliases"""
+    with open(source, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    region_names = {
+        (row['country'], row['code']): row['name'] for row in rows if row['kind'] == 'region'
+    }
+    for row in rows:
+        kind, name, country = row['kind'], row['name'], row['country'] or None
+        if kind == 'city':
+            code = row['region'] or None
+            place = Place(kind, name, region_names.get((country, code), code), code, country)
+        elif kind == 'region':
+            place = Place(kind, None, name, row['code'], country)
+        elif kind == 'country':
+            place = Place(kind, None, None, None, country)
+        elif kind == 'area':
+            place = Place(kind, None, name, None, None)
+        else:
+            raise ValueError(f"Unknown gazetteer row kind {kind!r} for {name!r}")
+        names = [name, row['code'], *row['aliases'].split('|')]
+        keys = {index_key(alias) for alias in names if alias}
+        yield place, sorted(key for key in keys if key)
+
+
+def compile_index(path, source=SOURCE_PATH):
+    """Compile the gazetteer CSV at source into an index file at path"""
+    places, entries = [], []
+    for place, keys in read_places(source):
+        place_id = len(places)
+        places.append(place)
+        entries.extend((key.encode('ascii'), place_id) for key in keys)
+    if len(places) > 0xFFFF:
+        raise ValueError(f"Gazetteer has {len(places)} places, the index holds at most 65535")
+    # Ties keep source order, which ranks the likelier place first
+    entries.sort()
+
+    blocks = []
+    for start in range(0, len(entries), BLOCK_SIZE):
+        block = bytearray()
+        previous = b''
+        for key, place_id in entries[start:start + BLOCK_SIZE]:
+            key = key[:255]
+            shared = 0
+            limit = min(len(previous), len(key), 255)
+            while shared < limit and previous[shared] == key[shared]:
+                shared += 1
+            block += ENTRY.pack(shared, len(key) - shared) + key[shared:] + PLACE_ID.pack(place_id)
+            previous = key
+        blocks.append(bytes(block))
+    records = [
+        FIELD_SEPARATOR.join(value or '' for value in place).encode('utf-8') for place in places
+    ]
+
+    offset = HEADER.size + OFFSET.size * (len(blocks) + len(records) + 1)
+    block_offsets = []
+    for block in blocks:
+        block_offsets.append(offset)
+        offset += len(block)
+    record_offsets = []
+    for record in records:
+        record_offsets.append(offset)
+        offset += len(record)
+    record_offsets.append(offset)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # Several processes may compile at once; each renames a complete file into place
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, source_checksum(source), len(entries), len(blocks), len(places)))
+        for value in block_offsets + record_offsets:
+            f.write(OFFSET.pack(value))
+        for block in blocks:
+            f.write(block)
+        for record in records:
+            f.write(record)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+class GazetteerIndex:
+    """Read-only view of a compiled gazetteer index file"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.checksum, self.key_count, self.block_count, self.place_count = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not a gazetteer index")
+        self.records_table = HEADER.size + OFFSET.size * self.block_count
+
+    def block_offset(self, block):
+        return OFFSET.unpack_from(self.map, HEADER.size + OFFSET.size * block)[0]
+
+    def first_key(self, block):
+        offset = self.block_offset(block)
+        _, length = ENTRY.unpack_from(self.map, offset)
+        start = offset + ENTRY.size
+        return self.map[start:start + length]
+
+    def entries(self, block):
+        """Decode the (key, place id) entries of a block"""
+        data = self.map
+        offset = self.block_offset(block)
+        count = min(BLOCK_SIZE, self.key_count - block * BLOCK_SIZE)
+        key = b''
+        for _ in range(count):
+            shared, length = ENTRY.unpack_from(data, offset)
+            offset += ENTRY.size
+            key = key[:shared] + data[offset:offset + length]
+            offset += length
+            yield key, PLACE_ID.unpack_from(data, offset)[0]
+            offset += PLACE_ID.size
+
+    def seek(self, key):
+        """Return (ids of places named key, whether longer phrases start with key + " ")"""
+        key = key.encode('ascii', 'ignore')
+        # First block whose first key is >= key; matches may start in the block before
+        low, high = 0, self.block_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.first_key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        ids = []
+        for block in range(max(low - 1, 0), self.block_count):
+            for entry_key, place_id in self.entries(block):
+                if entry_key == key:
+                    ids.append(place_id)
+                elif entry_key > key:
+                    # " " sorts before any letter or digit, so a longer phrase would come first
+                    return ids, entry_key.startswith(key + b' ')
+        return ids, False
+
+    def place(self, place_id):
+        start, end = struct.unpack_from('<II', self.map, self.records_table + OFFSET.size * place_id)
+        values = self.map[start:end].decode('utf-8').split(FIELD_SEPARATOR)
+        return Place(*(value or None for value in values))
+
+    def close(self):
+        self.map.close()
+
+
+class Gazetteer:
+    """Place lookups against the bundled gazetteer, compiling and mapping its index on first use"""
+
+    def __init__(self, index_path=None, source=SOURCE_PATH):
+        self.index_path = index_path or default_index_path()
+        self.source = source
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = self.open()
+        return self._index
+
+    def open(self):
+        checksum = source_checksum(self.source)
+        if os.path.exists(self.index_path):
+            try:
+                index = GazetteerIndex(self.index_path)
+            except (ValueError, struct.error):
+                index = None
+            if index is not None and index.checksum == checksum:
+                return index
+            if index is not None:
+                index.close()
+        compile_index(self.index_path, self.source)
+        return GazetteerIndex(self.index_path)
+
+    def lookup(self, key):
+        """Places whose folded name, alias or code is key, likeliest first"""
+        ids, _ = self.index.seek(key)
+        return [self.index.place(place_id) for place_id in ids]
+
+    def seek(self, key):
+        """Like lookup, also returning whether longer names start with key"""
+        ids, longer = self.index.seek(key)
+        return [self.index.place(place_id) for place_id in ids], longer
+
+    def close(self):
+        if self._index is not None:
+            self._index.close()
+            self._index = None
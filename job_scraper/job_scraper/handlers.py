@@ -0,0 +1,81 @@
+# Host override download handler
+#
+# Sends requests for chosen hosts to another address, such as the local mock
+# ATS server in benchmarks/mockats.py, while everything above the downloader
+# (spiders, middlewares, the dupefilter, download slots and throttling) keeps
+# seeing the real URLs. Only the connection changes: the request goes out over
+# plain HTTP to the override address with its original Host header, and the
+# response comes back under the original URL.
+
+from urllib.parse import urlsplit, urlunsplit
+
+from scrapy.core.downloader.handlers.http11 import HTTP11DownloadHandler
+from scrapy.utils.misc import build_from_crawler
+
+
+def parse_overrides(overrides):
+    """Map host patterns to "host:port" addresses, accepting "http://host:port" values too"""
+    parsed = {}
+    for pattern, address in overrides.items():
+        address = str(address)
+        if '://' in address:
+            address = urlsplit(address).netloc
+        parsed[pattern.lower()] = address
+    return parsed
+
+
+class HostOverrideDownloadHandler:
+    """HTTP(S) download handler that connects to HOST_OVERRIDES addresses instead of the real hosts.
+
+    HOST_OVERRIDES maps host names to "host:port" addresses. Keys can be exact
+    hosts ("api.lever.co"), subdomain wildcards ("*.greenhouse.io") or "*" for
+    every host. Requests for other hosts are downloaded normally. Register it
+    for both schemes:
+
+        DOWNLOAD_HANDLERS = {
+            "http": "job_scraper.handlers.HostOverrideDownloadHandler",
+            "https": "job_scraper.handlers.HostOverrideDownloadHandler",
+        }
+    """
+
+    # Built on the first request that needs it, like Scrapy's own handlers
+    lazy = True
+
+    def __init__(self, crawler):
+        self.overrides = parse_overrides(crawler.settings.getdict("HOST_OVERRIDES"))
+        self.http = build_from_crawler(HTTP11DownloadHandler, crawler)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def address_for(self, host):
+        host = (host or '').lower()
+        address = self.overrides.get(host)
+        if address is not None:
+            return address
+        # Most specific wildcard first
+        parts = host.split('.')
+        for index in range(1, len(parts)):
+            address = self.overrides.get('*.' + '.'.join(parts[index:]))
+            if address is not None:
+                return address
+        return self.overrides.get('*')
+
+    async def download_request(self, request):
+        parts = urlsplit(request.url)
+        address = self.address_for(parts.hostname)
+        if address is None:
+            return await self.http.download_request(request)
+
+        headers = request.headers.copy()
+        headers['Host'] = parts.netloc
+        overridden = request.replace(url=urlunsplit(('http', address, parts.path or '/', parts.query, '')),
+                                     headers=headers)
+        response = await self.http.download_request(overridden)
+        # download_latency and anything else the download recorded
+        request.meta.update(overridden.meta)
+        return response.replace(url=request.url)
+
+    async def close(self):
+        await self.http.close()
@@ -0,0 +1,207 @@
+# HTML to text for job descriptions
+#
+# Descriptions used to be built by selecting every text node under the
+# description element and joining them with spaces, which made a Selector
+# and a string per node and flattened paragraphs and lists into one line.
+# Here the lxml subtree is walked once, with iterwalk, into a list of blocks
+# (paragraph, list item or heading). The blocks are rendered as plain text,
+# one block per line and list items prefixed with "- ", or as Markdown.
+# Sections whose heading looks like a requirements heading can be split out
+# on the way.
+
+import re
+
+from lxml import etree, html
+
+# Elements that start a new block
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure',
+    'footer', 'form', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table',
+    'tbody', 'td', 'th', 'thead', 'tr', 'ul',
+})
+HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+BOLD_TAGS = frozenset({'b', 'strong'})
+ITALIC_TAGS = frozenset({'em', 'i'})
+# Elements whose content is never text
+SKIP_TAGS = frozenset({'button', 'iframe', 'noscript', 'script', 'select', 'style', 'svg', 'template'})
+
+# Block kinds
+PARAGRAPH, ITEM, HEADING = 'p', 'li', 'h'
+
+# Headings that open a requirements section
+REQUIREMENTS_HEADING = re.compile(
+    r"\b(requirements?|qualifications?|what you('ll| will)? (bring|need|have)|who you are|"
+    r"you (have|bring|should have)|must[- ]haves?|nice[- ]to[- ]haves?|skills|experience|about you)\b",
+    re.IGNORECASE,
+)
+# Pseudo-headings: short bold paragraphs, or short lines ending in a colon
+MAX_HEADING_LENGTH = 80
+
+
+def as_element(node):
+    """An lxml element for an element, a Selector or an HTML fragment string"""
+    if node is None:
+        return None
+    if isinstance(node, str):
+        if not node.strip():
+            return None
+        return html.fragment_fromstring(node, create_parent='div')
+    if hasattr(node, 'root'):
+        return node.root
+    return node
+
+
+class BlockBuilder:
+    """Accumulates inline text into blocks while the tree is walked"""
+
+    def __init__(self):
+        self.blocks = []
+        self.parts = []
+        self.kind = PARAGRAPH
+        self.level = 0
+        # Non-blank characters of the current block, and those inside <b>/<strong>,
+        # to spot bold pseudo-headings
+        self.bold_depth = 0
+        self.bold_chars = 0
+        self.chars = 0
+
+    def text(self, value):
+        if value:
+            self.parts.append(value)
+            length = len(value.strip())
+            self.chars += length
+            if self.bold_depth:
+                self.bold_chars += length
+
+    def markup(self, value):
+        # Markdown syntax, which does not count as text
+        self.parts.append(value)
+
+    def flush(self, kind=PARAGRAPH, level=0):
+        """End the current block and start one of the given kind"""
+        block_kind, block_level = self.kind, self.level
+        self.kind, self.level = kind, level
+        if not self.parts:
+            return
+        if self.chars:
+            line = ' '.join(''.join(self.parts).split())
+            if block_kind == PARAGRAPH and len(line) <= MAX_HEADING_LENGTH and (
+                self.bold_chars == self.chars or (line.endswith(':') and '.' not in line)
+            ):
+                block_kind, block_level = HEADING, 0
+            self.blocks.append((block_kind, block_level, line))
+        self.parts = []
+        self.bold_chars = self.chars = 0
+
+
+def html_blocks(node, markdown=False):
+    """Walk an element once and return its content as (kind, heading level, text) blocks"""
+    if isinstance(node, list):
+        # Every element a SelectorList matched, one after the other
+        return [block for element in node for block in html_blocks(element, markdown)]
+    root = as_element(node)
+    if root is None:
+        return []
+
+    builder = BlockBuilder()
+    walker = etree.iterwalk(root, events=('start', 'end', 'comment', 'pi'))
+    for event, element in walker:
+        if event in ('comment', 'pi'):
+            # Only the tail of a comment or processing instruction is text
+            builder.text(element.tail)
+            continue
+        # lxml's HTML parser lower-cases tag names
+        tag = element.tag
+
+        if event == 'start':
+            if tag in SKIP_TAGS:
+                walker.skip_subtree()
+                # iterwalk still reports the end of a skipped element
+                continue
+            if tag in HEADING_TAGS:
+                builder.flush(HEADING, HEADING_TAGS[tag])
+            elif tag == 'li':
+                builder.flush(ITEM)
+            elif tag in BLOCK_TAGS:
+                builder.flush()
+            elif tag == 'br':
+                builder.flush()
+            elif tag in BOLD_TAGS:
+                builder.bold_depth += 1
+                if markdown:
+                    builder.markup('**')
+            elif markdown and tag in ITALIC_TAGS:
+                builder.markup('*')
+            builder.text(element.text)
+        else:
+            if tag in SKIP_TAGS:
+                pass
+            elif tag in HEADING_TAGS or tag in BLOCK_TAGS:
+                builder.flush()
+            elif tag in BOLD_TAGS:
+                builder.bold_depth -= 1
+                if markdown:
+                    builder.markup('**')
+            elif markdown and tag in ITALIC_TAGS:
+                builder.markup('*')
+            elif markdown and tag == 'a' and element.get('href', '').startswith(('http://', 'https://', 'mailto:')):
+                builder.markup(f" <{element.get('href')}>")
+            if element is not root:
+                builder.text(element.tail)
+    builder.flush()
+    return builder.blocks
+
+
+def render_text(blocks):
+    """One block per line, list items prefixed with "- " """
+    return '\n'.join(f"- {text}" if kind == ITEM else text for kind, _, text in blocks)
+
+
+def render_markdown(blocks):
+    lines = []
+    previous = None
+    for kind, level, text in blocks:
+        if kind == HEADING:
+            line = f"{'#' * max(level, 3)} {text.strip('*').rstrip(':')}"
+        elif kind == ITEM:
+            line = f"- {text}"
+        else:
+            line = text
+        # List items stay on consecutive lines, everything else is separated by a blank line
+        if lines:
+            lines.append('' if not (kind == ITEM and previous == ITEM) else None)
+        lines.append(line)
+        previous = kind
+    return '\n'.join(line for line in lines if line is not None)
+
+
+def split_requirements(blocks):
+    """Split blocks into (description blocks, requirements blocks) at requirements headings"""
+    description, requirements = [], []
+    target = description
+    for block in blocks:
+        if block[0] == HEADING:
+            target = requirements if REQUIREMENTS_HEADING.search(block[2]) else description
+        target.append(block)
+    return description, requirements
+
+
+def html_to_text(node, markdown=False):
+    """Text of an element, all of a SelectorList's elements or an HTML fragment, keeping paragraph and list breaks"""
+    blocks = html_blocks(node, markdown)
+    return render_markdown(blocks) if markdown else render_text(blocks)
+
+
+def normalize_description(node, markdown=False, split=True):
+    """Return (description, requirements) for a description element or HTML fragment.
+
+    With split, sections under requirements-like headings ("Requirements",
+    "What you'll bring", ...) go to requirements; otherwise requirements is
+    empty.
+    """
+    blocks = html_blocks(node, markdown)
+    render = render_markdown if markdown else render_text
+    if not split:
+        return render(blocks), ''
+    description, requirements = split_requirements(blocks)
+    return render(description), render(requirements)
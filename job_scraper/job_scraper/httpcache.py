@@ -0,0 +1,140 @@
+# On-disk response cache used by ConditionalCacheMiddleware
+#
+# Responses are kept in a single SQLite file keyed by request fingerprint,
+# with zlib-compressed bodies and the ETag/Last-Modified validators needed to
+# revalidate them. The file is bounded in size by evicting the least recently
+# used entries.
+
+import json
+import sqlite3
+import time
+import zlib
+
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+
+
+class CachedEntry:
+    def __init__(self, url, status, headers, body, etag, last_modified, stored_at):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def to_response(self, request, flags):
+        headers = Headers(self.headers)
+        respcls = responsetypes.from_args(headers=headers, url=self.url, body=self.body)
+        return respcls(
+            url=self.url,
+            status=self.status,
+            headers=headers,
+            body=self.body,
+            request=request,
+            flags=flags,
+        )
+
+
+class ConditionalCacheStorage:
+    """SQLite-backed response store with LRU eviction by total body size"""
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                fingerprint TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def load(self, fingerprint):
+        row = self.conn.execute(
+            "SELECT url, status, headers, body, etag, last_modified, stored_at "
+            "FROM responses WHERE fingerprint = ?",
+            (fingerprint,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        self.conn.execute(
+            "UPDATE responses SET accessed_at = ? WHERE fingerprint = ?", (time.time(), fingerprint)
+        )
+        url, status, headers, body, etag, last_modified, stored_at = row
+        return CachedEntry(
+            url, status, json.loads(headers), zlib.decompress(body), etag, last_modified, stored_at
+        )
+
+    def store(self, fingerprint, response):
+        headers = {
+            key.decode('latin-1'): [value.decode('latin-1') for value in values]
+            for key, values in response.headers.items()
+        }
+        body = zlib.compress(response.body)
+        now = time.time()
+
+        self.delete(fingerprint)
+        self.conn.execute(
+            "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                fingerprint,
+                response.url,
+                response.status,
+                json.dumps(headers),
+                body,
+                response.headers.get('ETag', b'').decode('latin-1') or None,
+                response.headers.get('Last-Modified', b'').decode('latin-1') or None,
+                now,
+                now,
+                len(body),
+            ),
+        )
+        self.total_bytes += len(body)
+        self.evict()
+        self.conn.commit()
+
+    def refresh(self, fingerprint):
+        """Mark an entry as freshly validated after a 304"""
+        self.conn.execute(
+            "UPDATE responses SET stored_at = ? WHERE fingerprint = ?", (time.time(), fingerprint)
+        )
+
+    def delete(self, fingerprint):
+        row = self.conn.execute(
+            "SELECT size FROM responses WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+        if row is not None:
+            self.conn.execute("DELETE FROM responses WHERE fingerprint = ?", (fingerprint,))
+            self.total_bytes -= row[0]
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        if self.total_bytes <= self.max_bytes:
+            return
+
+        rows = self.conn.execute("SELECT fingerprint, size FROM responses ORDER BY accessed_at")
+        evicted = []
+        for fingerprint, size in rows:
+            if self.total_bytes <= self.max_bytes:
+                break
+            evicted.append((fingerprint,))
+            self.total_bytes -= size
+        rows.close()
+        self.conn.executemany("DELETE FROM responses WHERE fingerprint = ?", evicted)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,42 @@
+# Stable posting identities
+#
+# The same posting is reachable under several URLs (query strings, tracking
+# parameters, trailing slashes), so state that outlives a single crawl is keyed
+# by the ATS posting ID wherever the URL exposes one.
+
+import re
+from urllib.parse import parse_qs, urlsplit
+
+LEVER_PATH = re.compile(r'^/[^/]+/([0-9a-fA-F-]{36})')
+GREENHOUSE_PATH = re.compile(r'/jobs/(\d+)')
+GETRO_PATH = re.compile(r'/jobs/([^/?#]+)')
+
+
+def posting_key(url):
+    """Return a stable key for a posting URL, e.g. 'lever:<uuid>' or 'greenhouse:<id>'"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+
+    if host.endswith('lever.co'):
+        match = LEVER_PATH.match(parts.path)
+        if match:
+            return f"lever:{match.group(1).lower()}"
+
+    # Greenhouse boards embedded on a custom careers domain tell postings apart
+    # only by gh_jid, so it is read whatever the host
+    gh_jid = parse_qs(parts.query).get('gh_jid')
+    if gh_jid:
+        return f"greenhouse:{gh_jid[0]}"
+
+    if host.endswith('greenhouse.io'):
+        match = GREENHOUSE_PATH.search(parts.path)
+        if match:
+            return f"greenhouse:{match.group(1)}"
+
+    if host.startswith('jobs.'):
+        # Getro boards live on jobs.{domain} and end job paths with the job slug
+        match = GETRO_PATH.search(parts.path)
+        if match:
+            return f"getro:{match.group(1)}"
+
+    return f"{host}{parts.path.rstrip('/')}"
@@ -0,0 +1,171 @@
+# Crawl timing histograms shared by the timing middlewares
+#
+# TimingDownloaderMiddleware and TimingSpiderMiddleware record into a single
+# TimingRecorder per crawler. Every measurement is tagged with the spider,
+# host and callback it belongs to, aggregated into fixed-bucket histograms, and
+# written out as a JSON report when the spider closes. Optionally the same
+# histograms are served in Prometheus text format on a local port so long
+# batch crawls can be watched while they run.
+
+import json
+import os
+import time
+from bisect import bisect_left
+
+from scrapy import signals
+from scrapy.utils.project import data_path
+
+# Upper bounds of the histogram buckets; the last bucket is unbounded
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = tuple(1024 * 4 ** power for power in range(10))
+
+# Metric name -> (help text, bucket bounds)
+METRICS = {
+    'queue_wait_seconds': ('Time between scheduling a request and the downloader picking it up', SECONDS_BUCKETS),
+    'throttle_wait_seconds': ('Time a request waited for a free download slot', SECONDS_BUCKETS),
+    'download_latency_seconds': ('Time to receive response headers once the download started', SECONDS_BUCKETS),
+    'response_size_bytes': ('Response body size', BYTES_BUCKETS),
+    'callback_cpu_seconds': ('CPU time spent in spider callbacks per response', SECONDS_BUCKETS),
+    'callback_wall_seconds': ('Wall time spent in spider callbacks per response', SECONDS_BUCKETS),
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram with count, sum, min and max"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, fraction):
+        """Estimate a quantile by interpolating inside the bucket that contains it"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.quantile(0.50),
+            'p90': self.quantile(0.90),
+            'p99': self.quantile(0.99),
+            'buckets': {
+                str(bound): count for bound, count in zip(list(self.bounds) + ['+Inf'], self.counts)
+            },
+        }
+
+
+class TimingRecorder:
+    """Histograms keyed by metric and (spider, host, callback) labels"""
+
+    def __init__(self, report_path=None, prometheus_port=0):
+        self.report_path = report_path
+        self.prometheus_port = prometheus_port
+        self.histograms = {}
+        self.started = time.time()
+        self.listener = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        """Return the crawler's shared recorder, creating it on first use"""
+        recorder = getattr(crawler, 'timing_recorder', None)
+        if recorder is None:
+            settings = crawler.settings
+            recorder = cls(
+                report_path=data_path(settings.get('TIMING_REPORT_PATH', 'timing-report.json')),
+                prometheus_port=settings.getint('TIMING_PROMETHEUS_PORT', 0),
+            )
+            crawler.timing_recorder = recorder
+            crawler.signals.connect(recorder.spider_opened, signal=signals.spider_opened)
+            crawler.signals.connect(recorder.spider_closed, signal=signals.spider_closed)
+        return recorder
+
+    def observe(self, metric, value, spider, host, callback):
+        key = (metric, spider, host or '', callback or '')
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(METRICS[metric][1])
+        histogram.observe(value)
+
+    def report(self):
+        metrics = {}
+        for (metric, spider, host, callback), histogram in sorted(self.histograms.items()):
+            entry = histogram.to_dict()
+            entry.update(spider=spider, host=host, callback=callback)
+            metrics.setdefault(metric, []).append(entry)
+        return {
+            'started': self.started,
+            'finished': time.time(),
+            'metrics': metrics,
+        }
+
+    def prometheus_text(self):
+        lines = []
+        for metric, (help_text, _) in METRICS.items():
+            name = f'job_scraper_{metric}'
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (key_metric, spider, host, callback), histogram in sorted(self.histograms.items()):
+                if key_metric != metric:
+                    continue
+                labels = f'spider="{spider}",host="{host}",callback="{callback}"'
+                cumulative = 0
+                for bound, count in zip(list(histogram.bounds) + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def spider_opened(self, spider):
+        if self.prometheus_port and self.listener is None:
+            from twisted.internet import reactor
+            from twisted.web.resource import Resource
+            from twisted.web.server import Site
+
+            recorder = self
+
+            class MetricsResource(Resource):
+                isLeaf = True
+
+                def render_GET(self, request):
+                    request.setHeader(b'Content-Type', b'text/plain; version=0.0.4')
+                    return recorder.prometheus_text().encode('utf-8')
+
+            self.listener = reactor.listenTCP(self.prometheus_port, Site(MetricsResource()), interface='127.0.0.1')
+            spider.logger.info(f"Serving timing metrics on http://127.0.0.1:{self.prometheus_port}/metrics")
+
+    def spider_closed(self, spider):
+        if self.listener is not None:
+            self.listener.stopListening()
+            self.listener = None
+
+        if self.report_path:
+            os.makedirs(os.path.dirname(self.report_path) or '.', exist_ok=True)
+            with open(self.report_path, 'w', encoding='utf-8') as f:
+                json.dump(self.report(), f, indent=2)
+            spider.logger.info(f"Timing report written to {self.report_path}")
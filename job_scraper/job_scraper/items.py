@@ -3,7 +3,14 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
 
+import sys
+from collections.abc import KeysView
+from datetime import datetime
+from types import MappingProxyType
+
 import scrapy
+from itemadapter import ItemAdapter
+from itemadapter.adapter import AdapterInterface
 
 
 class JobItem(scrapy.Item):
@@ -19,4 +26,143 @@ class JobItem(scrapy.Item):
     requirements = scrapy.Field()
     company = scrapy.Field()
     source = scrapy.Field()  # e.g. 'lever' or 'greenhouse'
+    date_posted = scrapy.Field()  # when the source says the job was posted, if it does
     scraped_at = scrapy.Field()
+    status = scrapy.Field()  # 'closed' once a posting drops off its board in incremental crawls
+    duplicate_group = scrapy.Field()  # key of the first posting in a near-duplicate cluster
+    seen_on = scrapy.Field()  # sources the posting's cluster has been seen on
+    locations = scrapy.Field()  # canonical {city, region, country} places parsed from location
+    remote = scrapy.Field()  # whether location says the job is remote
+
+
+def to_timestamp(value):
+    """Seconds since the epoch for an ISO timestamp string, datetime or number"""
+    if value is None or isinstance(value, float):
+        return value
+    if isinstance(value, int):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+
+class LeanJobItem:
+    """Compact alternative to JobItem for crawls that hold many items in memory.
+
+    Fields live in __slots__ instead of a per-item dict, repeated categorical
+    values such as company, source and location are interned so all items
+    share one string object per value, and scraped_at is kept as a float and
+    only formatted as an ISO string when read. It supports the same mapping
+    operations as JobItem, and LeanJobItemAdapter makes ItemAdapter, the
+    pipelines and the feed exporters treat it like one.
+    """
+
+    fields = JobItem.fields
+    __slots__ = tuple(JobItem.fields)
+
+    # Low-cardinality fields whose values repeat across most items
+    INTERNED = frozenset({
+        'employment_type', 'workplace_type', 'location', 'department', 'company', 'source', 'status',
+    })
+
+    def __init__(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    @classmethod
+    def from_item(cls, item):
+        return cls(ItemAdapter(item).items())
+
+    def __getitem__(self, key):
+        if key not in self.fields:
+            raise KeyError(key)
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+        if key == 'scraped_at' and value is not None:
+            return datetime.fromtimestamp(value).isoformat()
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.fields:
+            raise KeyError(f"{self.__class__.__name__} does not support field: {key}")
+        if key == 'scraped_at':
+            value = to_timestamp(value)
+        elif key in self.INTERNED and type(value) is str:
+            value = sys.intern(value)
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        if key not in self.fields:
+            raise KeyError(key)
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self.fields and hasattr(self, key)
+
+    def __iter__(self):
+        return (key for key in self.__slots__ if hasattr(self, key))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def __eq__(self, other):
+        if not isinstance(other, LeanJobItem):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+
+class LeanJobItemAdapter(AdapterInterface):
+    """ItemAdapter support for LeanJobItem"""
+
+    @classmethod
+    def is_item_class(cls, item_class):
+        return issubclass(item_class, LeanJobItem)
+
+    @classmethod
+    def get_field_meta_from_class(cls, item_class, field_name):
+        return MappingProxyType(item_class.fields[field_name])
+
+    @classmethod
+    def get_field_names_from_class(cls, item_class):
+        return list(item_class.fields)
+
+    def field_names(self):
+        return KeysView(self.item.fields)
+
+    def __getitem__(self, field_name):
+        return self.item[field_name]
+
+    def __setitem__(self, field_name, value):
+        self.item[field_name] = value
+
+    def __delitem__(self, field_name):
+        del self.item[field_name]
+
+    def __iter__(self):
+        return iter(self.item)
+
+    def __len__(self):
+        return len(self.item)
+
+
+ItemAdapter.ADAPTER_CLASSES.appendleft(LeanJobItemAdapter)
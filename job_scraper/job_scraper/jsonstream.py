@@ -0,0 +1,230 @@
+# Streaming reader for large JSON API responses
+#
+# Board APIs return every posting in one document, often several megabytes
+# for large companies. response.json() decodes the whole body into one string
+# and builds the whole tree before a callback sees its first posting, so a
+# 10k-posting board briefly holds ten thousand dicts on top of the text.
+# iter_json_items yields the postings one at a time instead:
+#
+# - The array of postings is located by walking a memoryview over the body.
+#   Members before it, like facets or paging metadata, are stepped over
+#   without being decoded: long strings by jumping to their closing quote
+#   with the buffer's own find(), a memchr scan, everything else a run at a
+#   time with compiled patterns.
+# - Postings are decoded by the json module's C scanner from a text window of
+#   WINDOW_SIZE bytes, decoded straight from the memoryview. A posting that
+#   runs past the window moves the window up to it, growing it if a single
+#   posting is larger.
+#
+# Only one posting is ever decoded at a time. Fields a spider does not use are
+# dropped as each posting is decoded; the C scanner decodes a field faster
+# than Python code can step over it.
+
+import json
+import re
+
+WS = rb'[ \t\n\r]*'
+WS_PATTERN = re.compile(WS)
+# An object key without escapes, with its colon, up to the value
+MEMBER_PATTERN = re.compile(rb'"([^"\\]{0,80})"' + WS + b':' + WS)
+COLON_PATTERN = re.compile(WS + b':' + WS)
+# Anything up to the next bracket or long string
+FLAT_PATTERN = re.compile(rb'(?:[^"\[\]{}]+|"[^"\\]{0,80}")*')
+# What follows a value inside an object
+DELIMITER_PATTERN = re.compile(WS + rb'([,\]}])' + WS)
+SCALAR_PATTERN = re.compile(rb'[^\s,\]}]+')
+QUOTE_PATTERN = re.compile(b'"')
+# What follows an array element in a decoded text window
+TEXT_DELIMITER_PATTERN = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+
+raw_decode = json.JSONDecoder().raw_decode
+
+# Bytes of the body decoded into text at a time
+WINDOW_SIZE = 1 << 18
+
+BOM = b'\xef\xbb\xbf'
+QUOTE, BACKSLASH = ord('"'), ord('\\')
+OPEN_OBJECT, CLOSE_OBJECT = ord('{'), ord('}')
+OPEN_ARRAY, CLOSE_ARRAY = ord('['), ord(']')
+
+
+class JSONStream:
+    """Read-only cursor over a JSON document held in a bytes-like buffer"""
+
+    def __init__(self, buffer, window_size=WINDOW_SIZE):
+        self.view = memoryview(buffer).cast('B')
+        self.start = len(BOM) if self.view[:len(BOM)] == BOM else 0
+        self.window_size = window_size
+        # bytes, bytearray and mmap search in C; a bare memoryview has no find()
+        find = getattr(buffer, 'find', None)
+        if find is not None and not isinstance(buffer, memoryview):
+            self.next_quote = lambda pos: find(b'"', pos)
+        else:
+            self.next_quote = self.search_quote
+
+    def search_quote(self, pos):
+        match = QUOTE_PATTERN.search(self.view, pos)
+        return match.start() if match else -1
+
+    def char(self, pos):
+        return self.view[pos] if pos < len(self.view) else None
+
+    def string_end(self, pos):
+        """Position just past the string whose opening quote is at pos"""
+        view, next_quote = self.view, self.next_quote
+        end = next_quote(pos + 1)
+        while end != -1 and view[end - 1] == BACKSLASH:
+            # The quote is escaped unless the backslashes before it pair up
+            slashes = 1
+            while view[end - 1 - slashes] == BACKSLASH:
+                slashes += 1
+            if not slashes % 2:
+                break
+            end = next_quote(end + 1)
+        if end == -1:
+            raise ValueError(f"Unterminated string at byte {pos}")
+        return end + 1
+
+    def container_end(self, pos):
+        """Position just past the object or array opening at pos"""
+        view = self.view
+        depth = 0
+        while True:
+            pos = FLAT_PATTERN.match(view, pos).end()
+            char = self.char(pos)
+            if char == QUOTE:
+                pos = self.string_end(pos)
+                continue
+            pos += 1
+            if char == OPEN_OBJECT or char == OPEN_ARRAY:
+                depth += 1
+            elif char is None:
+                raise ValueError("Unexpected end of document")
+            else:
+                depth -= 1
+                if not depth:
+                    return pos
+
+    def value_end(self, pos):
+        """Position just past the JSON value starting at pos"""
+        char = self.char(pos)
+        if char == QUOTE:
+            return self.string_end(pos)
+        if char == OPEN_OBJECT or char == OPEN_ARRAY:
+            return self.container_end(pos)
+        match = SCALAR_PATTERN.match(self.view, pos)
+        if match is None:
+            raise ValueError(f"Expected a value at byte {pos}")
+        return match.end()
+
+    def members(self, pos):
+        """Yield (key, value start) for the object starting at pos, skipping each value"""
+        view = self.view
+        if self.char(pos) != OPEN_OBJECT:
+            raise ValueError(f"Expected an object at byte {pos}")
+        pos = WS_PATTERN.match(view, pos + 1).end()
+        if self.char(pos) == CLOSE_OBJECT:
+            return
+        while True:
+            match = MEMBER_PATTERN.match(view, pos)
+            if match is not None:
+                key, start = match.group(1).decode('utf-8'), match.end()
+            else:
+                # A long key, or one with escapes
+                if self.char(pos) != QUOTE:
+                    raise ValueError(f"Expected an object key at byte {pos}")
+                key_end = self.string_end(pos)
+                colon = COLON_PATTERN.match(view, key_end)
+                if colon is None:
+                    raise ValueError(f"Expected ':' at byte {key_end}")
+                key, start = json.loads(bytes(view[pos:key_end])), colon.end()
+            yield key, start
+
+            end = self.value_end(start)
+            match = DELIMITER_PATTERN.match(view, end)
+            if match is None or match.group(1) == b']':
+                raise ValueError(f"Expected ',' or '}}' at byte {end}")
+            if match.group(1) == b'}':
+                return
+            pos = match.end()
+
+    def find(self, path):
+        """Start of the value at path (a sequence of object keys), or None if it is missing"""
+        pos = WS_PATTERN.match(self.view, self.start).end()
+        for name in path:
+            if self.char(pos) != OPEN_OBJECT:
+                return None
+            for key, start in self.members(pos):
+                if key == name:
+                    pos = start
+                    break
+            else:
+                return None
+        return pos
+
+    def window(self, pos, size):
+        """Decode up to size bytes from pos, stopping short of a split UTF-8 sequence"""
+        view = self.view
+        end = min(pos + size, len(view))
+        while end < len(view) and view[end] & 0xC0 == 0x80:
+            end -= 1
+        return str(view[pos:end], 'utf-8'), end
+
+    def items(self, pos):
+        """Yield the decoded elements of the array starting at pos"""
+        if self.char(pos) != OPEN_ARRAY:
+            raise ValueError(f"Expected an array at byte {pos}")
+        size = len(self.view)
+        window_size = self.window_size
+        # Byte position of the window's first character
+        base = WS_PATTERN.match(self.view, pos + 1).end()
+        if self.char(base) == CLOSE_ARRAY:
+            return
+        text, window_end = self.window(base, window_size)
+        index = 0
+        while True:
+            try:
+                item, end = raw_decode(text, index)
+                match = TEXT_DELIMITER_PATTERN.match(text, end)
+            except ValueError:
+                if window_end == size:
+                    raise
+                match = None
+            if match is None:
+                if window_end == size:
+                    raise ValueError(f"Expected ',' or ']' at byte {base + len(text[:end].encode('utf-8'))}")
+                # The element runs past the window: restart the window at the
+                # element, growing it if the element alone does not fit
+                if index:
+                    base += index if text.isascii() else len(text[:index].encode('utf-8'))
+                    base = WS_PATTERN.match(self.view, base).end()
+                else:
+                    window_size *= 2
+                text, window_end = self.window(base, window_size)
+                index = 0
+                continue
+
+            yield item
+            if match.group(1) == ']':
+                return
+            index = match.end()
+
+
+def iter_json_items(body, path=(), fields=None):
+    """Yield the items of the JSON array at path in body, one at a time.
+
+    body is a response or a bytes-like object holding UTF-8 JSON. path lists
+    the object keys leading to the array, e.g. ('results', 'jobs'); the empty
+    path is a top-level array. Object items keep only the keys in fields when
+    it is given. ValueError is raised, before any item is yielded, when path
+    is missing or does not hold an array, as a changed API or an error body
+    must not pass for an empty list; malformed JSON raises ValueError too.
+    """
+    stream = JSONStream(getattr(body, 'body', body))
+    pos = stream.find(path)
+    if pos is None or stream.char(pos) != OPEN_ARRAY:
+        raise ValueError(f"No array at {'.'.join(path) or 'the top level'}")
+    for item in stream.items(pos):
+        if fields is not None and isinstance(item, dict):
+            item = {key: value for key, value in item.items() if key in fields}
+        yield item
@@ -0,0 +1,190 @@
+"""Normalize free-text job locations against the offline gazetteer.
+
+Usage: python -m job_scraper.locations "Remote - US" "Toronto, ON; NYC"
+
+ATS location fields are free text: "San Francisco, CA", "Remote - US",
+"London or Berlin", "Toronto, ON, Canada; NYC". LocationNormalizer splits
+such a string into its places, resolves each against the gazetteer (see
+gazetteer.py) to a canonical city, region and country, and notes whether the
+job is remote. Results are memoized in an LRU cache: a few thousand distinct
+strings cover nearly every posting, so most items never reach the index.
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import namedtuple
+from functools import lru_cache
+
+from .gazetteer import Gazetteer, code_key, fold, is_code
+
+Location = namedtuple('Location', 'city region country')
+NormalizedLocation = namedtuple('NormalizedLocation', 'locations remote complete')
+
+EMPTY = NormalizedLocation((), False, False)
+
+# Separators between places; commas separate a place from its region and country instead
+SEPARATORS = re.compile(r'\s*(?:[;|/•·\n()\[\]+&]|\s[-–—:]\s|\s(?:or|and)\s)\s*', re.IGNORECASE)
+REMOTE_PATTERN = re.compile(
+    r'\b(?:remote|anywhere|worldwide|global(?:ly)?|distributed|work from home|wfh|telecommute|home[- ]based)\b',
+    re.IGNORECASE,
+)
+WORD = re.compile(r'[^\W_]+')
+# Words that can surround a place name without changing it
+FILLER_WORDS = frozenset({
+    'area', 'based', 'city', 'county', 'first', 'flexible', 'friendly', 'from', 'fully', 'greater', 'hq',
+    'headquarters', 'hybrid', 'in', 'location', 'locations', 'metro', 'metropolitan', 'multiple', 'of', 'office',
+    'offices', 'ok', 'on', 'only', 'onsite', 'province', 'region', 'site', 'state', 'the', 'time', 'timezone',
+    'within', 'world', 'zone',
+})
+# Longer strings are sentences rather than locations, and are not worth a cache slot
+MAX_LOCATION_LENGTH = 120
+
+
+def location_for(place):
+    if place.kind == 'city':
+        return Location(place.city, place.region, place.country)
+    return Location(None, place.region, place.country)
+
+
+def qualifies(place, qualifier):
+    """Whether qualifier (a region or country) names where place is"""
+    if place.kind not in ('city', 'region') or qualifier.country != place.country:
+        return False
+    if qualifier.kind == 'country':
+        return True
+    return qualifier.kind == 'region' and place.kind == 'city' and qualifier.region_code == place.region_code
+
+
+class LocationNormalizer:
+    """Parse free-text locations into canonical places and a remote flag"""
+
+    def __init__(self, gazetteer=None, cache_size=4096):
+        self.gazetteer = gazetteer or Gazetteer()
+        self.parse = lru_cache(maxsize=cache_size)(self._parse)
+
+    def match(self, text):
+        """Return text if it is nothing but a location naming at least one place, else None"""
+        text = text.strip()
+        if not text or len(text) > MAX_LOCATION_LENGTH:
+            return None
+        result = self.parse(text)
+        return text if result.complete and result.locations else None
+
+    def resolve(self, text):
+        """Return (candidate lists for the places named in text, whether every word was understood)"""
+        text = text.strip(' .,-–—:')
+        if not text:
+            return [], True
+        if is_code(text):
+            places = self.gazetteer.lookup(code_key(text))
+            if places:
+                return [places], True
+
+        words = [(word, fold(word)) for word in WORD.findall(text)]
+        words = [(word, folded) for word, folded in words if folded]
+        matches = []
+        complete = True
+        i = 0
+        while i < len(words):
+            word, folded = words[i]
+            if is_code(word):
+                places = self.gazetteer.lookup(code_key(word))
+                if places:
+                    matches.append(places)
+                    i += 1
+                    continue
+
+            # Longest name starting at this word, extended while the index has longer names
+            best, end, phrase = None, i, folded
+            while True:
+                places, longer = self.gazetteer.seek(phrase)
+                if places:
+                    best = (end + 1, places)
+                if not longer or end + 1 >= len(words):
+                    break
+                end += 1
+                phrase = f"{phrase} {words[end][1]}"
+            if best is not None:
+                i, places = best
+                matches.append(places)
+                continue
+
+            if folded not in FILLER_WORDS:
+                complete = False
+            i += 1
+        return matches, complete
+
+    def _parse(self, text):
+        if not text or len(text) > MAX_LOCATION_LENGTH:
+            return EMPTY
+        locations = []
+        remote = False
+        complete = True
+
+        def add(place):
+            location = location_for(place)
+            if location not in locations:
+                locations.append(location)
+
+        for segment in SEPARATORS.split(text):
+            if REMOTE_PATTERN.search(segment):
+                remote = True
+                segment = REMOTE_PATTERN.sub(' ', segment)
+            # Candidates for the place being built, and a name the gazetteer does not know
+            pending, unknown = None, None
+            for part in segment.split(','):
+                matches, understood = self.resolve(part)
+                if not matches:
+                    # After a known place, an unknown part is most likely a region we do not list
+                    if not understood and not pending:
+                        unknown = part.strip()
+                    continue
+                if not understood:
+                    complete = False
+                for candidates in matches:
+                    if pending:
+                        narrowed = [place for place in pending if any(qualifies(place, q) for q in candidates)]
+                        if narrowed:
+                            pending = narrowed
+                            continue
+                    if unknown:
+                        # "Smallville, KS": an unlisted city, placed by its region or country
+                        qualifier = next((q for q in candidates if q.kind == 'region'), candidates[0])
+                        if qualifier.kind in ('region', 'country'):
+                            location = Location(unknown, qualifier.region, qualifier.country)
+                            if location not in locations:
+                                locations.append(location)
+                            unknown = None
+                            continue
+                    if pending:
+                        add(pending[0])
+                    pending, unknown = candidates, None
+            if pending:
+                add(pending[0])
+            if unknown:
+                complete = False
+        return NormalizedLocation(tuple(locations), remote, complete)
+
+
+default_normalizer = LocationNormalizer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("locations", nargs="+", help="free-text locations to normalize")
+    args = parser.parse_args(argv)
+
+    for text in args.locations:
+        result = default_normalizer.parse(text)
+        print(json.dumps({
+            "location": text,
+            "locations": [location._asdict() for location in result.locations],
+            "remote": result.remote,
+        }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
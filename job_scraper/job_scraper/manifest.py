@@ -0,0 +1,51 @@
+# Company manifests for batch crawls
+#
+# A manifest lists one (platform, company, domain) target per row, either as a
+# CSV file with a header row or as JSON lines:
+#
+#     platform,company,domain
+#     lever,immuta,immuta.com
+#     greenhouse,nomadhealth,nomadhealth.com
+#
+#     {"platform": "getro", "company": "4pt0", "domain": "4pt0.org"}
+#
+# An optional url column gives the board URL for platforms that cannot derive
+# it from the company, such as Workday career sites.
+
+import csv
+import json
+import os
+
+FIELDS = ('platform', 'company', 'domain', 'url')
+
+
+def read_manifest(path):
+    """Yield manifest rows as dicts with platform, company, domain and url keys"""
+    _, ext = os.path.splitext(path)
+
+    with open(path, newline='', encoding='utf-8') as f:
+        if ext.lower() in ('.jsonl', '.json', '.ndjson'):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+
+        for row in rows:
+            platform = (row.get('platform') or '').strip().lower()
+            company = (row.get('company') or '').strip()
+            if not platform or not company:
+                continue
+            yield {
+                'platform': platform,
+                'company': company,
+                'domain': (row.get('domain') or '').strip() or None,
+                'url': (row.get('url') or '').strip() or None,
+            }
+
+
+def write_manifest(path, rows):
+    """Write manifest rows as a CSV file read_manifest can load"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({field: row.get(field) or '' for field in FIELDS})
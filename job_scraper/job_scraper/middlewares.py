@@ -3,11 +3,21 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import os
+import time
+
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.project import data_path
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+from .httpcache import ConditionalCacheStorage
+from .instrumentation import TimingRecorder
+from .throttle import ERROR_STATUSES, ThrottlePolicy, ThrottleStateStore, retry_after_seconds
+
 
 class LeverScraperSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -101,3 +111,372 @@ class LeverScraperDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class ConditionalCacheMiddleware:
+    """Revalidate cached board and detail pages with conditional GETs.
+
+    Responses are stored on disk by request fingerprint. While an entry is
+    younger than its host's TTL it is served without touching the network;
+    after that the request is sent with If-None-Match/If-Modified-Since and a
+    304 is turned back into the cached response, so callbacks see the same
+    response they would have got from a full download.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("CONDITIONAL_CACHE_ENABLED"):
+            raise NotConfigured
+
+        path = data_path(settings.get("CONDITIONAL_CACHE_PATH", "conditional-cache.db"))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        storage = ConditionalCacheStorage(
+            path, settings.getint("CONDITIONAL_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+        )
+
+        s = cls(
+            crawler,
+            storage,
+            ttl=settings.getfloat("CONDITIONAL_CACHE_TTL", 0),
+            host_ttl=settings.getdict("CONDITIONAL_CACHE_HOST_TTL"),
+        )
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def __init__(self, crawler, storage, ttl=0, host_ttl=None):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.storage = storage
+        self.ttl = ttl
+        self.host_ttl = host_ttl or {}
+
+    def fingerprint(self, request):
+        return self.crawler.request_fingerprinter.fingerprint(request).hex()
+
+    def is_cacheable(self, request):
+        return request.method == "GET" and not request.meta.get("dont_cache", False)
+
+    def ttl_for(self, request):
+        host = urlparse_cached(request).hostname or ""
+        return float(self.host_ttl.get(host, self.ttl))
+
+    def process_request(self, request, spider):
+        if not self.is_cacheable(request):
+            return None
+
+        entry = self.storage.load(self.fingerprint(request))
+        if entry is None:
+            self.stats.inc_value("conditional_cache/miss")
+            return None
+
+        # Still within the host's TTL: skip the network entirely
+        if time.time() - entry.stored_at < self.ttl_for(request):
+            self.stats.inc_value("conditional_cache/fresh")
+            return entry.to_response(request, flags=["cached"])
+
+        if entry.etag:
+            request.headers.setdefault("If-None-Match", entry.etag)
+        if entry.last_modified:
+            request.headers.setdefault("If-Modified-Since", entry.last_modified)
+        return None
+
+    def process_response(self, request, response, spider):
+        if "cached" in response.flags or not self.is_cacheable(request):
+            return response
+
+        fingerprint = self.fingerprint(request)
+
+        if response.status == 304:
+            entry = self.storage.load(fingerprint)
+            if entry is not None:
+                self.stats.inc_value("conditional_cache/revalidated")
+                self.storage.refresh(fingerprint)
+                return entry.to_response(request, flags=["cached", "revalidated"])
+            return response
+
+        if response.status == 200:
+            # Without validators a stale entry could never be reused, so only keep
+            # responses that can be revalidated or are served from TTL
+            has_validators = b"ETag" in response.headers or b"Last-Modified" in response.headers
+            if has_validators or self.ttl_for(request) > 0:
+                self.stats.inc_value("conditional_cache/store")
+                self.storage.store(fingerprint, response)
+
+        return response
+
+    def spider_closed(self, spider):
+        self.storage.close()
+
+
+class AdaptiveThrottleMiddleware:
+    """Adapt each host's download delay and concurrency, with a circuit breaker.
+
+    Replaces a flat DOWNLOAD_DELAY (leave AutoThrottle disabled). Delay and
+    concurrency are applied to the host's download slot after every response,
+    requests to a host whose circuit is open fail fast with IgnoreRequest so
+    they do not hold crawl-wide concurrency, and learned states are saved when
+    the spider closes and used to create the slots of the next run.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("THROTTLE_ENABLED"):
+            raise NotConfigured
+
+        policy = ThrottlePolicy(
+            start_delay=settings.getfloat("THROTTLE_START_DELAY", 0.5),
+            min_delay=settings.getfloat("THROTTLE_MIN_DELAY", 0.0),
+            max_delay=settings.getfloat("THROTTLE_MAX_DELAY", 60.0),
+            target_concurrency=settings.getfloat("THROTTLE_TARGET_CONCURRENCY", 2.0),
+            start_concurrency=settings.getint("THROTTLE_START_CONCURRENCY", 2),
+            max_concurrency=settings.getint("THROTTLE_MAX_CONCURRENCY", 8),
+            failure_threshold=settings.getint("THROTTLE_FAILURE_THRESHOLD", 3),
+            cooldown=settings.getfloat("THROTTLE_COOLDOWN", 30.0),
+            max_cooldown=settings.getfloat("THROTTLE_MAX_COOLDOWN", 900.0),
+            max_retry_after=settings.getfloat("THROTTLE_MAX_RETRY_AFTER", 120.0),
+        )
+        store = ThrottleStateStore(data_path(settings.get("THROTTLE_STATE_PATH", "throttle-state.json")))
+
+        s = cls(crawler, policy, store)
+        crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def __init__(self, crawler, policy, store):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.policy = policy
+        self.store = store
+        self.states = {}
+
+    def spider_opened(self, spider):
+        self.states = self.store.load()
+        # New download slots are created from DOWNLOAD_SLOTS-style settings, so
+        # seed them with the learned rates
+        per_slot_settings = self.crawler.engine.downloader.per_slot_settings
+        for host, state in self.states.items():
+            slot_settings = per_slot_settings.setdefault(host, {})
+            slot_settings["delay"] = state.delay
+            slot_settings["concurrency"] = state.concurrency
+        if self.states:
+            spider.logger.info(f"Loaded learned throttle state for {len(self.states)} hosts")
+
+    def spider_closed(self, spider):
+        self.store.save(self.states)
+
+    def slot_key(self, request):
+        return request.meta.get("download_slot") or urlparse_cached(request).hostname or ""
+
+    def state_for(self, key):
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = self.policy.new_state()
+        return state
+
+    def apply(self, key, state):
+        slot = self.crawler.engine.downloader.slots.get(key)
+        if slot is not None:
+            slot.delay = state.delay
+            slot.concurrency = state.concurrency
+
+    def process_request(self, request, spider=None):
+        key = self.slot_key(request)
+        if not self.policy.allow(self.state_for(key), time.time()):
+            self.stats.inc_value("throttle/circuit_rejected")
+            raise IgnoreRequest(f"Circuit open for {key}")
+        return None
+
+    def process_response(self, request, response, spider=None):
+        if "cached" in response.flags:
+            return response
+
+        key = self.slot_key(request)
+        state = self.state_for(key)
+        if response.status in ERROR_STATUSES:
+            retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+            self.failure(key, state, f"HTTP {response.status}", retry_after)
+        else:
+            self.policy.on_success(state, request.meta.get("download_latency"))
+        self.apply(key, state)
+        return response
+
+    def process_exception(self, request, exception, spider=None):
+        if isinstance(exception, IgnoreRequest):
+            return None
+        key = self.slot_key(request)
+        state = self.state_for(key)
+        self.failure(key, state, type(exception).__name__)
+        self.apply(key, state)
+        return None
+
+    def failure(self, key, state, reason, retry_after=None):
+        self.stats.inc_value("throttle/failures")
+        if self.policy.on_failure(state, time.time(), retry_after):
+            self.stats.inc_value("throttle/circuit_opened")
+            self.crawler.spider.logger.warning(
+                f"Circuit opened for {key} after {reason}; "
+                f"requests fail fast for {state.open_until - time.time():.0f}s"
+            )
+            self.drain(key)
+
+    def drain(self, key):
+        """Fail the requests already waiting in the host's slot instead of letting them trickle out"""
+        slot = self.crawler.engine.downloader.slots.get(key)
+        if slot is None:
+            return
+        while slot.queue:
+            request, deferred = slot.queue.popleft()
+            self.stats.inc_value("throttle/circuit_rejected")
+            deferred.errback(IgnoreRequest(f"Circuit open for {key}"))
+
+
+def timing_labels(request, spider):
+    """Spider, host and callback name a measurement is tagged with"""
+    # Batch crawls route every callback through dispatch(), so use the real one
+    callback = request.meta.get("batch_callback") or getattr(request.callback, "__name__", None) or "parse"
+    return spider.name, urlparse_cached(request).hostname, callback
+
+
+class TimingDownloaderMiddleware:
+    """Record queue wait, throttle wait, download latency and response size per request.
+
+    Queue wait runs from the scheduler accepting a request until it reaches the
+    downloader. Throttle wait is the rest of the time spent in the downloader
+    minus the download latency Scrapy measures, so it is dominated by slot
+    delay and concurrency limits (it also includes body transfer after the
+    headers arrive).
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("TIMING_ENABLED"):
+            raise NotConfigured
+        s = cls(TimingRecorder.from_crawler(crawler))
+        crawler.signals.connect(s.request_scheduled, signal=signals.request_scheduled)
+        crawler.signals.connect(s.request_reached_downloader, signal=signals.request_reached_downloader)
+        crawler.signals.connect(s.response_downloaded, signal=signals.response_downloaded)
+        return s
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def request_scheduled(self, request, spider):
+        request.meta["timing_scheduled"] = time.time()
+
+    def request_reached_downloader(self, request, spider):
+        now = time.time()
+        request.meta["timing_reached_downloader"] = now
+        scheduled = request.meta.get("timing_scheduled")
+        if scheduled is not None:
+            self.recorder.observe("queue_wait_seconds", now - scheduled, *timing_labels(request, spider))
+
+    def response_downloaded(self, response, request, spider):
+        request.meta["timing_downloaded"] = time.time()
+
+    def process_response(self, request, response, spider):
+        labels = timing_labels(request, spider)
+        self.recorder.observe("response_size_bytes", len(response.body), *labels)
+
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            self.recorder.observe("download_latency_seconds", latency, *labels)
+
+            reached = request.meta.get("timing_reached_downloader")
+            downloaded = request.meta.get("timing_downloaded")
+            if reached is not None and downloaded is not None:
+                self.recorder.observe("throttle_wait_seconds", max(0.0, downloaded - reached - latency), *labels)
+        return response
+
+
+class TimingSpiderMiddleware:
+    """Record CPU and wall time spent inside spider callbacks.
+
+    Callbacks are generators, so the time is accumulated around each step of
+    the callback's output rather than around the call itself. Keep this
+    middleware closest to the spider so only the callback is measured.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("TIMING_ENABLED"):
+            raise NotConfigured
+        return cls(TimingRecorder.from_crawler(crawler))
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def process_spider_output(self, response, result, spider):
+        cpu = wall = 0.0
+        iterator = iter(result)
+        try:
+            while True:
+                cpu_started = time.process_time()
+                wall_started = time.perf_counter()
+                try:
+                    output = next(iterator)
+                finally:
+                    cpu += time.process_time() - cpu_started
+                    wall += time.perf_counter() - wall_started
+                yield output
+        except StopIteration:
+            pass
+        finally:
+            self.record(response, spider, cpu, wall)
+
+    async def process_spider_output_async(self, response, result, spider):
+        cpu = wall = 0.0
+        iterator = result.__aiter__()
+        try:
+            while True:
+                cpu_started = time.process_time()
+                wall_started = time.perf_counter()
+                try:
+                    output = await iterator.__anext__()
+                finally:
+                    cpu += time.process_time() - cpu_started
+                    wall += time.perf_counter() - wall_started
+                yield output
+        except StopAsyncIteration:
+            pass
+        finally:
+            self.record(response, spider, cpu, wall)
+
+    def record(self, response, spider, cpu, wall):
+        labels = timing_labels(response.request, spider)
+        self.recorder.observe("callback_cpu_seconds", cpu, *labels)
+        self.recorder.observe("callback_wall_seconds", wall, *labels)
+
+
+class ResumeStartMiddleware:
+    """Skip the start requests an interrupted crawl already sent.
+
+    Start requests are sent with dont_filter=True, so the scheduler never
+    checks them against the dupefilter and a resumed crawl would fetch every
+    board again. With JOBDIR and CompanyBloomDupeFilter, this records each
+    start request in its company's filter and drops the ones recorded before;
+    the requests that followed from them come back from the disk queue.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.get("JOBDIR"):
+            raise NotConfigured
+        return cls(crawler)
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    async def process_start(self, start):
+        # The scheduler, and so the dupefilter, is only created when the spider opens
+        df = getattr(self.crawler, "company_dupefilter", None)
+        skipped = 0
+        async for request in start:
+            if df is not None and df.persistent and not is_item(request) and df.request_seen(request):
+                skipped += 1
+                continue
+            yield request
+        if skipped:
+            self.crawler.stats.inc_value("resume/start_requests_skipped", skipped)
+            self.crawler.spider.logger.info(f"Resumed crawl: skipped {skipped} start requests sent before")
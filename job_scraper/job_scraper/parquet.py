@@ -0,0 +1,221 @@
+# Columnar Parquet export
+#
+# Items are buffered column by column and turned into Arrow record batches of
+# a configurable size, each written as one Parquet row group. Categorical
+# fields (company, source, location, ...) are dictionary-encoded, so each
+# distinct value is stored once per row group and loads back as a pandas
+# category, and scraped_at is a real timestamp column. Only the current batch
+# of each open file is held in memory.
+#
+# ParquetDatasetWriter partitions the output Hive-style by source and crawl
+# date (source=lever/date=2026-10-18/...), which pyarrow, pandas, DuckDB and
+# Spark all read as a dataset with source and date columns. ParquetItemExporter writes a single file for
+# the FEEDS setting, e.g. -o jobs.parquet.
+
+import os
+from datetime import datetime
+from urllib.parse import quote
+
+from scrapy.exceptions import NotConfigured
+from scrapy.exporters import BaseItemExporter
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Low-cardinality fields, stored dictionary-encoded
+CATEGORICAL_FIELDS = ('employment_type', 'workplace_type', 'location', 'department', 'company', 'source', 'status')
+TEXT_FIELDS = ('title', 'url', 'description', 'requirements', 'date_posted', 'duplicate_group')
+LIST_FIELDS = ('seen_on',)
+TIMESTAMP_FIELDS = ('scraped_at',)
+# Set by LocationPipeline
+PLACE_FIELDS = ('locations',)
+BOOL_FIELDS = ('remote',)
+FIELDS = (
+    TEXT_FIELDS[:2] + CATEGORICAL_FIELDS + TEXT_FIELDS[2:] + TIMESTAMP_FIELDS + LIST_FIELDS + PLACE_FIELDS + BOOL_FIELDS
+)
+
+
+def require_pyarrow():
+    if pyarrow is None:
+        raise NotConfigured("Parquet export requires the pyarrow package (pip install 'job-scraper[parquet]')")
+
+
+def job_schema():
+    """Arrow schema of exported items"""
+    types = {}
+    for field in CATEGORICAL_FIELDS:
+        types[field] = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    for field in TEXT_FIELDS:
+        types[field] = pyarrow.string()
+    for field in TIMESTAMP_FIELDS:
+        types[field] = pyarrow.timestamp('us')
+    for field in LIST_FIELDS:
+        types[field] = pyarrow.list_(pyarrow.string())
+    place = pyarrow.struct([('city', pyarrow.string()), ('region', pyarrow.string()), ('country', pyarrow.string())])
+    for field in PLACE_FIELDS:
+        types[field] = pyarrow.list_(place)
+    for field in BOOL_FIELDS:
+        types[field] = pyarrow.bool_()
+    return pyarrow.schema([(field, types[field]) for field in FIELDS])
+
+
+def text_value(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return '\n'.join(str(part) for part in value)
+    return str(value)
+
+
+def timestamp_value(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    return datetime.fromisoformat(value)
+
+
+def list_value(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [value]
+    return [str(part) for part in value]
+
+
+class RecordBatcher:
+    """Column buffers for up to batch_size records"""
+
+    def __init__(self, schema, batch_size):
+        self.schema = schema
+        self.batch_size = batch_size
+        self.columns = {field: [] for field in schema.names}
+        self.size = 0
+
+    def append(self, record):
+        """Buffer a record; return True once the batch is full"""
+        for field, column in self.columns.items():
+            value = record.get(field)
+            if field in TIMESTAMP_FIELDS:
+                value = timestamp_value(value)
+            elif field in LIST_FIELDS:
+                value = list_value(value)
+            elif field in PLACE_FIELDS:
+                value = list(value) if value is not None else None
+            elif field in BOOL_FIELDS:
+                value = bool(value) if value is not None else None
+            else:
+                value = text_value(value)
+            column.append(value)
+        self.size += 1
+        return self.size >= self.batch_size
+
+    def flush(self):
+        """Return the buffered records as a RecordBatch and empty the buffers"""
+        arrays = []
+        for field in self.schema:
+            values = self.columns[field.name]
+            if pyarrow.types.is_dictionary(field.type):
+                arrays.append(pyarrow.array(values, pyarrow.string()).dictionary_encode())
+            else:
+                arrays.append(pyarrow.array(values, field.type))
+        batch = pyarrow.RecordBatch.from_arrays(arrays, schema=self.schema)
+        self.columns = {field: [] for field in self.schema.names}
+        self.size = 0
+        return batch
+
+
+class ParquetFile:
+    """One Parquet file written a row group per batch, renamed into place when closed"""
+
+    def __init__(self, path, schema, batch_size, compression):
+        self.path = path
+        self.part_path = path + '.part'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.writer = pyarrow.parquet.ParquetWriter(self.part_path, schema, compression=compression)
+        self.batcher = RecordBatcher(schema, batch_size)
+        self.rows = 0
+
+    def write(self, record):
+        if self.batcher.append(record):
+            self.flush()
+
+    def flush(self):
+        if self.batcher.size:
+            self.rows += self.batcher.size
+            self.writer.write_batch(self.batcher.flush())
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        os.replace(self.part_path, self.path)
+
+
+def partition_dir(directory, source, date):
+    # Hive-style partition directories; values are URI-encoded as pyarrow expects
+    return os.path.join(directory, f"source={quote(source or 'unknown', safe='')}", f"date={date}")
+
+
+class ParquetDatasetWriter:
+    """Write records to a Parquet dataset partitioned by source and crawl date"""
+
+    def __init__(self, directory, prefix, batch_size=10000, compression='zstd', date=None):
+        require_pyarrow()
+        self.directory = directory
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.compression = compression
+        self.date = date or datetime.now().date().isoformat()
+        # source is a partition column, so not repeated inside the files
+        schema = job_schema()
+        self.schema = schema.remove(schema.get_field_index('source'))
+        # source -> open ParquetFile
+        self.files = {}
+
+    def write(self, record):
+        source = record.get('source')
+        parquet_file = self.files.get(source)
+        if parquet_file is None:
+            path = os.path.join(partition_dir(self.directory, source, self.date), f"{self.prefix}.parquet")
+            parquet_file = ParquetFile(path, self.schema, self.batch_size, self.compression)
+            self.files[source] = parquet_file
+        parquet_file.write(record)
+
+    def close(self):
+        for parquet_file in self.files.values():
+            parquet_file.close()
+        return {parquet_file.path: parquet_file.rows for parquet_file in self.files.values()}
+
+
+class ParquetItemExporter(BaseItemExporter):
+    """Feed exporter writing items to a single Parquet file, a row group per batch.
+
+    Register it with FEED_EXPORTERS = {"parquet": "job_scraper.parquet.ParquetItemExporter"};
+    the batch size and compression can be set per feed with the batch_size and
+    compression feed options.
+    """
+
+    def __init__(self, file, batch_size=10000, compression='zstd', **kwargs):
+        require_pyarrow()
+        super().__init__(dont_fail=True, **kwargs)
+        self.file = file
+        self.schema = job_schema()
+        self.batcher = RecordBatcher(self.schema, batch_size)
+        self.compression = compression
+        self.writer = None
+
+    def start_exporting(self):
+        self.writer = pyarrow.parquet.ParquetWriter(self.file, self.schema, compression=self.compression)
+
+    def export_item(self, item):
+        record = dict(self.get_serialized_fields(item))
+        if self.batcher.append(record):
+            self.writer.write_batch(self.batcher.flush())
+
+    def finish_exporting(self):
+        if self.batcher.size:
+            self.writer.write_batch(self.batcher.flush())
+        self.writer.close()
@@ -0,0 +1,9 @@
+# Stateless extractors for ATS job pages, keyed by platform
+#
+# Importing this package registers the built-in extractors. Spiders route a
+# page with extractor_for_url(url) or get_extractor(platform) and call its
+# extract(response, company), which reads schema.org JSON-LD when the page
+# embeds it and falls back to the platform's own parse_detail.
+
+from .registry import EXTRACTORS, Extractor, extractor_for_url, get_extractor, platform_for_url, register
+from . import bamboohr, greenhouse, jsonld, lever, workday  # noqa: F401,E402
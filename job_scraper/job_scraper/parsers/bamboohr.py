@@ -0,0 +1,66 @@
+import re
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from ..items import JobItem
+from .registry import Extractor, register
+
+# /careers/123, /careers/123/detail or the older /jobs/view.php?id=123
+JOB_ID = re.compile(r'/careers/(\d+)|[?&]id=(\d+)')
+
+# BambooHR's locationType codes
+WORKPLACE_TYPES = {'0': 'on-site', '1': 'remote', '2': 'hybrid'}
+
+
+@register
+class BambooHRExtractor(Extractor):
+    """BambooHR careers sites, read through their careers JSON endpoints"""
+
+    platform = 'bamboohr'
+    hosts = ('bamboohr.com',)
+
+    def company_from_url(self, url):
+        return urlsplit(url).hostname.split('.')[0]
+
+    def detail_url(self, url):
+        match = JOB_ID.search(url)
+        if match is None:
+            raise ValueError(f"No job ID in BambooHR URL {url}")
+        return f"https://{urlsplit(url).netloc}/careers/{match.group(1) or match.group(2)}/detail"
+
+    def job_fields(self, opening):
+        """Map the fields shared by the careers list and detail entries"""
+        location = opening.get('location') or {}
+        ats_location = opening.get('atsLocation') or {}
+        parts = [
+            location.get('city') or ats_location.get('city'),
+            location.get('state') or ats_location.get('state') or ats_location.get('province'),
+            location.get('addressCountry') or ats_location.get('country'),
+        ]
+        workplace_type = WORKPLACE_TYPES.get(str(opening.get('locationType')))
+        if workplace_type is None and opening.get('isRemote'):
+            workplace_type = 'remote'
+
+        return {
+            'title': opening.get('jobOpeningName'),
+            'employment_type': opening.get('employmentStatusLabel'),
+            'workplace_type': workplace_type,
+            'location': ', '.join(part for part in parts if part) or None,
+            'department': opening.get('departmentLabel'),
+        }
+
+    def parse_detail(self, response, company=None):
+        opening = ((response.json().get('result') or {}).get('jobOpening')) or {}
+        match = JOB_ID.search(response.url)
+        url = opening.get('jobOpeningShareUrl') or f"https://{urlsplit(response.url).netloc}/careers/{match.group(1) or match.group(2)}"
+        description, requirements = self.description_from_html(opening.get('description'))
+
+        return JobItem(
+            **self.job_fields(opening),
+            url = url,
+            description = description,
+            requirements = requirements,
+            company = company or self.company_from_url(response.url),
+            source = self.platform,
+            scraped_at = datetime.now().isoformat()
+        )
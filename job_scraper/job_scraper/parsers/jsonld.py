@@ -0,0 +1,142 @@
+# schema.org JobPosting extractor
+#
+# Many career sites, including ones without a dedicated extractor, describe
+# each job in a <script type="application/ld+json"> block. The blocks are
+# found with plain substring searches over the page text rather than by
+# building a DOM, so trying JSON-LD first costs little even on pages that turn
+# out not to have any.
+
+import json
+from datetime import datetime
+
+from ..items import JobItem
+from .registry import Extractor, register
+
+SCRIPT_TYPE = 'application/ld+json'
+
+# schema.org jobLocationType values
+WORKPLACE_TYPES = {'TELECOMMUTE': 'remote'}
+
+
+def json_ld_blocks(text):
+    """Yield the contents of every JSON-LD script element in an HTML document"""
+    start = text.find(SCRIPT_TYPE)
+    while start != -1:
+        open_end = text.find('>', start)
+        if open_end == -1:
+            return
+        close = text.find('</script', open_end)
+        if close == -1:
+            return
+        yield text[open_end + 1:close]
+        start = text.find(SCRIPT_TYPE, close)
+
+
+def is_job_posting(node):
+    node_type = node.get('@type')
+    if isinstance(node_type, list):
+        return 'JobPosting' in node_type
+    return node_type == 'JobPosting'
+
+
+def job_postings(text):
+    """Yield every schema.org JobPosting object embedded in an HTML document"""
+    for block in json_ld_blocks(text):
+        try:
+            # strict=False lets through the raw newlines many sites leave in descriptions
+            data = json.loads(block, strict=False)
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+            elif isinstance(node, dict):
+                if is_job_posting(node):
+                    yield node
+                elif '@graph' in node:
+                    stack.append(node['@graph'])
+
+
+def as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def name_of(value):
+    """The name of a schema.org Thing, which may also be given as a plain string"""
+    if isinstance(value, dict):
+        return value.get('name')
+    return value
+
+
+def place_name(place):
+    """Readable location of a Place, e.g. "Berlin, BE, DE" """
+    if not isinstance(place, dict):
+        return place
+    address = place.get('address')
+    if isinstance(address, dict):
+        parts = (
+            address.get('addressLocality'),
+            address.get('addressRegion'),
+            name_of(address.get('addressCountry')),
+        )
+        text = ', '.join(part.strip() for part in parts if isinstance(part, str) and part.strip())
+        if text:
+            return text
+    elif isinstance(address, str) and address.strip():
+        return address.strip()
+    return place.get('name')
+
+
+@register
+class JsonLdExtractor(Extractor):
+    """schema.org JobPosting JSON-LD embedded in any job page"""
+
+    platform = 'jsonld'
+
+    def parse_detail(self, response, company=None):
+        """Return a JobItem from the page's first JobPosting, or None if it has none"""
+        text = getattr(response, 'text', None)
+        if not text or SCRIPT_TYPE not in text:
+            return None
+        posting = next(job_postings(text), None)
+        if posting is None:
+            return None
+
+        employment_types = [
+            value.replace('_', '-').capitalize()
+            for value in as_list(posting.get('employmentType')) if isinstance(value, str)
+        ]
+        location_types = [
+            WORKPLACE_TYPES.get(value.upper(), value.lower())
+            for value in as_list(posting.get('jobLocationType')) if isinstance(value, str)
+        ]
+        locations = [place_name(place) for place in as_list(posting.get('jobLocation'))]
+        if not any(locations):
+            # Remote postings often name only where applicants may live
+            locations = [name_of(area) for area in as_list(posting.get('applicantLocationRequirements'))]
+
+        description, requirements = self.description_from_html(posting.get('description'))
+        if isinstance(posting.get('qualifications'), str):
+            requirements = self.text_from_html(posting['qualifications'])
+
+        return JobItem(
+            title = posting.get('title'),
+            employment_type = ', '.join(employment_types) or None,
+            workplace_type = ', '.join(location_types) or None,
+            location = '; '.join(location for location in locations if location) or None,
+            department = posting.get('occupationalCategory') if isinstance(posting.get('occupationalCategory'), str) else None,
+            url = response.url,
+            description = description,
+            requirements = requirements,
+            company = company or name_of(posting.get('hiringOrganization')),
+            source = self.platform,
+            date_posted = posting.get('datePosted'),
+            scraped_at = datetime.now().isoformat()
+        )
+
+    def extract(self, response, company=None):
+        return self.parse_detail(response, company=company)
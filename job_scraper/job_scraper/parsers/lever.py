@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from ..items import JobItem
+from .registry import Extractor, register
+
+
+@register
+class LeverExtractor(Extractor):
+    """jobs.lever.co posting pages"""
+
+    platform = 'lever'
+    hosts = ('lever.co',)
+    fields = ('title', 'employment_type', 'workplace_type', 'location', 'department', 'description', 'requirements')
+
+    def parse_detail(self, response, company=None):
+        title = response.css(".posting-headline > h2::text").get()
+        location = response.css("div .location::text").get()
+        department = response.css("div .department::text").get()
+        workplaceType = response.css("div .workplaceTypes::text").get()
+        employmentType = response.css("div .commitment::text").get()
+
+        # Extract job description
+        description = self.text_from_html(response.xpath("//div[@data-qa='job-description']"))
+
+        # Extract requirements
+        requirements = '\n'.join(self.text_from_html(section) for section in response.css('ul.posting-requirements'))
+
+        return JobItem(
+            title = title,
+            employment_type = employmentType,
+            workplace_type = workplaceType,
+            location = location,
+            department = department,
+            url = response.url,
+            description = description,
+            requirements = requirements,
+            company = company or self.company_from_url(response.url),
+            source = self.platform,
+            scraped_at = datetime.now().isoformat()
+        )
@@ -0,0 +1,111 @@
+# Platform extractor registry
+#
+# Extractors are stateless objects that turn an ATS page into a JobItem. They
+# are registered under their platform name together with the hosts the
+# platform serves pages from, so any spider can route a URL to the right
+# extractor with a few dict lookups on the host's suffixes instead of a chain
+# of substring checks.
+
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from ..htmltext import html_to_text, normalize_description
+
+# platform -> extractor instance
+EXTRACTORS = {}
+# host suffix -> platform
+HOSTS = {}
+
+
+class Extractor:
+    """Base class for platform extractors"""
+
+    # Name the extractor is registered under, also used as the item source
+    platform = None
+    # Hosts, matched with all their subdomains, that serve this platform's pages
+    hosts = ()
+    # Item fields parse_detail reads from the page; when embedded JSON-LD
+    # already fills all of them, the CSS pass is skipped
+    fields = ()
+
+    def parse_detail(self, response, company=None):
+        """Return a JobItem for a job detail page"""
+        raise NotImplementedError
+
+    def extract(self, response, company=None):
+        """Return a JobItem for a job detail page, reading its JSON-LD before any CSS.
+
+        parse_detail only runs when the page has no JobPosting JSON-LD or when
+        it lacks some of the fields parse_detail would fill.
+        """
+        jsonld = EXTRACTORS.get('jsonld')
+        item = jsonld.parse_detail(response, company=company) if jsonld is not None else None
+        if item is None:
+            return self.parse_detail(response, company=company)
+
+        missing = [field for field in self.fields if not item.get(field)]
+        if missing:
+            fallback = self.parse_detail(response, company=company)
+            for field in missing:
+                if fallback.get(field):
+                    item[field] = fallback[field]
+        if not item.get('company'):
+            item['company'] = self.company_from_url(response.url)
+        item['source'] = self.platform
+        return item
+
+    def detail_url(self, url):
+        """The URL to fetch for a job page URL, e.g. a JSON endpoint behind a rendered page
+
+        Raises ValueError for a URL that does not point at a job on this platform.
+        """
+        return url
+
+    def company_from_url(self, url):
+        """The company slug a job URL belongs to, if the URL contains one"""
+        path = urlsplit(url).path.strip('/')
+        return path.split('/', 1)[0] or None
+
+    def text_from_html(self, markup):
+        """Text of an HTML fragment, one paragraph or list item per line"""
+        return html_to_text(markup)
+
+    def description_from_html(self, markup):
+        """(description, requirements) text of a description element or HTML fragment"""
+        return normalize_description(markup)
+
+
+def register(extractor_cls):
+    """Class decorator registering an extractor instance under its platform"""
+    extractor = extractor_cls()
+    EXTRACTORS[extractor.platform] = extractor
+    for host in extractor.hosts:
+        HOSTS[host.lower()] = extractor.platform
+    platform_for_host.cache_clear()
+    return extractor_cls
+
+
+def get_extractor(platform):
+    return EXTRACTORS.get(platform)
+
+
+@lru_cache(maxsize=4096)
+def platform_for_host(host):
+    """Look up a host and then each parent domain, e.g. a.b.lever.co, b.lever.co, lever.co"""
+    labels = host.lower().split('.')
+    for index in range(len(labels) - 1):
+        platform = HOSTS.get('.'.join(labels[index:]))
+        if platform is not None:
+            return platform
+    return None
+
+
+def platform_for_url(url):
+    """The registered platform serving a URL, or None"""
+    host = urlsplit(url).hostname
+    return platform_for_host(host) if host else None
+
+
+def extractor_for_url(url):
+    """The extractor for a URL's platform, or None"""
+    return EXTRACTORS.get(platform_for_url(url))
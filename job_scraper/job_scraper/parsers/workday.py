@@ -0,0 +1,73 @@
+import re
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from ..items import JobItem
+from .registry import Extractor, register
+
+# Career site paths may start with a locale: /en-US/External/job/...
+LOCALE = re.compile(r'^[a-z]{2}-[A-Z]{2}$')
+
+
+@register
+class WorkdayExtractor(Extractor):
+    """Workday career sites, read through their /wday/cxs JSON API"""
+
+    platform = 'workday'
+    hosts = ('myworkdayjobs.com', 'myworkdaysite.com', 'workday.com')
+
+    def site_parts(self, url):
+        """Return (host, tenant, site, rest of the path) for a career site URL"""
+        parts = urlsplit(url)
+        segments = [segment for segment in parts.path.split('/') if segment]
+        if segments[:2] == ['wday', 'cxs']:
+            if len(segments) < 4:
+                raise ValueError(f"No career site in Workday URL {url}")
+            return parts.netloc, segments[2], segments[3], segments[4:]
+        if segments and LOCALE.match(segments[0]):
+            segments = segments[1:]
+        if not segments:
+            raise ValueError(f"No career site in Workday URL {url}")
+        return parts.netloc, parts.netloc.split('.')[0], segments[0], segments[1:]
+
+    def api_url(self, url):
+        """The cxs API base for a career site, e.g. https://acme.wd5.myworkdayjobs.com/wday/cxs/acme/External"""
+        host, tenant, site, _ = self.site_parts(url)
+        return f"https://{host}/wday/cxs/{tenant}/{site}"
+
+    def detail_url(self, url):
+        host, tenant, site, rest = self.site_parts(url)
+        return f"https://{host}/wday/cxs/{tenant}/{site}/{'/'.join(rest)}"
+
+    def posting_url(self, url):
+        """The public job page for a career site or cxs API URL, without the locale
+
+        e.g. https://acme.wd5.myworkdayjobs.com/External/job/Remote/Engineer_R123
+        """
+        host, _, site, rest = self.site_parts(url)
+        return f"https://{host}/{site}/{'/'.join(rest)}"
+
+    def company_from_url(self, url):
+        return self.site_parts(url)[1]
+
+    def parse_detail(self, response, company=None):
+        data = response.json()
+        info = data.get('jobPostingInfo') or {}
+
+        locations = [info.get('location')] + list(info.get('additionalLocations') or [])
+        tenant = self.site_parts(response.url)[1]
+        url = info.get('externalUrl') or self.posting_url(response.url)
+        description, requirements = self.description_from_html(info.get('jobDescription'))
+
+        return JobItem(
+            title = info.get('title'),
+            employment_type = info.get('timeType'),
+            workplace_type = info.get('remoteType'),
+            location = '; '.join(location for location in locations if location) or None,
+            url = url,
+            description = description,
+            requirements = requirements,
+            company = company or (data.get('hiringOrganization') or {}).get('name') or tenant,
+            source = self.platform,
+            scraped_at = datetime.now().isoformat()
+        )
@@ -3,11 +3,432 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import os
+from datetime import datetime
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.exceptions import DropItem, NotConfigured
+from scrapy.utils.project import data_path
 
+from .changefeed import SnapshotIndex
+from .dedupe import DuplicateIndex, completeness, posting_words
+from .identity import posting_key
+from .gazetteer import Gazetteer
+from .items import JobItem, LeanJobItem
+from .locations import LocationNormalizer
+from .parquet import ParquetDatasetWriter, require_pyarrow
+from .search import SearchIndex
+from .shards import ShardWriter
+from .state import posting_list_complete
+
+
+class JsonLinesShardPipeline:
+    """Stream items to rotating, compressed JSON lines shards.
+
+    Enabled by setting JOBS_FEED_DIR. Each crawl writes
+    {spider}-{start time}-NNNNN.jsonl[.gz|.zst] shards plus a manifest, and
+    memory use stays flat however many items are written.
+    """
+
+    def __init__(self, directory, compression, max_items, max_bytes):
+        self.directory = directory
+        self.compression = compression
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.writer = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        directory = settings.get("JOBS_FEED_DIR")
+        if not directory:
+            raise NotConfigured
+        return cls(
+            directory,
+            compression=settings.get("JOBS_FEED_COMPRESSION", "gzip"),
+            max_items=settings.getint("JOBS_FEED_MAX_ITEMS", 50000),
+            max_bytes=settings.getint("JOBS_FEED_MAX_BYTES", 256 * 1024 * 1024),
+        )
+
+    def open_spider(self, spider):
+        prefix = f"{spider.name}-{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+        self.writer = ShardWriter(self.directory, prefix, self.compression, self.max_items, self.max_bytes)
+
+    def process_item(self, item, spider):
+        self.writer.write(ItemAdapter(item).asdict())
+        return item
+
+    def close_spider(self, spider):
+        self.writer.close()
+        spider.logger.info(f"Wrote {len(self.writer.shards)} shards to {self.directory}")
+
+
+class ParquetDatasetPipeline:
+    """Write items to a Parquet dataset partitioned by source and crawl date.
+
+    Enabled by setting PARQUET_DIR (needs pyarrow). Items are buffered into
+    Arrow record batches of PARQUET_BATCH_SIZE rows, each written as a row
+    group of {PARQUET_DIR}/source=.../date=.../{spider}-{start time}.parquet,
+    so memory use is bounded by the batch size rather than the crawl size.
+    """
+
+    def __init__(self, directory, batch_size, compression):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.compression = compression
+        self.writer = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        directory = settings.get("PARQUET_DIR")
+        if not directory:
+            raise NotConfigured
+        require_pyarrow()
+        return cls(
+            directory,
+            batch_size=settings.getint("PARQUET_BATCH_SIZE", 10000),
+            compression=settings.get("PARQUET_COMPRESSION", "zstd"),
+        )
+
+    def open_spider(self, spider):
+        started = datetime.now()
+        prefix = f"{spider.name}-{started.strftime('%Y%m%dT%H%M%S')}"
+        self.writer = ParquetDatasetWriter(
+            self.directory, prefix, self.batch_size, self.compression, date=started.date().isoformat()
+        )
+
+    def process_item(self, item, spider):
+        self.writer.write(ItemAdapter(item).asdict())
+        return item
+
+    def close_spider(self, spider):
+        files = self.writer.close()
+        spider.logger.info(f"Wrote {sum(files.values())} rows in {len(files)} Parquet files to {self.directory}")
+
+
+class NearDuplicatePipeline:
+    """Group postings that appear on several sources into duplicate clusters.
+
+    Enabled by setting DEDUPE_INDEX_PATH. In "flag" mode every item is kept and
+    duplicates carry duplicate_group and seen_on; in "merge" mode a duplicate
+    that is less complete than a record already emitted this run is dropped.
+    """
+
+    def __init__(self, path, mode, threshold, min_words, commit_every=500):
+        if mode not in ("flag", "merge"):
+            raise ValueError(f"Unknown DEDUPE_MODE {mode!r}, expected 'flag' or 'merge'")
+        self.path = path
+        self.mode = mode
+        self.threshold = threshold
+        self.min_words = min_words
+        self.commit_every = commit_every
+        self.index = None
+        self.run_id = None
+        self.pending = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        path = settings.get("DEDUPE_INDEX_PATH")
+        if not path:
+            raise NotConfigured
+        pipeline = cls(
+            data_path(path),
+            mode=settings.get("DEDUPE_MODE", "flag"),
+            threshold=settings.getfloat("DEDUPE_THRESHOLD", 0.8),
+            min_words=settings.getint("DEDUPE_MIN_WORDS", 20),
+        )
+        pipeline.stats = crawler.stats
+        return pipeline
+
+    def open_spider(self, spider):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.index = DuplicateIndex(self.path, threshold=self.threshold)
+        self.run_id = datetime.now().isoformat()
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        if adapter.get("status") == "closed" or not adapter.get("url"):
+            return item
+
+        # Titles alone are far too generic to tell postings apart
+        words = posting_words(adapter)
+        if len(words) < self.min_words:
+            self.stats.inc_value("dedupe/skipped_short")
+            return item
+
+        source = adapter.get("source") or spider.name
+        cluster, is_best, best_run, sources = self.index.add(
+            posting_key(adapter["url"]), words, source, completeness(adapter), self.run_id
+        )
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.index.commit()
+            self.pending = 0
+
+        adapter["seen_on"] = sorted(sources)
+        if cluster != posting_key(adapter["url"]) or len(sources) > 1:
+            adapter["duplicate_group"] = cluster
+            self.stats.inc_value("dedupe/duplicates")
+
+        if self.mode == "merge" and not is_best and best_run == self.run_id:
+            self.stats.inc_value("dedupe/dropped")
+            raise DropItem(f"Near-duplicate of a more complete posting in cluster {cluster}")
+        return item
+
+    def close_spider(self, spider):
+        self.index.close()
+
+
+class SearchIndexPipeline:
+    """Upsert items into a SQLite database with an FTS5 index for job search.
+
+    Enabled by setting SEARCH_INDEX_PATH. Items are written in batches of
+    SEARCH_INDEX_BATCH_SIZE per transaction and upserted by URL, so repeated
+    crawls update postings in place. Query it with python -m job_scraper.search.
+    With SEARCH_INDEX_OPTIMIZE the FTS index is merged when the spider closes,
+    which takes time in proportion to the whole index; otherwise merge it now
+    and then with python -m job_scraper.search --optimize.
+    """
+
+    def __init__(self, path, batch_size, optimize=False):
+        self.path = path
+        self.batch_size = batch_size
+        self.optimize = optimize
+        self.index = None
+        self.batch = []
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        path = settings.get("SEARCH_INDEX_PATH")
+        if not path:
+            raise NotConfigured
+        return cls(
+            data_path(path),
+            batch_size=settings.getint("SEARCH_INDEX_BATCH_SIZE", 1000),
+            optimize=settings.getbool("SEARCH_INDEX_OPTIMIZE"),
+        )
+
+    def open_spider(self, spider):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.index = SearchIndex(self.path)
 
-class JobScraperPipeline:
     def process_item(self, item, spider):
+        self.batch.append(ItemAdapter(item).asdict())
+        if len(self.batch) >= self.batch_size:
+            self.flush()
         return item
+
+    def flush(self):
+        if self.batch:
+            self.index.upsert(self.batch)
+            self.batch = []
+
+    def close_spider(self, spider):
+        self.flush()
+        if self.optimize:
+            self.index.optimize()
+        self.index.close()
+        spider.logger.info(f"Search index updated at {self.path}")
+
+
+class ChangeFeedPipeline:
+    """Write added/modified/removed events relative to the previous crawl.
+
+    Enabled by setting CHANGE_FEED_DIR. Items are compared field by field with
+    the snapshot kept in CHANGE_FEED_INDEX_PATH under their posting key, and
+    events are streamed to JSON lines shards:
+
+        {"event": "added", "key": ..., "url": ..., "item": {...}}
+        {"event": "modified", "key": ..., "url": ..., "changed": [...], "values": {...}}
+        {"event": "removed", "key": ..., "url": ...}
+
+    Postings of a company on a source that were not scraped this run count
+    as removed, but only for companies whose whole list on that source was
+    read in a crawl that finished; an interrupted crawl or a failed list
+    fetch removes nothing.
+    With INCREMENTAL_STATE_PATH set, unchanged postings are never scraped, so
+    only the spiders' closed items produce removals. Run it before a merging
+    NearDuplicatePipeline, whose dropped items would otherwise look removed.
+    """
+
+    def __init__(self, directory, index_path, compression, incremental, commit_every=1000):
+        self.directory = directory
+        self.index_path = index_path
+        self.compression = compression
+        self.incremental = incremental
+        self.commit_every = commit_every
+        self.index = None
+        self.writer = None
+        self.run_id = None
+        # (source, company) pairs scraped this run
+        self.scopes = set()
+        # (source, company) pairs whose whole posting list was read this run
+        self.listed = set()
+        self.pending = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        directory = settings.get("CHANGE_FEED_DIR")
+        if not directory:
+            raise NotConfigured
+        pipeline = cls(
+            directory,
+            index_path=data_path(settings.get("CHANGE_FEED_INDEX_PATH", "change-feed.db")),
+            compression=settings.get("CHANGE_FEED_COMPRESSION", "gzip"),
+            incremental=bool(settings.get("INCREMENTAL_STATE_PATH")),
+        )
+        pipeline.stats = crawler.stats
+        crawler.signals.connect(pipeline.list_complete, signal=posting_list_complete)
+        # Pipelines are closed before the close reason is known, so wrap up on spider_closed
+        crawler.signals.connect(pipeline.spider_closed, signal=signals.spider_closed)
+        return pipeline
+
+    def open_spider(self, spider):
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        self.index = SnapshotIndex(self.index_path)
+        self.run_id = datetime.now().isoformat()
+        prefix = f"{spider.name}-changes-{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+        self.writer = ShardWriter(self.directory, prefix, self.compression)
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        url = adapter.get("url")
+        if not url:
+            return item
+        key = posting_key(url)
+
+        if adapter.get("status") == "closed":
+            row = self.index.mark_removed(key)
+            if row is not None:
+                self.emit_removed(row)
+            return item
+
+        record = adapter.asdict()
+        event, changed = self.index.compare(key, record, self.run_id)
+        self.scopes.add((adapter.get("source"), adapter.get("company")))
+        if event == "added":
+            self.emit({"event": "added", "key": key, "url": url, "item": record})
+        elif event == "modified":
+            self.emit({
+                "event": "modified",
+                "key": key,
+                "url": url,
+                "changed": changed,
+                "values": {field: record.get(field) for field in changed},
+            })
+
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.index.commit()
+            self.pending = 0
+        return item
+
+    def emit(self, event):
+        event["at"] = self.run_id
+        self.writer.write(event)
+        self.stats.inc_value(f"change_feed/{event['event']}")
+
+    def emit_removed(self, row):
+        key, url, source, company = row
+        self.emit({"event": "removed", "key": key, "url": url, "source": source, "company": company})
+
+    def list_complete(self, spider, source, company):
+        self.listed.add((source, company))
+
+    def swept_scopes(self):
+        """(source, company) pairs scraped this run whose whole list was read
+
+        Getro items name their board and source first, as in "board / org"
+        and "getro / greenhouse", and are swept with their board's list.
+        """
+        return sorted(
+            (source, company) for source, company in self.scopes
+            if (str(source).split(" / ")[0], str(company).split(" / ")[0]) in self.listed
+        )
+
+    def spider_closed(self, spider, reason):
+        if self.index is None:
+            return
+        if not self.incremental:
+            if reason == "finished":
+                for row in self.index.sweep(self.swept_scopes(), self.run_id):
+                    self.emit_removed(row)
+            else:
+                spider.logger.info(f"Crawl {reason}, not reporting unseen postings as removed")
+        self.index.close()
+        self.writer.close()
+        spider.logger.info(f"Change feed written to {self.directory}")
+
+
+class LeanItemPipeline:
+    """Convert JobItems into slotted LeanJobItems as early as possible.
+
+    Enabled by setting LEAN_ITEMS. Place it before the other pipelines (e.g.
+    at 100) so every later stage, and anything buffering items, holds the
+    compact form.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("LEAN_ITEMS"):
+            raise NotConfigured
+        return cls()
+
+    def process_item(self, item, spider):
+        if isinstance(item, JobItem):
+            return LeanJobItem.from_item(item)
+        return item
+
+
+class LocationPipeline:
+    """Normalize free-text locations against the bundled gazetteer.
+
+    Enabled by setting LOCATION_NORMALIZATION. Each item's location is parsed
+    into locations, a list of canonical {city, region, country} places with
+    ISO country codes, and remote. Remote postings without a workplace_type
+    get "remote". Parsed strings are kept in an LRU cache of
+    LOCATION_CACHE_SIZE entries.
+    """
+
+    def __init__(self, index_path, cache_size):
+        self.normalizer = LocationNormalizer(Gazetteer(index_path), cache_size=cache_size)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("LOCATION_NORMALIZATION"):
+            raise NotConfigured
+        index_path = settings.get("LOCATION_INDEX_PATH")
+        pipeline = cls(
+            data_path(index_path) if index_path else None,
+            cache_size=settings.getint("LOCATION_CACHE_SIZE", 4096),
+        )
+        pipeline.stats = crawler.stats
+        return pipeline
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        location = adapter.get("location")
+        if not location or not isinstance(location, str):
+            return item
+
+        result = self.normalizer.parse(location.strip())
+        adapter["locations"] = [place._asdict() for place in result.locations]
+        adapter["remote"] = result.remote
+        if result.remote and not adapter.get("workplace_type"):
+            adapter["workplace_type"] = "remote"
+        if not result.locations and not result.remote:
+            self.stats.inc_value("location/unresolved")
+        return item
+
+    def close_spider(self, spider):
+        info = self.normalizer.parse.cache_info()
+        self.stats.set_value("location/cache_hits", info.hits)
+        self.stats.set_value("location/cache_misses", info.misses)
+        self.normalizer.gazetteer.close()
@@ -0,0 +1,296 @@
+"""Crawl a large manifest with several worker processes.
+
+Usage: python -m job_scraper.runner companies.csv [--workers 4] [--output jobs.jsonl]
+           [--work-dir .scrapy/runner] [--max-restarts 2] [--resume] [-s NAME=VALUE]
+
+The manifest is split into one shard per worker by hashing each company's ATS
+host, so every host is crawled by exactly one process and its download slot,
+throttle state and politeness limits stay in one place. Getro rows all go to
+the api.getro.com shard; only the apply pages they follow to Greenhouse or
+Lever can overlap with another shard. Each worker runs the batch_jobs spider
+over its shard with its own JOBDIR and output file. A worker that crashes or
+stops before its spider finishes is restarted and resumes from its JOBDIR.
+When all shards are done their items are merged into one JSON lines file and
+their stats are added up into run-stats.json.
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+import zlib
+from urllib.parse import urlsplit
+
+from scrapy.utils.project import get_project_settings
+
+from .manifest import read_manifest, write_manifest
+
+# The project directory holding scrapy.cfg, where workers are started
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def ats_host(row):
+    """The shared host a manifest row's requests go to, which decides its shard"""
+    platform, company = row['platform'], row['company']
+    if platform == 'lever':
+        return 'api.lever.co'
+    if platform == 'greenhouse':
+        return 'boards-api.greenhouse.io'
+    if platform == 'getro':
+        # Each board page has its own host, but every board pages through the collection API
+        return 'api.getro.com'
+    if row['url']:
+        return urlsplit(row['url']).hostname or row['url']
+    if platform == 'bamboohr':
+        return f"{company}.bamboohr.com"
+    return f"{platform}:{company}"
+
+
+def shard_index(row, workers):
+    return zlib.crc32(ats_host(row).lower().encode('utf-8')) % workers
+
+
+def split_manifest(path, workers):
+    """Group manifest rows into one list per worker"""
+    shards = [[] for _ in range(workers)]
+    for row in read_manifest(path):
+        shards[shard_index(row, workers)].append(row)
+    return shards
+
+
+class Shard:
+    """One worker's directory: manifest, JOBDIR, output, log and per-attempt stats"""
+
+    def __init__(self, path):
+        self.path = path
+        self.manifest = os.path.join(path, 'manifest.csv')
+        self.jobdir = os.path.join(path, 'jobdir')
+        self.items = os.path.join(path, 'items.jsonl')
+        self.log = os.path.join(path, 'crawl.log')
+        self.process = None
+        self.restarts = 0
+
+    def stats_files(self):
+        return sorted(glob.glob(os.path.join(self.path, 'stats-*.json')))
+
+    def stats(self):
+        result = []
+        for path in self.stats_files():
+            with open(path, encoding='utf-8') as f:
+                result.append(json.load(f))
+        return result
+
+    def finished(self):
+        """Whether the last attempt's spider closed normally"""
+        stats = self.stats()
+        return bool(stats) and stats[-1].get('finish_reason') == 'finished'
+
+    def command(self, extra_settings):
+        # A crashed attempt leaves no stats file, so its number is reused
+        attempt = len(self.stats_files())
+        command = [
+            sys.executable, '-m', 'scrapy', 'crawl', 'batch_jobs',
+            '-a', f"manifest={self.manifest}",
+            '-o', f"{self.items}:jsonlines",
+            '-s', f"JOBDIR={self.jobdir}",
+            '-s', f"STATS_FILE={os.path.join(self.path, f'stats-{attempt:02d}.json')}",
+            '-s', f"LOG_FILE={self.log}",
+        ]
+        for name, value in extra_settings:
+            command += ['-s', f"{name}={value}"]
+        return command
+
+
+def worker_settings(shard_number, overrides):
+    """Settings passed to every worker on top of the project settings"""
+    settings = get_project_settings()
+    for name, value in overrides:
+        settings.set(name, value, priority='cmdline')
+
+    extensions = settings.getdict('EXTENSIONS')
+    extensions['job_scraper.extensions.StatsFileExtension'] = 0
+    result = list(overrides) + [('EXTENSIONS', json.dumps(extensions))]
+
+    # Workers resume from their JOBDIR; keep their dupefilters on disk and
+    # skip the start requests a crashed attempt already sent
+    if settings.get('DUPEFILTER_CLASS') == 'scrapy.dupefilters.RFPDupeFilter':
+        result.append(('DUPEFILTER_CLASS', 'job_scraper.dupefilter.CompanyBloomDupeFilter'))
+    spider_middlewares = settings.getdict('SPIDER_MIDDLEWARES')
+    spider_middlewares.setdefault('job_scraper.middlewares.ResumeStartMiddleware', 50)
+    result.append(('SPIDER_MIDDLEWARES', json.dumps(spider_middlewares)))
+
+    # Host states are disjoint between shards; separate files keep workers
+    # from overwriting each other's learned rates
+    throttle_path = settings.get('THROTTLE_STATE_PATH')
+    if throttle_path:
+        root, ext = os.path.splitext(throttle_path)
+        result.append(('THROTTLE_STATE_PATH', f"{root}-shard{shard_number:02d}{ext}"))
+    return result
+
+
+def merge_items(shards, output):
+    """Concatenate shard outputs, dropping items repeated by resumed attempts"""
+    written = 0
+    with open(output, 'w', encoding='utf-8') as out:
+        for shard in shards:
+            if not os.path.exists(shard.items):
+                continue
+            # Only a shard's own attempts repeat its items; the same posting
+            # from two shards (e.g. a Getro job and its Greenhouse board) is
+            # kept, as a single batch run would
+            seen = set()
+            with open(shard.items, encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    key = (item.get('url'), item.get('status'))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    out.write(line if line.endswith('\n') else line + '\n')
+                    written += 1
+    return written
+
+
+def aggregate_stats(shards):
+    """Sum numeric stats over every shard and attempt"""
+    totals = {}
+    start_times, finish_times = [], []
+    reasons = {}
+    for shard in shards:
+        attempts = shard.stats()
+        for stats in attempts:
+            for name, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    totals[name] = totals.get(name, 0) + value
+            if stats.get('start_time'):
+                start_times.append(stats['start_time'])
+            if stats.get('finish_time'):
+                finish_times.append(stats['finish_time'])
+        reasons[os.path.basename(shard.path)] = {
+            'finish_reason': attempts[-1].get('finish_reason') if attempts else None,
+            'attempts': len(attempts),
+        }
+    totals = dict(sorted(totals.items()))
+    totals['start_time'] = min(start_times, default=None)
+    totals['finish_time'] = max(finish_times, default=None)
+    totals['shards'] = reasons
+    return totals
+
+
+def run(shards, extra_settings, max_restarts, poll_interval=1.0):
+    """Run a worker per unfinished shard until each one finishes or runs out of restarts"""
+    pending = [shard for shard in shards if not shard.finished()]
+    for shard in shards:
+        if shard not in pending:
+            print(f"{shard.path}: already finished, skipping")
+
+    def start(shard):
+        command = shard.command(extra_settings[shard])
+        shard.process = subprocess.Popen(command, cwd=PROJECT_DIR)
+
+    for shard in pending:
+        start(shard)
+
+    try:
+        while pending:
+            time.sleep(poll_interval)
+            for shard in list(pending):
+                code = shard.process.poll()
+                if code is None:
+                    continue
+                if code == 0 and shard.finished():
+                    print(f"{shard.path}: finished")
+                    pending.remove(shard)
+                elif shard.restarts < max_restarts:
+                    shard.restarts += 1
+                    print(f"{shard.path}: worker exited with {code} before finishing, "
+                          f"resuming (restart {shard.restarts}/{max_restarts})")
+                    start(shard)
+                else:
+                    print(f"{shard.path}: worker exited with {code}, giving up after {max_restarts} restarts")
+                    pending.remove(shard)
+    except KeyboardInterrupt:
+        # Let the workers shut down cleanly so their JOBDIRs can be resumed with --resume
+        for shard in pending:
+            if shard.process.poll() is None:
+                shard.process.send_signal(signal.SIGINT)
+        for shard in pending:
+            shard.process.wait()
+        raise
+
+    return all(shard.finished() for shard in shards)
+
+
+def parse_setting(value):
+    name, sep, setting = value.partition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {value!r}")
+    return name, setting
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('manifest', help='CSV or JSON lines manifest of companies')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--output', default='jobs.jsonl', help='merged JSON lines output')
+    parser.add_argument('--work-dir', default='.scrapy/runner', help='shard manifests, JOBDIRs, outputs and logs')
+    parser.add_argument('--max-restarts', type=int, default=2, help='restarts per worker before giving up')
+    parser.add_argument('--resume', action='store_true', help='continue the shards left in --work-dir')
+    parser.add_argument('-s', '--set', dest='settings', type=parse_setting, action='append', default=[],
+                        metavar='NAME=VALUE', help='setting passed to every worker')
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    manifest = os.path.abspath(args.manifest)
+    work_dir = os.path.abspath(args.work_dir)
+    output = os.path.abspath(args.output)
+
+    if args.resume:
+        shard_dirs = sorted(glob.glob(os.path.join(work_dir, 'shard-*')))
+        if not shard_dirs:
+            parser.error(f"nothing to resume in {work_dir}")
+        shards = [Shard(path) for path in shard_dirs]
+    else:
+        for path in glob.glob(os.path.join(work_dir, 'shard-*')):
+            shutil.rmtree(path)
+        shards = []
+        for number, rows in enumerate(split_manifest(manifest, args.workers)):
+            if not rows:
+                continue
+            shard = Shard(os.path.join(work_dir, f"shard-{number:02d}"))
+            os.makedirs(shard.path, exist_ok=True)
+            write_manifest(shard.manifest, rows)
+            shards.append(shard)
+            print(f"{shard.path}: {len(rows)} companies")
+
+    extra_settings = {
+        shard: worker_settings(int(os.path.basename(shard.path).split('-')[1]), args.settings)
+        for shard in shards
+    }
+    try:
+        ok = run(shards, extra_settings, args.max_restarts)
+    except KeyboardInterrupt:
+        print(f"Interrupted; continue with --resume --work-dir {args.work_dir}")
+        return 130
+
+    written = merge_items(shards, output)
+    stats = aggregate_stats(shards)
+    with open(os.path.join(work_dir, 'run-stats.json'), 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2, default=str)
+
+    print(f"Wrote {written} items from {len(shards)} shards to {output}")
+    print(f"Requests: {stats.get('downloader/request_count', 0)}, items: {stats.get('item_scraped_count', 0)}, "
+          f"errors: {stats.get('log_count/ERROR', 0)}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
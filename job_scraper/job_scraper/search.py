@@ -0,0 +1,215 @@
+"""Search scraped jobs in a local SQLite full-text index.
+
+Usage: python -m job_scraper.search [query] [--source lever] [--company acme]
+           [--workplace-type remote] [--since 2026-01-01] [--until 2026-02-01]
+           [--db .scrapy/jobs-search.db] [--limit 20] [--json]
+       python -m job_scraper.search --optimize [--db .scrapy/jobs-search.db]
+
+The database is written by SearchIndexPipeline. Queries use FTS5 syntax
+("data engineer", python AND NOT java, title:manager) and are ranked with
+BM25, weighting title matches above location and department matches, and
+those above description text. --optimize merges the index segments, which
+takes time in proportion to the whole index; run it after large crawls.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+COLUMNS = (
+    'url', 'title', 'employment_type', 'workplace_type', 'location', 'department',
+    'description', 'requirements', 'company', 'source', 'scraped_at', 'status',
+)
+# Order matters: bm25() weights below are positional over these columns
+TEXT_COLUMNS = ('title', 'description', 'requirements', 'location', 'department')
+RANK_WEIGHTS = (10.0, 1.0, 2.0, 3.0, 3.0)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    {', '.join(f'{column} TEXT' for column in COLUMNS[1:])}
+);
+CREATE INDEX IF NOT EXISTS jobs_source ON jobs (source, scraped_at);
+CREATE INDEX IF NOT EXISTS jobs_company ON jobs (company, scraped_at);
+CREATE INDEX IF NOT EXISTS jobs_workplace_type ON jobs (workplace_type, scraped_at);
+CREATE INDEX IF NOT EXISTS jobs_scraped_at ON jobs (scraped_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    {', '.join(TEXT_COLUMNS)},
+    content='jobs', content_rowid='id', tokenize='porter unicode61'
+);
+
+-- Keep the external-content FTS table in step with jobs
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts (rowid, {', '.join(TEXT_COLUMNS)})
+    VALUES (new.id, {', '.join(f'new.{column}' for column in TEXT_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, {', '.join(TEXT_COLUMNS)})
+    VALUES ('delete', old.id, {', '.join(f'old.{column}' for column in TEXT_COLUMNS)});
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF {', '.join(TEXT_COLUMNS)} ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, {', '.join(TEXT_COLUMNS)})
+    VALUES ('delete', old.id, {', '.join(f'old.{column}' for column in TEXT_COLUMNS)});
+    INSERT INTO jobs_fts (rowid, {', '.join(TEXT_COLUMNS)})
+    VALUES (new.id, {', '.join(f'new.{column}' for column in TEXT_COLUMNS)});
+END;
+"""
+
+UPSERT = f"""
+INSERT INTO jobs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})
+ON CONFLICT (url) DO UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in COLUMNS[1:])}
+"""
+
+# A closed posting only carries its url, company and source; keep the rest of the record
+CLOSE = """
+INSERT INTO jobs (url, company, source, scraped_at, status) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET status = excluded.status, scraped_at = excluded.scraped_at
+"""
+
+
+def column_value(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return '\n'.join(str(part) for part in value)
+    return str(value)
+
+
+class SearchIndex:
+    """SQLite jobs table with an FTS5 index over its text columns"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def upsert(self, records):
+        """Insert or update a batch of item dicts in one transaction"""
+        postings, closed = [], []
+        for record in records:
+            if record.get('status') == 'closed':
+                closed.append(tuple(column_value(record.get(column)) for column in
+                                    ('url', 'company', 'source', 'scraped_at', 'status')))
+            else:
+                postings.append(tuple(column_value(record.get(column)) for column in COLUMNS))
+        with self.conn:
+            self.conn.executemany(UPSERT, postings)
+            self.conn.executemany(CLOSE, closed)
+
+    def search(self, query=None, source=None, company=None, workplace_type=None,
+               since=None, until=None, include_closed=False, limit=20):
+        """Return matching jobs as dicts, best matches first (newest first without a query)"""
+        conditions, params = [], []
+        for column, value in (('source', source), ('company', company), ('workplace_type', workplace_type)):
+            if value:
+                conditions.append(f"jobs.{column} = ?")
+                params.append(value)
+        if since:
+            conditions.append("jobs.scraped_at >= ?")
+            params.append(since)
+        if until:
+            conditions.append("jobs.scraped_at < ?")
+            params.append(until)
+        if not include_closed:
+            conditions.append("jobs.status IS NOT 'closed'")
+
+        columns = "jobs.id, jobs.url, jobs.title, jobs.company, jobs.source, jobs.location, jobs.workplace_type, jobs.scraped_at"
+        if query:
+            weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+            sql = (
+                f"SELECT {columns}, bm25(jobs_fts, {weights}) AS rank "
+                "FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid WHERE jobs_fts MATCH ?"
+            )
+            params.insert(0, query)
+            order = "rank"
+        else:
+            sql = f"SELECT {columns} FROM jobs WHERE 1"
+            order = "jobs.scraped_at DESC"
+        for condition in conditions:
+            sql += f" AND {condition}"
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+
+        cursor = self.conn.execute(sql, params)
+        names = [description[0] for description in cursor.description]
+        results = [dict(zip(names, row)) for row in cursor]
+
+        if query and results:
+            # Snippets are only built for the rows returned, not for every match ranked
+            ids = [result['id'] for result in results]
+            snippets = dict(self.conn.execute(
+                "SELECT rowid, snippet(jobs_fts, 1, '[', ']', '...', 12) FROM jobs_fts "
+                f"WHERE jobs_fts MATCH ? AND rowid IN ({', '.join('?' for _ in ids)})",
+                [query] + ids,
+            ))
+            for result in results:
+                result['snippet'] = snippets.get(result['id'])
+        for result in results:
+            del result['id']
+        return results
+
+    def optimize(self):
+        """Merge the FTS index segments, which keeps queries fast after a large crawl"""
+        with self.conn:
+            self.conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('optimize')")
+
+    def close(self):
+        self.conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('query', nargs='?', help='FTS5 query; omit to list the newest postings')
+    parser.add_argument('--db', default='.scrapy/jobs-search.db', help='database written by SearchIndexPipeline')
+    parser.add_argument('--source', help='only postings from this source, e.g. lever')
+    parser.add_argument('--company', help='only postings from this company')
+    parser.add_argument('--workplace-type', help='e.g. remote, hybrid or on-site')
+    parser.add_argument('--since', help='only postings scraped at or after this ISO date')
+    parser.add_argument('--until', help='only postings scraped before this ISO date')
+    parser.add_argument('--include-closed', action='store_true', help='include postings that have closed')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='print JSON lines instead of a table')
+    parser.add_argument('--optimize', action='store_true', help='merge the index segments instead of searching')
+    args = parser.parse_args(argv)
+
+    # Opening a missing path would create an empty database and find nothing
+    if not os.path.exists(args.db):
+        parser.error(f"no search database at {args.db}; crawl with SEARCH_INDEX_PATH set first")
+    index = SearchIndex(args.db)
+    if args.optimize:
+        try:
+            index.optimize()
+        finally:
+            index.close()
+        print(f"Optimized {args.db}")
+        return 0
+    try:
+        results = index.search(
+            args.query, source=args.source, company=args.company, workplace_type=args.workplace_type,
+            since=args.since, until=args.until, include_closed=args.include_closed, limit=args.limit,
+        )
+    except sqlite3.OperationalError as e:
+        # FTS5 reports malformed queries as operational errors
+        parser.error(f"invalid query: {e}")
+    finally:
+        index.close()
+
+    for result in results:
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False))
+            continue
+        print(f"{result['title'] or ''} | {result['company'] or ''} | {result['location'] or ''} "
+              f"| {result['source'] or ''} | {(result['scraped_at'] or '')[:10]}")
+        print(f"    {result['url']}")
+        if result.get('snippet'):
+            print(f"    {result['snippet']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
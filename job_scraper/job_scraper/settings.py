@@ -46,13 +46,23 @@ ROBOTSTXT_OBEY = True
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 #SPIDER_MIDDLEWARES = {
 #    "job_scraper.middlewares.JobScraperSpiderMiddleware": 543,
+#    # Resumable crawls, see JOBDIR below
+#    "job_scraper.middlewares.ResumeStartMiddleware": 50,
+#    # Timing instrumentation, see TIMING_ENABLED below
+#    "job_scraper.middlewares.TimingSpiderMiddleware": 950,
 #}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
+DOWNLOADER_MIDDLEWARES = {
 #    "job_scraper.middlewares.JobScraperDownloaderMiddleware": 543,
-#}
+#    # Conditional-GET response cache, see CONDITIONAL_CACHE_ENABLED below
+#    "job_scraper.middlewares.ConditionalCacheMiddleware": 900,
+    # Adaptive per-host throttling, see THROTTLE_ENABLED below
+    "job_scraper.middlewares.AdaptiveThrottleMiddleware": 920,
+#    # Timing instrumentation, see TIMING_ENABLED below
+#    "job_scraper.middlewares.TimingDownloaderMiddleware": 950,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -63,7 +73,7 @@ ROBOTSTXT_OBEY = True
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 #ITEM_PIPELINES = {
-#    "job_scraper.pipelines.JobScraperPipeline": 300,
+#    "job_scraper.pipelines.JsonLinesShardPipeline": 300,
 #}
 
 # Enable and configure the AutoThrottle extension (disabled by default)
@@ -87,6 +97,134 @@ ROBOTSTXT_OBEY = True
 #HTTPCACHE_IGNORE_HTTP_CODES = []
 #HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
 
+# Hold items as slotted LeanJobItems with interned categorical values and a
+# float scraped_at (enable LeanItemPipeline in ITEM_PIPELINES first, e.g. at 100)
+#LEAN_ITEMS = True
+
+# Stream items to rotating, compressed JSON lines shards instead of a single
+# JSON array (enable JsonLinesShardPipeline in ITEM_PIPELINES above)
+#JOBS_FEED_DIR = "feeds"
+#JOBS_FEED_COMPRESSION = "gzip"  # or "zstd" (needs zstandard) or "none"
+#JOBS_FEED_MAX_ITEMS = 50000
+#JOBS_FEED_MAX_BYTES = 256 * 1024 * 1024
+
+# Columnar export (needs pyarrow): a Parquet dataset partitioned by source and
+# crawl date, written a row group of PARQUET_BATCH_SIZE items at a time
+# (enable ParquetDatasetPipeline in ITEM_PIPELINES above)
+#PARQUET_DIR = "parquet"
+#PARQUET_BATCH_SIZE = 10000
+#PARQUET_COMPRESSION = "zstd"  # or "snappy", "gzip", "none"
+
+# Cross-source near-duplicate detection (enable NearDuplicatePipeline in
+# ITEM_PIPELINES, before the feed pipeline, e.g. at 200). The MinHash/LSH
+# index persists across runs; "flag" annotates duplicates with
+# duplicate_group/seen_on, "merge" also drops the less complete copies
+#DEDUPE_INDEX_PATH = "dedupe.db"
+#DEDUPE_MODE = "flag"
+#DEDUPE_THRESHOLD = 0.8
+# Postings with fewer title + description words than this are not deduplicated
+#DEDUPE_MIN_WORDS = 20
+
+# Change feed: JSON lines events for postings added, modified (with the changed
+# field names) or removed since the previous crawl (enable ChangeFeedPipeline in
+# ITEM_PIPELINES, before a merging NearDuplicatePipeline)
+#CHANGE_FEED_DIR = "changes"
+#CHANGE_FEED_INDEX_PATH = "change-feed.db"
+#CHANGE_FEED_COMPRESSION = "gzip"
+
+# Full-text search database (enable SearchIndexPipeline in ITEM_PIPELINES);
+# query it with: python -m job_scraper.search "data engineer" --source lever
+#SEARCH_INDEX_PATH = "jobs-search.db"
+#SEARCH_INDEX_BATCH_SIZE = 1000
+# Merge the FTS index at the end of every crawl, which costs time in proportion
+# to the whole index (or run python -m job_scraper.search --optimize now and then)
+#SEARCH_INDEX_OPTIMIZE = True
+
+# Conditional-GET response cache: revalidate board and detail pages with
+# ETag/Last-Modified instead of downloading them again (enable
+# ConditionalCacheMiddleware in DOWNLOADER_MIDDLEWARES above)
+#CONDITIONAL_CACHE_ENABLED = True
+#CONDITIONAL_CACHE_PATH = "conditional-cache.db"
+#CONDITIONAL_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Seconds a cached response is reused without revalidating, globally and per host
+#CONDITIONAL_CACHE_TTL = 0
+#CONDITIONAL_CACHE_HOST_TTL = {
+#    "api.lever.co": 3600,
+#}
+
+# Timing instrumentation: per-spider/host/callback histograms of queue wait,
+# throttle wait, download latency, response size and callback CPU time, written
+# to a JSON report when the spider closes (enable TimingSpiderMiddleware and
+# TimingDownloaderMiddleware in the middleware settings above)
+#TIMING_ENABLED = True
+#TIMING_REPORT_PATH = "timing-report.json"
+# Serve the histograms in Prometheus text format on 127.0.0.1 while crawling
+#TIMING_PROMETHEUS_PORT = 9410
+
+# Adaptive per-host throttling: delay and concurrency follow each host's
+# latency and error rate, 429/5xx back off exponentially (honouring
+# Retry-After), and a host that keeps failing has its circuit opened so its
+# requests fail fast. Learned rates are saved to THROTTLE_STATE_PATH and reused
+# by the next run. It replaces a flat DOWNLOAD_DELAY; leave AUTOTHROTTLE_ENABLED
+# off when using it
+THROTTLE_ENABLED = True
+THROTTLE_STATE_PATH = "throttle-state.json"
+#THROTTLE_START_DELAY = 0.5
+#THROTTLE_MIN_DELAY = 0.0
+#THROTTLE_MAX_DELAY = 60.0
+#THROTTLE_TARGET_CONCURRENCY = 2.0
+#THROTTLE_START_CONCURRENCY = 2
+#THROTTLE_MAX_CONCURRENCY = 8
+# Consecutive failures that open a host's circuit, and the first cooldown (doubling per trip)
+#THROTTLE_FAILURE_THRESHOLD = 3
+#THROTTLE_COOLDOWN = 30.0
+#THROTTLE_MAX_COOLDOWN = 900.0
+# Retry-After values above this open the circuit instead of stalling the host's queue
+#THROTTLE_MAX_RETRY_AFTER = 120.0
+# Serve requests from the least busy hosts first (batch_jobs always does)
+#SCHEDULER_PRIORITY_QUEUE = "scrapy.pqueues.DownloaderAwarePriorityQueue"
+
+# Incremental crawls: remember postings between runs (SQLite, stored under .scrapy)
+# and only fetch postings that are new or changed since the last crawl
+#INCREMENTAL_STATE_PATH = "postings.db"
+
+# Location normalization: parse free-text locations into canonical
+# {city, region, country} places and a remote flag with the bundled offline
+# gazetteer (enable LocationPipeline in ITEM_PIPELINES, before the exporting
+# pipelines). The gazetteer index is compiled on first use and memory-mapped
+#LOCATION_NORMALIZATION = True
+#LOCATION_INDEX_PATH = "gazetteer.idx"
+#LOCATION_CACHE_SIZE = 4096
+
+# Resumable crawls: run with -s JOBDIR=crawls/<name> to keep the scheduler queue
+# on disk, and run the same command again to resume an interrupted crawl. The
+# Bloom dupefilter keeps a fixed-size, memory-mapped filter per company under
+# JOBDIR (without JOBDIR it works like the default RFPDupeFilter), and
+# ResumeStartMiddleware (enable it in SPIDER_MIDDLEWARES above) skips the start
+# requests already sent
+#DUPEFILTER_CLASS = "job_scraper.dupefilter.CompanyBloomDupeFilter"
+# Expected requests per company, and the accepted false positive rate
+#BLOOM_DUPEFILTER_CAPACITY = 100000
+#BLOOM_DUPEFILTER_ERROR_RATE = 1e-5
+# Company filters kept mapped at once
+#BLOOM_DUPEFILTER_MAX_OPEN = 256
+
+# Host overrides: connect to another address for chosen hosts while spiders
+# keep seeing the real URLs, e.g. to crawl the local mock ATS server in
+# benchmarks/mockats.py. Keys are hosts, "*.domain" wildcards or "*"
+#DOWNLOAD_HANDLERS = {
+#    "http": "job_scraper.handlers.HostOverrideDownloadHandler",
+#    "https": "job_scraper.handlers.HostOverrideDownloadHandler",
+#}
+#HOST_OVERRIDES = {
+#    "*": "127.0.0.1:8700",
+#}
+
+# Single-file Parquet feeds, e.g. scrapy crawl lever -o jobs.parquet (needs pyarrow)
+FEED_EXPORTERS = {
+    "parquet": "job_scraper.parquet.ParquetItemExporter",
+}
+
 # Set settings whose default value is deprecated to a future-proof value
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 FEED_EXPORT_ENCODING = "utf-8"
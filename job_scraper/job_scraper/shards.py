@@ -0,0 +1,117 @@
+# Rotating, compressed JSON lines shards
+#
+# ShardWriter streams records to newline-delimited JSON, optionally gzip or
+# zstd compressed, and starts a new shard once the current one reaches a
+# configured item count or compressed size. Shards are written under a .part
+# name and atomically renamed when finished, and a manifest listing finished
+# shards is rewritten (also atomically) after each one, so consumers never see
+# a partially written file. Only the current line is ever held in memory.
+
+import gzip
+import json
+import os
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXTENSIONS = {
+    'none': '',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+class ShardWriter:
+    """Write records across size-bounded JSON lines shards with a manifest"""
+
+    def __init__(self, directory, prefix, compression='gzip', max_items=50000, max_bytes=256 * 1024 * 1024):
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Unknown compression {compression!r}, expected one of {sorted(EXTENSIONS)}")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.manifest_path = os.path.join(directory, f"{prefix}.manifest.json")
+        self.shards = []
+
+        self.raw = None
+        self.stream = None
+        self.shard_items = 0
+        self.shard_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def shard_name(self):
+        return f"{self.prefix}-{len(self.shards):05d}.jsonl{EXTENSIONS[self.compression]}"
+
+    def open_shard(self):
+        self.raw = open(os.path.join(self.directory, self.shard_name + '.part'), 'wb')
+        if self.compression == 'gzip':
+            self.stream = gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=6)
+        elif self.compression == 'zstd':
+            self.stream = zstandard.ZstdCompressor(level=3).stream_writer(self.raw, closefd=False)
+        else:
+            self.stream = self.raw
+        self.shard_items = 0
+        self.shard_bytes = 0
+
+    def write(self, record):
+        if self.stream is None:
+            self.open_shard()
+
+        line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        self.stream.write(line)
+        self.shard_items += 1
+        self.shard_bytes += len(line)
+
+        # raw.tell() is the compressed size written so far
+        if self.shard_items >= self.max_items or self.raw.tell() >= self.max_bytes:
+            self.finish_shard()
+
+    def finish_shard(self):
+        if self.stream is None:
+            return
+
+        if self.stream is not self.raw:
+            self.stream.close()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        self.raw.close()
+
+        name = self.shard_name
+        path = os.path.join(self.directory, name)
+        os.replace(path + '.part', path)
+        self.shards.append({
+            'file': name,
+            'items': self.shard_items,
+            'bytes': os.path.getsize(path),
+            'uncompressed_bytes': self.shard_bytes,
+            'finished_at': time.time(),
+        })
+        self.stream = self.raw = None
+        self.write_manifest(complete=False)
+
+    def write_manifest(self, complete):
+        manifest = {
+            'prefix': self.prefix,
+            'compression': self.compression,
+            'complete': complete,
+            'items': sum(shard['items'] for shard in self.shards),
+            'shards': self.shards,
+        }
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def close(self):
+        self.finish_shard()
+        self.write_manifest(complete=True)
@@ -0,0 +1,63 @@
+import scrapy
+from ..parsers import get_extractor
+from ..state import IncrementalMixin
+
+class BambooHRJobsSpider(IncrementalMixin, scrapy.Spider):
+    name = "bamboohr_jobs"
+
+    # Reads postings from the careers list and detail JSON endpoints
+    extractor = get_extractor('bamboohr')
+
+    def __init__(self, company=None, domain=None, *args, **kwargs):
+        super(BambooHRJobsSpider, self).__init__(*args, **kwargs)
+        if not company:
+            raise ValueError("bamboohr_jobs requires the careers site subdomain, e.g. -a company=acme")
+
+        self.company = company
+        self.domain = domain
+        self.careers_url = f"https://{self.company}.bamboohr.com/careers"
+
+        self.allowed_domains = [f"{self.company}.bamboohr.com"]
+        if self.domain:
+            self.allowed_domains.append(self.domain)
+        self.start_urls = [f"{self.careers_url}/list"]
+
+        self.logger.info(f"BambooHR spider initialized for company: {self.company}")
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        for url in self.start_urls:
+            yield scrapy.Request(url=url, callback=self.parse_careers_list, dont_filter=True)
+
+    def parse_careers_list(self, response):
+        """Request the detail JSON for every new or changed opening in the careers list"""
+        openings = response.json().get('result') or []
+        self.logger.info(f"Found {len(openings)} openings")
+
+        for opening in openings:
+            url = f"{self.careers_url}/{opening['id']}"
+            if not self.posting_changed(url, opening):
+                continue
+            yield scrapy.Request(
+                url=f"{url}/detail",
+                callback=self.parse_job_details,
+                meta={'list_fields': self.extractor.job_fields(opening)}
+            )
+
+        yield from self.closed_postings()
+
+    def parse_job_details(self, response):
+        """Build the item from an opening's detail JSON"""
+        item = self.extractor.parse_detail(response, company=self.company)
+
+        # Fill anything the detail lacks from the careers list entry
+        for field, value in response.meta.get('list_fields', {}).items():
+            if not item.get(field) and value:
+                item[field] = value
+        yield item
+
+# To run this spider:
+# poetry run scrapy crawl bamboohr_jobs -a company=acme -o jobs.json
@@ -0,0 +1,138 @@
+import scrapy
+from ..manifest import read_manifest
+from .bamboohr_scraper import BambooHRJobsSpider
+from .getro_scraper import GetroJobsSpider
+from .greenhouse_scraper import GreenhouseJobsSpider
+from .lever_scraper import LeverJobsSpider
+from .workday_scraper import WorkdayJobsSpider
+
+# Spider class used for each manifest platform
+PLATFORM_SPIDERS = {
+    'lever': LeverJobsSpider,
+    'greenhouse': GreenhouseJobsSpider,
+    'getro': GetroJobsSpider,
+    'workday': WorkdayJobsSpider,
+    'bamboohr': BambooHRJobsSpider,
+}
+
+
+class BatchJobsSpider(scrapy.Spider):
+    """Crawl every company in a manifest file inside a single crawler process.
+
+    Each manifest row is turned into an instance of the matching platform
+    spider, so its allowed_domains/start_urls logic and callbacks are reused
+    as-is. Requests are routed back to the right instance through request meta,
+    which keeps every request bound to this spider's own methods.
+    """
+    name = "batch_jobs"
+
+    # Bound concurrency per ATS host instead of serializing everything behind
+    # a single delay; other hosts (e.g. Getro boards) keep the default slot
+    custom_settings = {
+        "CONCURRENT_REQUESTS": 64,
+        # Hand out requests for the hosts with the fewest active downloads first,
+        # so a slow or backed-off host does not crowd out the others
+        "SCHEDULER_PRIORITY_QUEUE": "scrapy.pqueues.DownloaderAwarePriorityQueue",
+        "DOWNLOAD_SLOTS": {
+            "api.lever.co": {"concurrency": 8, "delay": 0.25},
+            "jobs.lever.co": {"concurrency": 4, "delay": 0.5},
+            "boards-api.greenhouse.io": {"concurrency": 8, "delay": 0.25},
+            "job-boards.greenhouse.io": {"concurrency": 4, "delay": 0.5},
+        },
+    }
+
+    def __init__(self, manifest=None, *args, **kwargs):
+        super(BatchJobsSpider, self).__init__(*args, **kwargs)
+        if not manifest:
+            raise ValueError("batch_jobs requires a manifest, e.g. -a manifest=companies.csv")
+        self.manifest = manifest
+        self.targets = {}
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(BatchJobsSpider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.load_targets()
+        return spider
+
+    def load_targets(self):
+        """Create one platform spider per manifest row"""
+        allowed_domains = set()
+
+        for row in read_manifest(self.manifest):
+            spider_cls = PLATFORM_SPIDERS.get(row['platform'])
+            if spider_cls is None:
+                self.logger.warning(f"Skipping {row['company']}: unknown platform {row['platform']}")
+                continue
+
+            key = f"{row['platform']}:{row['company']}"
+            if key in self.targets:
+                self.logger.warning(f"Skipping duplicate manifest row for {key}")
+                continue
+
+            kwargs = {'board_url': row['url']} if row['url'] else {}
+            try:
+                target = spider_cls.from_crawler(self.crawler, company=row['company'], domain=row['domain'], **kwargs)
+            except ValueError as e:
+                # e.g. a Workday row without a usable career site URL
+                self.logger.error(f"Skipping {key}: {e}")
+                continue
+            self.targets[key] = target
+            allowed_domains.update(target.allowed_domains)
+
+        self.allowed_domains = sorted(allowed_domains)
+        self.logger.info(f"Batch spider initialized with {len(self.targets)} companies from {self.manifest}")
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        for key, target in self.targets.items():
+            if hasattr(target, 'start_requests'):
+                requests = target.start_requests()
+            else:
+                requests = (scrapy.Request(url, dont_filter=True) for url in target.start_urls)
+
+            for request in requests:
+                yield self.wrap_request(key, target, request)
+
+    def wrap_request(self, key, target, request):
+        """Route a target spider's request through this spider's dispatch methods"""
+        callback = request.callback or target.parse
+        meta = dict(request.meta)
+        meta['batch_target'] = key
+        meta['batch_callback'] = callback.__name__
+        meta['batch_errback'] = request.errback.__name__ if request.errback else None
+
+        return request.replace(
+            callback=self.dispatch,
+            errback=self.dispatch_error if request.errback else None,
+            meta=meta
+        )
+
+    def wrap_results(self, key, target, results):
+        for result in results or ():
+            if isinstance(result, scrapy.Request):
+                yield self.wrap_request(key, target, result)
+            else:
+                yield result
+
+    def dispatch(self, response, **kwargs):
+        """Call the target spider's callback for this response"""
+        key = response.meta['batch_target']
+        target = self.targets[key]
+        callback = getattr(target, response.meta['batch_callback'])
+        yield from self.wrap_results(key, target, callback(response, **kwargs))
+
+    def dispatch_error(self, failure):
+        """Call the target spider's errback for this failure"""
+        meta = failure.request.meta
+        key = meta['batch_target']
+        target = self.targets[key]
+        errback = getattr(target, meta['batch_errback'])
+        yield from self.wrap_results(key, target, errback(failure))
+
+# To run this spider:
+# poetry run scrapy crawl batch_jobs -a manifest=companies.csv -o jobs.json
+# The manifest is a CSV (platform,company,domain header) or JSON lines file;
+# Workday rows also need a url column with the career site URL
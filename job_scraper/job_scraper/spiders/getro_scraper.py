@@ -1,29 +1,56 @@
 import scrapy
 import json
+from scrapy.http import JsonRequest
 from urllib.parse import urljoin
 from datetime import datetime
-import re
+from ..classifier import default_classifier
+from ..htmltext import html_to_text
 from ..items import JobItem
-from .greenhouse_scraper import GreenhouseJobsSpider
-from .lever_scraper import LeverJobsSpider
+from ..jsonstream import iter_json_items
+from ..parsers import get_extractor, platform_for_url
+from ..state import IncrementalMixin
 
-class GetroJobsSpider(scrapy.Spider):
+class GetroJobsSpider(IncrementalMixin, scrapy.Spider):
     name = "getro_jobs"
     
-    def __init__(self, company=None, domain=None, *args, **kwargs):
+    # Page size used when paging through the collection API
+    API_PAGE_SIZE = 100
+
+    # Collection API fields handle_board_jobs reads, in both key styles;
+    # everything else in a job is decoded and dropped
+    API_JOB_FIELDS = frozenset([
+        'id', 'slug', 'title', 'url', 'organization', 'description', 'department',
+        'workMode', 'work_mode', 'employmentTypes', 'employment_types', 'locations',
+        'searchableLocations', 'searchable_locations', 'jobFunctions', 'job_functions',
+    ])
+
+    # Keyword classifier for the info texts on Getro job pages
+    classifier = default_classifier
+
+    def __init__(self, company=None, domain=None, follow_apply=None, *args, **kwargs):
         super(GetroJobsSpider, self).__init__(*args, **kwargs)
         
         # Set default company if not provided
         self.company = company or "4pt0"
         self.domain = domain or "4pt0.org"
+
+        # Follow apply links to platforms with a registered extractor when the
+        # board data lacks a description
+        self.follow_apply = str(follow_apply).lower() not in ("0", "false", "no")
+
+        # Jobs already handled from the board data, as pages can overlap
+        self.getro_job_ids = set()
+        self.pending_api_pages = 0
+        self.api_pages_failed = False
         
         # Set dynamic domains and URLs
         self.allowed_domains = [
             self.domain,
             f"jobs.{self.company}.com",
-            "getro.com"
+            "getro.com",
             #add other domains for external platforms
             "workday.com",
+            "myworkdayjobs.com",
             "bamboohr.com",
             "greenhouse.io",
             "lever.co"
@@ -31,16 +58,22 @@ class GetroJobsSpider(scrapy.Spider):
         
         # Getro job board URL pattern
         self.start_urls = [f"https://jobs.{self.domain}/jobs"]
-
-        # Initialize other spiders for delegation
-        self.greenhouse_spider = GreenhouseJobsSpider()
-        self.lever_spider = LeverJobsSpider()
         
         self.logger.info(f"Getro spider initialized for company: {self.company}")
     
     def parse(self, response):
         """Parse the main jobs board page"""
         self.logger.debug("Parsing Getro jobs board")
+
+        # Getro boards are Next.js apps that embed their initial state, including the
+        # first page of jobs; the remaining pages come from the collection API
+        state = self.extract_initial_state(response)
+        jobs = (state.get('jobs') or {}).get('found')
+        if jobs is not None:
+            yield from self.parse_board_state(state)
+            return
+
+        self.logger.info("No embedded board data found, falling back to job links")
         
         # Extract job links from the main page
         job_links = response.css('a[href*="/jobs/"]::attr(href)').getall()
@@ -50,12 +83,127 @@ class GetroJobsSpider(scrapy.Spider):
         
         for link in job_links:
             absolute_url = urljoin(response.url, link)
+
+            # Getro cards show relative post dates, so only the link itself is a stable signature
+            if not self.posting_changed(absolute_url):
+                self.logger.debug(f"Skipping unchanged job URL: {absolute_url}")
+                continue
+
             self.logger.debug(f"Following job URL: {absolute_url}")
             
             yield scrapy.Request(
                 url=absolute_url,
                 callback=self.parse_job_details
             )
+
+        yield from self.closed_postings()
+    
+    def extract_initial_state(self, response):
+        """Return the board's embedded Next.js initial state, or an empty dict"""
+        next_data = response.css('script#__NEXT_DATA__::text').get()
+        if not next_data:
+            return {}
+        try:
+            data = json.loads(next_data)
+        except ValueError:
+            self.logger.warning("Could not decode embedded board data")
+            return {}
+        return ((data.get('props') or {}).get('pageProps') or {}).get('initialState') or {}
+
+    def parse_board_state(self, state):
+        """Handle the first page of jobs and request the rest from the collection API"""
+        jobs_state = state['jobs']
+        jobs = jobs_state['found']
+        total = jobs_state.get('total') or len(jobs)
+        network_id = (state.get('network') or {}).get('id')
+
+        self.logger.info(f"Found {len(jobs)} of {total} jobs in embedded board data")
+        yield from self.handle_board_jobs(jobs)
+
+        if total > len(jobs) and network_id:
+            # Request every remaining page at once so they download concurrently
+            pages = -(-total // self.API_PAGE_SIZE)
+            self.pending_api_pages = pages
+            for page in range(pages):
+                yield JsonRequest(
+                    url=f"https://api.getro.com/api/v2/collections/{network_id}/search/jobs",
+                    data={'hitsPerPage': self.API_PAGE_SIZE, 'page': page, 'filters': {}, 'query': ''},
+                    callback=self.parse_jobs_api,
+                    errback=self.jobs_api_failed,
+                    dont_filter=True
+                )
+        else:
+            yield from self.closed_postings()
+
+    def parse_jobs_api(self, response):
+        """Parse one page of the Getro collection jobs API"""
+        jobs = iter_json_items(response, ('results', 'jobs'), fields=self.API_JOB_FIELDS)
+        try:
+            yield from self.handle_board_jobs(jobs)
+        except ValueError as e:
+            # A changed or error payload: the board was not fully seen
+            self.logger.warning(f"Unexpected collection API response from {response.url}: {e}")
+            self.api_pages_failed = True
+        yield from self.api_page_done()
+
+    def jobs_api_failed(self, failure):
+        self.logger.warning(f"Collection API request failed: {failure.value!r}")
+        self.api_pages_failed = True
+        yield from self.api_page_done()
+
+    def api_page_done(self):
+        self.pending_api_pages -= 1
+        # Only close missing postings once the whole board has been seen
+        if self.pending_api_pages == 0 and not self.api_pages_failed:
+            yield from self.closed_postings()
+
+    def handle_board_jobs(self, jobs):
+        """Yield items, or apply-page requests, for jobs from the board data"""
+        for job in jobs:
+            job_id = job.get('id') or job.get('slug')
+            if job_id in self.getro_job_ids:
+                continue
+            self.getro_job_ids.add(job_id)
+
+            organization = job.get('organization') or {}
+            job_url = (
+                f"https://jobs.{self.domain}/companies/{organization.get('slug')}/jobs/{job.get('slug')}"
+            )
+            if not self.posting_changed(job_url, job):
+                continue
+
+            getro_data = self.board_job_data(job)
+            apply_url = job.get('url')
+
+            # The board data carries no description; fetch the apply page for it
+            if self.follow_apply and apply_url and not getro_data['getro_description']:
+                yield self.apply_request(apply_url, getro_data, job_url)
+            else:
+                yield self.create_job_item(getro_data, job_url=job_url)
+
+    def board_job_data(self, job):
+        """Map a job from the board data onto the fields extract_getro_basic_info returns"""
+
+        def field(*names):
+            # The embedded state uses camelCase keys, the collection API snake_case
+            for name in names:
+                if job.get(name):
+                    value = job[name]
+                    return '; '.join(map(str, value)) if isinstance(value, list) else value
+            return None
+
+        work_mode = field('workMode', 'work_mode')
+        employment_type = field('employmentTypes', 'employment_types')
+
+        return {
+            'getro_title': job.get('title'),
+            'secondary_company': (job.get('organization') or {}).get('name'),
+            'getro_employment_type': employment_type.replace('_', '-') if employment_type else None,
+            'getro_workplace_type': work_mode.replace('_', '-') if work_mode else None,
+            'getro_location': field('locations', 'searchableLocations', 'searchable_locations'),
+            'getro_department': field('department', 'jobFunctions', 'job_functions'),
+            'getro_description': field('description'),
+        }
     
     def parse_job_details(self, response):
         """Parse individual job posting details and follow apply links"""
@@ -70,26 +218,8 @@ class GetroJobsSpider(scrapy.Spider):
             apply_url = response.css('[data-testid="button"]::attr(href)').get()
         
         if apply_url:
-            # Determine the source platform from the apply URL
-            source_platform = self.detect_source_platform(apply_url)
-            
-            if source_platform in ['greenhouse', 'lever']:
-                self.logger.info(f"Following {source_platform} apply link: {apply_url}")
-                
-                # Pass along the Getro data to the secondary parser
-                yield scrapy.Request(
-                    url=apply_url,
-                    callback=self.parse_secondary_source,
-                    meta={
-                        'getro_data': getro_data,
-                        'source_platform': source_platform,
-                        'getro_url': response.url
-                    }
-                )
-            else:
-                # Unknown platform, use Getro data only
-                self.logger.info(f"Unknown platform for apply URL: {apply_url}, using Getro data only")
-                yield self.create_job_item(getro_data, job_url=response.url)
+            # Pass along the Getro data to the secondary parser
+            yield self.apply_request(apply_url, getro_data, response.url)
         else:
             # No apply URL found, use Getro data only
             self.logger.warning("No apply URL found, using Getro data only")
@@ -97,16 +227,41 @@ class GetroJobsSpider(scrapy.Spider):
     
     def detect_source_platform(self, url):
         """Detect the platform from the apply URL"""
-        if 'greenhouse.io' in url:
-            return 'greenhouse'
-        elif 'lever.co' in url:
-            return 'lever'
-        elif 'workday.com' in url:
-            return 'workday'
-        elif 'bamboohr.com' in url:
-            return 'bamboohr'
-        else:
-            return 'unknown'
+        return platform_for_url(url) or 'unknown'
+
+    def apply_request(self, apply_url, getro_data, job_url):
+        """Request an apply page to complete the Getro data with, or build the
+        item from the Getro data alone when the apply URL cannot be followed"""
+        source_platform = self.detect_source_platform(apply_url)
+        meta = {
+            'getro_data': getro_data,
+            'source_platform': source_platform,
+            'getro_url': job_url,
+            # Lets the incremental state confirm the listed posting from the apply page's item
+            'posting_url': job_url
+        }
+
+        extractor = get_extractor(source_platform)
+        if extractor is None:
+            # Any other career site may still describe the job in schema.org JSON-LD
+            extractor = get_extractor('jsonld')
+            meta['source_platform'] = extractor.platform
+            meta['allow_offsite'] = True
+
+        try:
+            url = extractor.detail_url(apply_url)
+        except ValueError as e:
+            # e.g. a Workday link without a career site or a BambooHR link without a job ID
+            self.logger.info(f"Cannot follow apply link {apply_url}, using Getro data only: {e}")
+            return self.create_job_item(getro_data, job_url=job_url)
+        self.logger.info(f"Following {meta['source_platform']} apply link: {apply_url}")
+
+        return scrapy.Request(
+            url=url,
+            callback=self.parse_secondary_source,
+            errback=self.secondary_source_failed,
+            meta=meta
+        )
     
     def extract_getro_basic_info(self, response):
         """Extract basic job info from Getro page"""
@@ -119,96 +274,60 @@ class GetroJobsSpider(scrapy.Spider):
         # Extract job metadata from the info section
         info_texts = response.css('[data-testid="content"] *::text').getall()
         
-        # Parse the info texts to extract structured data
-        employment_type = None
-        workplace_type = None
-        location = None
-        department = None
-        location = None
-
-        LOCATION_PATTERN = re.compile(r'[A-Za-z\s]+,\s*[A-Z]{2}')
-        
-        for text in info_texts:
-            clean_text = text.strip()
-            if not clean_text or clean_text == secondary_company or clean_text == title:
-                continue
-                
-            # Check if it's a employment_type (common employment_type keywords)
-            if employment_type is None:
-                employment_indicators = ['full-time', 'full time', 'part-time', 'part time']
-                for indicator in employment_indicators:
-                    if indicator in clean_text.lower():
-                        employment_type = indicator
-                        break
-            # Check if it's a workplace_type (common workplace_type keywords)
-            if workplace_type is None:
-                workplace_indicators = ['remote', 'hybrid', 'on-site']
-                for indicator in workplace_indicators:
-                    if indicator in clean_text.lower():
-                        workplace_type = indicator
-                        break    
-
-            # Check if it's a location (using regex to match city/state pattern e.g. 'San Francisco, CA')
-            if location is None and LOCATION_PATTERN.search(clean_text.strip()):
-                location = LOCATION_PATTERN.search(clean_text.strip()).group(0)
-            # Check if it's a department (common department keywords)
-            if department is None:
-                department_indicators = ['sales', 'engineering', 'marketing', 'product', 'design', 'operations', 'human resources', 'finance', 'business development']
-                for indicator in department_indicators:
-                    if indicator in clean_text.lower():
-                        department = indicator
-                        break
+        # Classify the info texts into structured fields in a single pass
+        fields = self.classifier.classify(info_texts, skip=(secondary_company, title))
                 
         return {
             'getro_title': title,
             'secondary_company': secondary_company,
-            'getro_employment_type': employment_type,
-            'getro_workplace_type': workplace_type,
-            'getro_location': location,
-            'getro_department': department,
-            'getro_description': ' '.join(info_texts).strip(),
+            'getro_employment_type': fields['employment_type'],
+            'getro_workplace_type': fields['workplace_type'],
+            'getro_location': fields['location'],
+            'getro_department': fields['department'],
+            'getro_description': html_to_text(response.css('[data-testid="content"]')),
         }
     
     def parse_secondary_source(self, response):
         """Parse job details from secondary source (Greenhouse, Lever, etc.)"""
         getro_data = response.meta['getro_data']
         source_platform = response.meta['source_platform']
-        getro_url = response.meta['getro_url']
         
         self.logger.debug(f"Parsing {source_platform} job details")
-        
-        if source_platform == 'greenhouse':
-            yield from self.parse_greenhouse_job(response, getro_data, getro_url)
-        elif source_platform == 'lever':
-            yield from self.parse_lever_job(response, getro_data, getro_url)
-    
-    def parse_greenhouse_job(self, response, getro_data, getro_url):
-        """Parse Greenhouse job details using the existing Greenhouse spider"""
-        self.logger.debug("Delegating to Greenhouse spider")
-        
-        # Call the greenhouse spider's parse_job_details method
-        for job_item in self.greenhouse_spider.parse_job_details(response):
-            # Only modify source and company
-            job_item['source'] = 'getro / greenhouse'
-            job_item['company'] = f"{self.company} / {job_item.get('company', 'Unknown')}"
-            yield job_item
-    
-    def parse_lever_job(self, response, getro_data, getro_url):
-        """Parse Lever job details using the existing Lever spider"""
-        self.logger.debug("Delegating to Lever spider")
-        
-        # Call the lever spider's parse_job_details method
-        for job_item in self.lever_spider.parse_job_details(response):
-            # Only modify source and company
-            job_item['source'] = 'getro / lever'
-            job_item['company'] = f"{self.company} / {job_item.get('company', 'Unknown')}"
-            yield job_item
+
+        secondary_company = getro_data.get('secondary_company')
+        job_item = get_extractor(source_platform).extract(response, company=secondary_company)
+        if job_item is None:
+            self.logger.info(f"No job posting data on {response.url}, using Getro data only")
+            yield self.create_job_item(getro_data, job_url=response.meta['getro_url'])
+            return
+
+        # Fill whatever the apply page lacks from the Getro data
+        for field, key in (
+            ('title', 'getro_title'),
+            ('employment_type', 'getro_employment_type'),
+            ('workplace_type', 'getro_workplace_type'),
+            ('location', 'getro_location'),
+            ('department', 'getro_department'),
+        ):
+            if not job_item.get(field) and getro_data.get(key):
+                job_item[field] = getro_data[key]
+
+        job_item['source'] = f"getro / {source_platform}"
+        job_item['company'] = f"{self.company} / {job_item.get('company') or 'Unknown'}"
+        yield job_item
+
+    def secondary_source_failed(self, failure):
+        """Fall back to the Getro data when the apply page cannot be fetched"""
+        meta = failure.request.meta
+        self.logger.info(f"Could not fetch apply page {failure.request.url}, using Getro data only: {failure.value}")
+        yield self.create_job_item(meta['getro_data'], job_url=meta['getro_url'])
 
     def create_job_item(self, getro_data, job_url):
         """Create a JobItem using only Getro data when secondary source is unavailable"""
         
         # Create combined company name
-        combined_company = f"{self.company} / {getro_data.get('secondary_company', 'Unknown')}"
+        # Board data can carry a null organization name
+        combined_company = f"{self.company} / {getro_data.get('secondary_company') or 'Unknown'}"
         
         return JobItem(
             title=getro_data.get('getro_title'),
@@ -229,4 +348,6 @@ class GetroJobsSpider(scrapy.Spider):
 # To run this spider:
 # poetry run scrapy crawl getro_jobs -o getro_jobs.json
 # Or with a specific company:
-# poetry run scrapy crawl getro_jobs -a company=yourcompany -o jobs.json
\ No newline at end of file
+# poetry run scrapy crawl getro_jobs -a company=yourcompany -o jobs.json
+# Skip the ATS apply pages and keep only the board data:
+# poetry run scrapy crawl getro_jobs -a company=yourcompany -a follow_apply=false -o jobs.json
\ No newline at end of file
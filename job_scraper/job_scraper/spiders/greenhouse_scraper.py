@@ -1,83 +1,158 @@
 import scrapy
 import json
+import html
 from urllib.parse import urljoin
 from datetime import datetime
+from ..htmltext import normalize_description
 from ..items import JobItem
+from ..jsonstream import iter_json_items
+from ..parsers import get_extractor
+from ..state import IncrementalMixin
 
-class GreenhouseJobsSpider(scrapy.Spider):
+class GreenhouseJobsSpider(IncrementalMixin, scrapy.Spider):
     name = "greenhouse_jobs"
+
+    # Parses job-boards.greenhouse.io job pages
+    extractor = get_extractor('greenhouse')
+
+    # Board API fields create_job_item reads, decoded per job as the payload is read
+    JOB_FIELDS = frozenset(['id', 'title', 'absolute_url', 'updated_at', 'content', 'location',
+                            'offices', 'departments', 'metadata'])
     
-    def __init__(self, company=None, domain=None, *args, **kwargs):
+    def __init__(self, company=None, domain=None, mode=None, *args, **kwargs):
         super(GreenhouseJobsSpider, self).__init__(*args, **kwargs)
         # Set default company if not provided
         self.company = company or "nomadhealth"
         self.domain = domain or "nomadhealth.com"
+
+        # 'api' reads the whole board from the board API, 'html' follows every job page
+        self.mode = mode or "api"
         
         # Greenhouse uses different URL patterns
         self.allowed_domains = [
             self.domain,
-            "job-boards.greenhouse.io"
+            "job-boards.greenhouse.io",
+            "boards-api.greenhouse.io"
         ]
         
-        # Greenhouse job board URL pattern
-        self.start_urls = [f"https://job-boards.greenhouse.io/{self.company}"]
+        # Greenhouse job board URL pattern, used directly in html mode and as the api fallback
+        self.board_url = f"https://job-boards.greenhouse.io/{self.company}"
+        self.api_url = f"https://boards-api.greenhouse.io/v1/boards/{self.company}/jobs?content=true"
+
+        if self.mode == "api":
+            self.start_urls = [self.api_url]
+        else:
+            self.start_urls = [self.board_url]
         
-        self.logger.info(f"Greenhouse spider initialized for company: {self.company}")
+        self.logger.info(f"Greenhouse spider initialized for company: {self.company}, mode: {self.mode}")
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        for url in self.start_urls:
+            if self.mode == "api":
+                yield scrapy.Request(
+                    url=url,
+                    callback=self.parse_board_api,
+                    errback=self.board_api_failed,
+                    dont_filter=True
+                )
+            else:
+                yield scrapy.Request(url=url, callback=self.parse, dont_filter=True)
+
+    def parse_board_api(self, response):
+        """Build job items from the board API jobs?content=true payload"""
+        count = 0
+        try:
+            for job in iter_json_items(response, ('jobs',), fields=self.JOB_FIELDS):
+                count += 1
+                item = self.create_job_item(job)
+                if self.posting_changed(item['url'], job.get('updated_at') or job):
+                    yield item
+        except ValueError as e:
+            # A 200 without a jobs array (or a truncated one) is no better than an error
+            self.logger.warning(f"Unexpected board API response ({e}), falling back to {self.board_url}")
+            yield self.board_request()
+            return
+
+        self.logger.info(f"Found {count} jobs in board API")
+        yield from self.closed_postings()
+
+    def board_api_failed(self, failure):
+        """Fall back to scraping the HTML job board when the board API errors"""
+        self.logger.warning(f"Board API request failed ({failure.value!r}), falling back to {self.board_url}")
+        yield self.board_request()
+
+    def board_request(self):
+        return scrapy.Request(url=self.board_url, callback=self.parse, dont_filter=True)
+
+    def create_job_item(self, job):
+        """Create a JobItem from a single board API job entry"""
+        # The board API returns the description as escaped HTML
+        content = html.unescape(job.get('content') or '')
+        description, requirements = normalize_description(content)
+
+        departments = [d['name'] for d in job.get('departments') or [] if d.get('name')]
+        offices = [o['name'] for o in job.get('offices') or [] if o.get('name')]
+        location = (job.get('location') or {}).get('name') or ', '.join(offices) or None
+
+        # Employment type is only available when the board defines it as a custom field
+        employment_type = None
+        for field in job.get('metadata') or []:
+            if (field.get('name') or '').lower() == 'employment type':
+                employment_type = field.get('value')
+
+        return JobItem(
+            title = job.get('title'),
+            employment_type = employment_type,
+            location = location,
+            department = ', '.join(departments) or None,
+            url = job.get('absolute_url'),
+            description = description,
+            requirements = requirements,
+            company = self.company,
+            source = 'greenhouse',
+            scraped_at = datetime.now().isoformat()
+        )
     
     def parse(self, response):
         """Parse the main jobs board page"""
         self.logger.debug("Parsing Greenhouse jobs board")
         
         # Extract job links from the main page
-        job_links = response.css('.job-post a::attr(href)').getall()
+        job_links = response.css('.job-post a')
         
         # Log what we found
         self.logger.info(f"Found {len(job_links)} job links")
         
         for link in job_links:
-            absolute_url = urljoin(response.url, link)
+            absolute_url = urljoin(response.url, link.attrib.get('href', ''))
+
+            # The link text holds the title and location shown on the board
+            link_text = ' '.join(link.css('*::text').getall()).split()
+            if not self.posting_changed(absolute_url, link_text):
+                self.logger.debug(f"Skipping unchanged job URL: {absolute_url}")
+                continue
+
             self.logger.debug(f"Following job URL: {absolute_url}")
             
             yield scrapy.Request(
                 url=absolute_url,
                 callback=self.parse_job_details
             )
+
+        yield from self.closed_postings()
     
     def parse_job_details(self, response):
         """Parse individual job posting details"""
         self.logger.debug(f"Parsing job details for: {response.url}")
-        
-        # Extract job details using Greenhouse-specific selectors
-        title = response.css(".job__title > h1::text").get()
-        
-        # Location extraction
-        location = response.css('.job__location > div::text').get()
-        
-        # Department extraction - Greenhouse does not show departments in a consistent way
-        
-        # Job description
-        description_parts = response.css('.job__description *::text').getall()
-        
-        description = ' '.join([part.strip() for part in description_parts if part.strip()])
-        
-        # Requirements - Greenhouse does not show departments in a consistent way, rather they are part of the job description
-        
-        # Yield the job data
-        yield JobItem(
-            title = title,
-            # employment_type = employmentType,
-            # workplace_type = workplaceType,
-            location = location,
-            # department = department,
-            url = response.url,
-            description = description,
-            # requirements = requirements,
-            company = self.company,
-            source = 'greenhouse',
-            scraped_at = datetime.now().isoformat()
-        )
+        yield self.extractor.extract(response, company=self.company)
 
 # To run this spider:
 # poetry run scrapy crawl greenhouse_jobs -o greenhouse_jobs.json
 # Or with a specific company:
 # poetry run scrapy crawl greenhouse_jobs -a company=yourcompany -o jobs.json
+# Scrape the HTML job board instead of the board API:
+# poetry run scrapy crawl greenhouse_jobs -a company=yourcompany -a mode=html -o jobs.json
@@ -3,17 +3,34 @@ import json
 from urllib.parse import urljoin
 from datetime import datetime
 import re
+from ..htmltext import html_to_text
 from ..items import JobItem
+from ..jsonstream import iter_json_items
+from ..parsers import get_extractor
+from ..state import IncrementalMixin
 
-class LeverJobsSpider(scrapy.Spider):
+class LeverJobsSpider(IncrementalMixin, scrapy.Spider):
     name = "lever_jobs"
 
-    def __init__(self, company=None, domain=None, *args, **kwargs):
+    # Parses jobs.lever.co posting pages
+    extractor = get_extractor('lever')
+
+    # Postings API fields create_job_item reads; the HTML description and
+    # additional variants are decoded and dropped
+    POSTING_FIELDS = frozenset(['id', 'text', 'categories', 'workplaceType', 'createdAt',
+                                'descriptionPlain', 'lists', 'hostedUrl'])
+
+    def __init__(self, company=None, domain=None, mode=None, details=None, *args, **kwargs):
         super(LeverJobsSpider, self).__init__(*args, **kwargs)
         
         # Set default values if not provided
         self.company = company or "immuta"
         self.domain = domain or "immuta.com"
+
+        # 'json' builds items straight from the postings API, 'html' follows every posting page
+        self.mode = mode or "json"
+        # In json mode, only fetch the posting page when the API lacks description or requirements
+        self.fetch_details = str(details).lower() in ("1", "true", "yes")
         
         # Set dynamic domains and URLs
         self.allowed_domains = [
@@ -22,9 +39,68 @@ class LeverJobsSpider(scrapy.Spider):
             "api.lever.co"
         ]
         
-        self.start_urls = [f"https://api.lever.co/v0/postings/{self.company}"]
+        if self.mode == "json":
+            self.start_urls = [f"https://api.lever.co/v0/postings/{self.company}?mode=json"]
+        else:
+            self.start_urls = [f"https://api.lever.co/v0/postings/{self.company}"]
         
-        self.logger.info(f"Spider initialized for company: {self.company}, domain: {self.domain}")
+        self.logger.info(f"Spider initialized for company: {self.company}, domain: {self.domain}, mode: {self.mode}")
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        callback = self.parse_postings_json if self.mode == "json" else self.parse
+        for url in self.start_urls:
+            yield scrapy.Request(url=url, callback=callback, dont_filter=True)
+
+    def parse_postings_json(self, response):
+        """Build job items from the postings API JSON payload"""
+        # Postings are decoded one at a time as the payload is read
+        count = 0
+        for posting in iter_json_items(response, fields=self.POSTING_FIELDS):
+            count += 1
+            item = self.create_job_item(posting)
+            if not self.posting_changed(item['url'], posting):
+                continue
+
+            if self.fetch_details and not (item['description'] and item['requirements']):
+                self.logger.debug(f"Fetching details for: {item['url']}")
+                yield scrapy.Request(
+                    url=item['url'],
+                    callback=self.parse_job_details,
+                    meta={'api_item': item}
+                )
+            else:
+                yield item
+
+        self.logger.info(f"Found {count} postings")
+        yield from self.closed_postings()
+
+    def create_job_item(self, posting):
+        """Create a JobItem from a single postings API entry"""
+        categories = posting.get('categories') or {}
+
+        # Lists hold the requirement-style sections as HTML bullet lists
+        requirements = []
+        for section in posting.get('lists') or []:
+            items = html_to_text(section.get('content'))
+            requirements.append('\n'.join(part for part in (section.get('text'), items) if part))
+
+        return JobItem(
+            title = posting.get('text'),
+            employment_type = categories.get('commitment'),
+            workplace_type = posting.get('workplaceType') or categories.get('workplaceType'),
+            location = categories.get('location'),
+            department = categories.get('department') or categories.get('team'),
+            url = posting.get('hostedUrl'),
+            description = (posting.get('descriptionPlain') or '').strip(),
+            requirements = '\n'.join(requirements),
+            company = self.company,
+            source = 'lever',
+            scraped_at = datetime.now().isoformat()
+        )
 
     def parse(self, response):
         self.logger.debug("Parsing response")
@@ -36,44 +112,38 @@ class LeverJobsSpider(scrapy.Spider):
             if match:
                 url = match.group(1)
                 link_text = match.group(2)                
+                if not self.posting_changed(url, link_text):
+                    self.logger.debug(f"Skipping unchanged posting: {url}")
+                    continue
                 self.logger.debug(f"Yielding url: {url}")
                 yield scrapy.Request(
                     url=url,
                     callback=self.parse_job_details
                 )
 
+        yield from self.closed_postings()
+
     def parse_job_details(self, response):
         """Parse the detailed job page"""
         
         self.logger.debug("Parsing job details")
         
-        # Extract job details
-        title = response.css(".posting-headline > h2::text").get()
-        location = response.css("div .location::text").get()
-        department = response.css("div .department::text").get()
-        workplaceType = response.css("div .workplaceTypes::text").get()
-        employmentType = response.css("div .commitment::text").get()
-                
-        # Extract job description
-        description = ' '.join(response.xpath("//div[@data-qa='job-description']//text()").getall()).strip()
-        
-        # Extract requirements
-        requirements = ' '.join(response.css('ul.posting-requirements *::text').getall()).strip()
-        
+        item = self.extractor.extract(response, company=self.company)
+
+        # When following up on a postings API entry, only fill in what the API lacked
+        api_item = response.meta.get('api_item')
+        if api_item is not None:
+            for field, value in item.items():
+                if not api_item.get(field):
+                    api_item[field] = value
+            item = api_item
+
         # Yield the complete job information
-        yield JobItem(
-            title = title,
-            employment_type = employmentType,
-            workplace_type = workplaceType,
-            location = location,
-            department = department,
-            url = response.url,
-            description = description,
-            requirements = requirements,
-            company = self.company,
-            source = 'lever',
-            scraped_at = datetime.now().isoformat()
-        )
+        yield item
 
 # To run this spider:
 # poetry run scrapy crawl lever_jobs -o jobs.json
+# Scrape the HTML posting pages instead of the JSON API:
+# poetry run scrapy crawl lever_jobs -a company=yourcompany -a mode=html -o jobs.json
+# Fall back to posting pages for fields missing from the API:
+# poetry run scrapy crawl lever_jobs -a company=yourcompany -a details=true -o jobs.json
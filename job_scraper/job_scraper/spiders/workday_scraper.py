@@ -0,0 +1,145 @@
+import scrapy
+from urllib.parse import urlparse
+from scrapy.http import JsonRequest
+from ..parsers import get_extractor
+from ..state import IncrementalMixin
+
+class WorkdayJobsSpider(IncrementalMixin, scrapy.Spider):
+    name = "workday_jobs"
+
+    # Reads postings from the career site's /wday/cxs JSON API
+    extractor = get_extractor('workday')
+
+    # Workday rejects search requests for more than 20 postings at a time
+    PAGE_SIZE = 20
+
+    # Facets Workday uses for job families, tried in order as the department
+    DEPARTMENT_FACETS = ('jobFamilyGroup', 'jobFamily')
+
+    def __init__(self, company=None, domain=None, board_url=None, *args, **kwargs):
+        super(WorkdayJobsSpider, self).__init__(*args, **kwargs)
+        if not board_url:
+            raise ValueError(
+                "workday_jobs requires the career site URL, e.g. "
+                "-a board_url=https://acme.wd5.myworkdayjobs.com/en-US/External"
+            )
+
+        self.board_url = board_url.rstrip('/')
+        self.api_url = self.extractor.api_url(self.board_url)
+        self.company = company or self.extractor.company_from_url(self.board_url)
+        self.domain = domain
+
+        self.allowed_domains = [urlparse(self.board_url).hostname]
+        if self.domain:
+            self.allowed_domains.append(self.domain)
+        self.start_urls = [f"{self.api_url}/jobs"]
+
+        self.pending_pages = 0
+        self.pages_failed = False
+
+        self.logger.info(f"Workday spider initialized for company: {self.company}, site: {self.board_url}")
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        request = self.search_request(0, callback=self.parse_first_page)
+        request.meta['first_page'] = True
+        yield request
+
+    def search_request(self, offset, callback=None, facets=None, department=None):
+        return JsonRequest(
+            url=f"{self.api_url}/jobs",
+            data={'appliedFacets': facets or {}, 'limit': self.PAGE_SIZE, 'offset': offset, 'searchText': ''},
+            callback=callback or self.parse_search_page,
+            errback=self.search_failed,
+            meta={'department': department},
+            dont_filter=True
+        )
+
+    def parse_first_page(self, response):
+        """Read the total and facets from the first search page and request every other page at once"""
+        data = response.json()
+        total = data.get('total') or 0
+        self.logger.info(f"Found {total} postings")
+
+        # Job families are only exposed as a search facet, so page through each
+        # family separately when that covers every posting; department then
+        # comes from the facet itself
+        family = self.department_facet(data.get('facets') or [])
+        if family is not None and sum(value.get('count') or 0 for value in family['values']) >= total:
+            for value in family['values']:
+                facets = {family['facetParameter']: [value['id']]}
+                for offset in range(0, value.get('count') or 0, self.PAGE_SIZE):
+                    self.pending_pages += 1
+                    yield self.search_request(offset, facets=facets, department=value.get('descriptor'))
+            if not self.pending_pages:
+                yield from self.closed_postings()
+            return
+
+        for offset in range(self.PAGE_SIZE, total, self.PAGE_SIZE):
+            self.pending_pages += 1
+            yield self.search_request(offset)
+        # The first page counts as one more pending page
+        self.pending_pages += 1
+        yield from self.parse_search_page(response)
+
+    def department_facet(self, facets):
+        """Return the first job family facet, looking inside grouped facets too"""
+        by_parameter = {}
+        for facet in facets:
+            by_parameter[facet.get('facetParameter')] = facet
+            for value in facet.get('values') or []:
+                if 'facetParameter' in value:
+                    by_parameter[value['facetParameter']] = value
+        for parameter in self.DEPARTMENT_FACETS:
+            if by_parameter.get(parameter, {}).get('values'):
+                return by_parameter[parameter]
+        return None
+
+    def parse_search_page(self, response):
+        """Request the detail JSON for every new or changed posting on a search page"""
+        department = response.meta.get('department')
+        for posting in response.json().get('jobPostings') or []:
+            path = posting.get('externalPath')
+            if not path:
+                continue
+            detail_url = f"{self.api_url}{path}"
+            # Keyed like the item's URL, which has no locale, so the detail
+            # request's item confirms the listed posting
+            url = self.extractor.posting_url(detail_url)
+            # postedOn is relative ("Posted 3 Days Ago"), so it is left out of the signature
+            if not self.posting_changed(url, posting.get('title'), posting.get('locationsText'),
+                                        posting.get('bulletFields'), department):
+                continue
+            yield scrapy.Request(
+                url=detail_url,
+                callback=self.parse_job_details,
+                meta={'department': department, 'posting_url': url}
+            )
+        yield from self.page_done()
+
+    def search_failed(self, failure):
+        self.logger.warning(f"Search request failed: {failure.value!r}")
+        self.pages_failed = True
+        if not failure.request.meta.get('first_page'):
+            yield from self.page_done()
+
+    def page_done(self):
+        self.pending_pages -= 1
+        # Only close missing postings once every search page has been read
+        if self.pending_pages == 0 and not self.pages_failed:
+            yield from self.closed_postings()
+
+    def parse_job_details(self, response):
+        """Build the item from a posting's detail JSON"""
+        item = self.extractor.parse_detail(response, company=self.company)
+        # Set when the search was paged by job family
+        department = response.meta.get('department')
+        if department:
+            item['department'] = department
+        yield item
+
+# To run this spider:
+# poetry run scrapy crawl workday_jobs -a board_url=https://acme.wd5.myworkdayjobs.com/en-US/External -o jobs.json
@@ -0,0 +1,208 @@
+# Persistent posting state for incremental crawls
+#
+# Enable it by pointing INCREMENTAL_STATE_PATH at a SQLite file (relative paths
+# live in the project's .scrapy directory). List-page callbacks then only
+# schedule detail requests for postings that are new or whose list-level
+# signature changed, and report postings that disappeared as closed. A new
+# signature is only saved once an item for the posting has been scraped, so a
+# detail request that fails is retried on the next crawl. The URL of that item,
+# which for postings completed from another page (e.g. a Getro job's apply page)
+# is not the listed URL, is what closed items report, so they carry the same
+# posting key as the items the posting produced.
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from itemadapter import ItemAdapter
+from scrapy import signals
+from scrapy.utils.project import data_path
+
+from .identity import posting_key
+from .items import JobItem
+
+# Sent with spider, source and company once a company's whole posting list has
+# been read, so postings missing from it are really gone rather than unreached
+posting_list_complete = object()
+
+
+def posting_signature(*parts):
+    """Hash the list-level fields of a posting into a short signature"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class PostingStateStore:
+    """SQLite table of every posting seen, keyed by posting identity"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS postings (
+                key TEXT PRIMARY KEY,
+                spider TEXT NOT NULL,
+                company TEXT NOT NULL,
+                url TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                closed_at REAL
+            )"""
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS postings_scope ON postings (spider, company, closed_at)"
+        )
+        # Signatures of new or changed postings whose items have not been scraped yet
+        self.pending = {}
+
+    def check(self, spider, company, key, url, signature):
+        """Record a posting seen on a list page, returning True if it is new or changed
+
+        The new signature is held back until confirm() is called for the
+        posting, so it is still reported as changed by the next crawl if its
+        item is never produced.
+        """
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT signature, closed_at FROM postings WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            # No signature until the item is scraped
+            self.conn.execute(
+                "INSERT INTO postings VALUES (?, ?, ?, ?, '', ?, ?, NULL)",
+                (key, spider, company, url, now, now),
+            )
+            self.pending[key] = signature
+            return True
+
+        # A posting that reappears after being closed is treated as new; its
+        # URL stays that of the last item produced for it
+        changed = row[0] != signature or row[1] is not None
+        self.conn.execute(
+            "UPDATE postings SET signature = ?, last_seen = ?, closed_at = NULL WHERE key = ?",
+            ('' if row[1] is not None else row[0], now, key),
+        )
+        if changed:
+            self.pending[key] = signature
+        return changed
+
+    def confirm(self, key, url):
+        """Save the pending signature of a posting whose item was produced at url"""
+        signature = self.pending.pop(key, None)
+        if signature is not None:
+            self.conn.execute("UPDATE postings SET signature = ?, url = ? WHERE key = ?", (signature, url, key))
+
+    def item_produced(self, item, response=None):
+        url = ItemAdapter(item).get('url')
+        if not url:
+            return
+        self.confirm(posting_key(url), url)
+        # Items built from another page, like a Getro job's apply page, name
+        # the listed posting in the request meta
+        posting_url = (getattr(response, 'meta', None) or {}).get('posting_url')
+        if posting_url:
+            self.confirm(posting_key(posting_url), url)
+
+    def close_missing(self, spider, company, seen_keys):
+        """Mark open postings of a company that were not seen as closed and return their URLs"""
+        now = time.time()
+        rows = self.conn.execute(
+            "SELECT key, url FROM postings WHERE spider = ? AND company = ? AND closed_at IS NULL",
+            (spider, company),
+        ).fetchall()
+
+        closed = [(key, url) for key, url in rows if key not in seen_keys]
+        self.conn.executemany(
+            "UPDATE postings SET closed_at = ? WHERE key = ?",
+            [(now, key) for key, _ in closed],
+        )
+        self.conn.commit()
+        return [url for _, url in closed]
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def get_state_store(crawler):
+    """Return the crawler's shared PostingStateStore, or None if incremental crawls are off"""
+    store = getattr(crawler, 'posting_state', None)
+    if store is None:
+        path = crawler.settings.get('INCREMENTAL_STATE_PATH')
+        if not path:
+            return None
+        path = data_path(path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        store = PostingStateStore(path)
+        crawler.posting_state = store
+        # Items dropped by a pipeline (e.g. as duplicates) were still fetched
+        crawler.signals.connect(store.item_produced, signal=signals.item_scraped)
+        crawler.signals.connect(store.item_produced, signal=signals.item_dropped)
+        crawler.signals.connect(store.close, signal=signals.engine_stopped)
+    return store
+
+
+class IncrementalMixin:
+    """List-page helpers for spiders that support incremental crawls.
+
+    Spiders call posting_changed() for each posting found on a list page and
+    only follow it when it returns True, then yield from closed_postings() once
+    the whole list has been processed. Spiders only call closed_postings()
+    after reading every page of the list, which also sends
+    posting_list_complete for the company.
+    """
+
+    @property
+    def posting_source(self):
+        """The source this spider's closed items report, e.g. 'lever' for lever_jobs"""
+        return self.name.split('_')[0]
+
+    @property
+    def state_store(self):
+        crawler = getattr(self, 'crawler', None)
+        return get_state_store(crawler) if crawler is not None else None
+
+    def posting_changed(self, url, *signature_parts):
+        """Return True if the posting at url is new or its list-level fields changed"""
+        key = posting_key(url)
+        if not hasattr(self, 'seen_postings'):
+            self.seen_postings = set()
+        self.seen_postings.add(key)
+
+        store = self.state_store
+        if store is None:
+            return True
+        return store.check(self.name, self.company, key, url, posting_signature(*signature_parts))
+
+    def closed_postings(self):
+        """Yield a closed JobItem for every known posting missing from this crawl's list"""
+        store = self.state_store
+        seen = getattr(self, 'seen_postings', set())
+        if not seen:
+            # An empty list is more likely a broken page than a company closing every posting
+            if store is not None:
+                self.logger.warning(f"No postings listed for {self.company}, not closing known postings")
+            return
+
+        crawler = getattr(self, 'crawler', None)
+        if crawler is not None:
+            crawler.signals.send_catch_log(
+                posting_list_complete, spider=self, source=self.posting_source, company=self.company
+            )
+        if store is None:
+            return
+
+        for url in store.close_missing(self.name, self.company, seen):
+            self.logger.info(f"Posting closed: {url}")
+            yield JobItem(
+                url = url,
+                company = self.company,
+                source = self.posting_source,
+                status = 'closed',
+                scraped_at = datetime.now().isoformat()
+            )
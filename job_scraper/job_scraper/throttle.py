@@ -0,0 +1,175 @@
+# Adaptive per-host throttling with a circuit breaker
+#
+# AdaptiveThrottleMiddleware keeps one HostState per download slot (host). Each
+# response or download error goes through ThrottlePolicy, which moves the
+# host's delay towards latency / target concurrency, grows concurrency slowly
+# while requests succeed and halves it on errors, and backs the delay off
+# exponentially, with jitter, on 429s, 5xx and connection failures.
+# Retry-After is honoured as a minimum delay, or by opening the circuit when
+# it is too long to wait for in the download queue. After enough consecutive
+# failures the circuit opens and the host's requests fail fast until a
+# cooldown passes; then a single probe decides whether it closes again.
+#
+# States are saved as JSON when the crawl ends, so the next run starts from
+# the rates learned in this one.
+
+import json
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+# HTTP statuses that count against a host
+ERROR_STATUSES = {408, 429, 500, 502, 503, 504, 520, 521, 522, 524}
+
+
+class HostState:
+    """Learned throttle and circuit state of one host"""
+
+    PERSISTED = ('delay', 'concurrency', 'latency', 'error_rate', 'trips', 'open_until')
+
+    def __init__(self, delay, concurrency, latency=None, error_rate=0.0, trips=0, open_until=0.0):
+        self.delay = delay
+        self.concurrency = concurrency
+        self.latency = latency
+        self.error_rate = error_rate
+        # Consecutive circuit openings, which lengthen the cooldown
+        self.trips = trips
+        # Wall-clock time until which the circuit is open
+        self.open_until = open_until
+        # Not persisted: consecutive failures, successes since the last concurrency
+        # change, and when the half-open probe in flight (if any) was sent
+        self.failures = 0
+        self.streak = 0
+        self.probing = 0.0
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.PERSISTED}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.PERSISTED if name in data})
+
+
+class ThrottlePolicy:
+    """How host states react to successes and failures"""
+
+    def __init__(self, start_delay=0.5, min_delay=0.0, max_delay=60.0, target_concurrency=2.0,
+                 start_concurrency=2, max_concurrency=8, failure_threshold=3, cooldown=30.0,
+                 max_cooldown=900.0, max_retry_after=120.0, increase_after=20, rng=None):
+        self.start_delay = start_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.target_concurrency = target_concurrency
+        self.start_concurrency = start_concurrency
+        self.max_concurrency = max_concurrency
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_retry_after = max_retry_after
+        self.increase_after = increase_after
+        self.rng = rng or random.Random()
+
+    def new_state(self):
+        return HostState(self.start_delay, self.start_concurrency)
+
+    def allow(self, state, now):
+        """Whether a request to the host may go out now"""
+        if state.open_until <= 0:
+            return True
+        if now < state.open_until:
+            return False
+        # Half-open: let a single probe through, and another one if it never came back
+        if state.probing and now - state.probing < self.cooldown:
+            return False
+        state.probing = now
+        return True
+
+    def on_success(self, state, latency):
+        if state.probing:
+            # The probe succeeded: close the circuit
+            state.open_until = 0.0
+            state.trips = 0
+            state.probing = 0.0
+        state.failures = 0
+        state.error_rate *= 0.9
+
+        if latency is not None:
+            state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+            target = state.latency / self.target_concurrency
+            state.delay = min(self.max_delay, max(self.min_delay, (state.delay + target) / 2))
+
+        # Additive increase while the host keeps up
+        state.streak += 1
+        if state.streak >= self.increase_after and state.concurrency < self.max_concurrency and state.error_rate < 0.05:
+            state.concurrency += 1
+            state.streak = 0
+
+    def on_failure(self, state, now, retry_after=None):
+        """Back the host off; return True when this failure opened its circuit"""
+        state.failures += 1
+        state.streak = 0
+        state.error_rate = 0.9 * state.error_rate + 0.1
+        state.concurrency = max(1, state.concurrency // 2)
+
+        # Exponential backoff with jitter, never below what the server asked for
+        backoff = max(state.delay, self.min_delay, 0.25) * 2 * self.rng.uniform(1.0, 1.5)
+        state.delay = min(self.max_delay, max(backoff, retry_after or 0))
+
+        if state.open_until and not state.probing:
+            # A request that was already in flight when the circuit opened
+            return False
+
+        too_long = retry_after is not None and retry_after > self.max_retry_after
+        if state.probing or too_long or state.failures >= self.failure_threshold:
+            state.probing = 0.0
+            state.failures = 0
+            state.trips += 1
+            cooldown = min(self.max_cooldown, self.cooldown * 2 ** (state.trips - 1))
+            cooldown *= self.rng.uniform(0.75, 1.25)
+            state.open_until = now + max(cooldown, retry_after or 0)
+            # The cooldown now spaces out requests, so the probe should not also wait out the backoff
+            state.delay = self.start_delay
+            return True
+        return False
+
+
+def retry_after_seconds(value, now=None):
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds from now"""
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('latin-1')
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+class ThrottleStateStore:
+    """JSON file of host states, replaced atomically on save"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        return {host: HostState.from_dict(state) for host, state in data.get('hosts', {}).items()}
+
+    def save(self, states):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'saved_at': time.time(),
+                'hosts': {host: state.to_dict() for host, state in sorted(states.items())},
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,31 @@
+from job_scraper.changefeed import SnapshotIndex
+
+
+def record(url, source, company, title='Engineer'):
+    return {'url': url, 'source': source, 'company': company, 'title': title}
+
+
+def test_sweep_is_scoped_to_source_and_company(tmp_path):
+    index = SnapshotIndex(str(tmp_path / 'change-feed.db'))
+    index.compare('lever:1', record('https://jobs.lever.co/acme/1', 'lever', 'acme'), 'run-1')
+    index.compare('lever:2', record('https://jobs.lever.co/acme/2', 'lever', 'acme'), 'run-1')
+    index.compare('greenhouse:3', record('https://boards.greenhouse.io/acme/jobs/3', 'greenhouse', 'acme'), 'run-1')
+
+    # Only the Lever board was crawled again, and posting 2 is gone from it
+    index.compare('lever:1', record('https://jobs.lever.co/acme/1', 'lever', 'acme'), 'run-2')
+    removed = list(index.sweep([('lever', 'acme')], 'run-2'))
+    assert [row[0] for row in removed] == ['lever:2']
+    assert index.mark_removed('greenhouse:3') is not None
+    index.close()
+
+
+def test_compare_events(tmp_path):
+    index = SnapshotIndex(str(tmp_path / 'change-feed.db'))
+    url = 'https://jobs.lever.co/acme/1'
+    assert index.compare('lever:1', record(url, 'lever', 'acme'), 'run-1') == ('added', ['company', 'source', 'title', 'url'])
+    assert index.compare('lever:1', record(url, 'lever', 'acme'), 'run-2') == (None, [])
+    assert index.compare('lever:1', record(url, 'lever', 'acme', 'Senior Engineer'), 'run-3') == ('modified', ['title'])
+    assert index.mark_removed('lever:1') is not None
+    assert index.mark_removed('lever:1') is None
+    assert index.compare('lever:1', record(url, 'lever', 'acme'), 'run-4')[0] == 'added'
+    index.close()
@@ -0,0 +1,45 @@
+from scrapy import Request
+from scrapy.utils.request import RequestFingerprinter
+
+from job_scraper.dupefilter import CompanyBloomDupeFilter
+
+
+def make_filter(directory=None, **kwargs):
+    return CompanyBloomDupeFilter(directory, fingerprinter=RequestFingerprinter(), **kwargs)
+
+
+def test_repeated_request_is_seen(tmp_path):
+    df = make_filter(str(tmp_path))
+    assert not df.request_seen(Request('https://api.lever.co/v0/postings/acme'))
+    assert df.request_seen(Request('https://api.lever.co/v0/postings/acme'))
+    assert not df.request_seen(Request('https://api.lever.co/v0/postings/other'))
+    df.close('finished')
+
+
+def test_companies_have_separate_filters(tmp_path):
+    df = make_filter(str(tmp_path), max_open=1)
+    url = 'https://jobs.example.com/jobs/1'
+    assert not df.request_seen(Request(url, meta={'batch_target': 'getro:a'}))
+    assert not df.request_seen(Request(url, meta={'batch_target': 'getro:b'}))
+    # Evicted filters are mapped again from their files
+    assert df.request_seen(Request(url, meta={'batch_target': 'getro:a'}))
+    df.close('finished')
+
+
+def test_resumes_until_finished(tmp_path):
+    url = 'https://boards-api.greenhouse.io/v1/boards/acme/jobs'
+    df = make_filter(str(tmp_path))
+    assert not df.request_seen(Request(url))
+    df.close('shutdown')
+
+    df = make_filter(str(tmp_path))
+    assert df.request_seen(Request(url))
+    df.close('finished')
+    assert not tmp_path.exists()
+
+
+def test_without_jobdir():
+    df = make_filter()
+    assert not df.request_seen(Request('https://api.lever.co/v0/postings/acme'))
+    assert df.request_seen(Request('https://api.lever.co/v0/postings/acme'))
+    df.close('finished')
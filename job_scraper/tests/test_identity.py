@@ -0,0 +1,24 @@
+import pytest
+
+from job_scraper.identity import posting_key
+
+LEVER_ID = '0b6d9c3e-5f2a-4c1b-9e8d-7a6b5c4d3e2f'
+
+
+@pytest.mark.parametrize('url, key', [
+    (f'https://jobs.lever.co/acme/{LEVER_ID}', f'lever:{LEVER_ID}'),
+    (f'https://jobs.lever.co/acme/{LEVER_ID.upper()}/apply?lever-source=x', f'lever:{LEVER_ID}'),
+    ('https://job-boards.greenhouse.io/acme/jobs/4012345', 'greenhouse:4012345'),
+    ('https://boards.greenhouse.io/acme/jobs/4012345?gh_src=abc', 'greenhouse:4012345'),
+    ('https://boards.greenhouse.io/embed/job_app?for=acme&gh_jid=4012345', 'greenhouse:4012345'),
+    ('https://www.acme.com/careers/?gh_jid=111', 'greenhouse:111'),
+    ('https://jobs.example.com/companies/acme/jobs/123-data-engineer', 'getro:123-data-engineer'),
+    ('https://careers.acme.com/positions/42/', 'careers.acme.com/positions/42'),
+])
+def test_posting_key(url, key):
+    assert posting_key(url) == key
+
+
+def test_custom_domain_greenhouse_postings_are_distinct():
+    keys = {posting_key(f'https://www.acme.com/careers/?gh_jid={jid}') for jid in (111, 222)}
+    assert len(keys) == 2
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+from scrapy.http import Request, TextResponse
+
+from job_scraper.jsonstream import BOM, JSONStream, iter_json_items
+
+POSTINGS = [
+    {'id': 1, 'text': 'Engineer', 'descriptionPlain': 'Build things', 'description': '<p>Build things</p>'},
+    {'id': 2, 'text': 'Designer', 'descriptionPlain': 'Draw things', 'description': '<p>Draw things</p>'},
+    {'id': 3, 'text': 'Manager', 'descriptionPlain': None, 'lists': [{'text': 'You', 'content': '<li>a</li>'}]},
+]
+
+
+def encode(document):
+    return json.dumps(document, ensure_ascii=False).encode('utf-8')
+
+
+def read(body, path=(), window_size=None):
+    """Items at path, read through a JSONStream with the given window size"""
+    stream = JSONStream(body, window_size) if window_size else JSONStream(body)
+    return list(stream.items(stream.find(path)))
+
+
+def test_top_level_array():
+    assert list(iter_json_items(encode(POSTINGS))) == POSTINGS
+
+
+def test_nested_path_skips_earlier_members():
+    body = encode({
+        'meta': {'total': 3, 'facets': [{'name': 'a]}"'}, [1, {}]]},
+        'note': 'a "quoted" ] } value',
+        'results': {'count': 3, 'jobs': POSTINGS},
+    })
+    assert list(iter_json_items(body, ('results', 'jobs'))) == POSTINGS
+
+
+def test_fields():
+    items = list(iter_json_items(encode(POSTINGS), fields={'id', 'text'}))
+    assert items == [{'id': posting['id'], 'text': posting['text']} for posting in POSTINGS]
+
+
+def test_empty_array():
+    assert list(iter_json_items(b'{"jobs": [ ]}', ('jobs',))) == []
+
+
+def test_response_and_buffer_types():
+    body = encode({'jobs': POSTINGS})
+    response = TextResponse('https://example.com', body=body, encoding='utf-8', request=Request('https://example.com'))
+    for source in (response, body, bytearray(body), memoryview(body)):
+        assert list(iter_json_items(source, ('jobs',))) == POSTINGS
+
+
+@pytest.mark.parametrize('value', [
+    'say \\"hi\\"',
+    'ends with a backslash \\\\',
+    'ends with an escaped quote \\\\\\"',
+    '\\\\\\\\',
+    'x' * 200 + '\\"' + 'y' * 200,
+])
+def test_escaped_quotes(value):
+    # A key skipped on the way to the array, with the escapes in the raw JSON text
+    body = ('{"skipped": "%s", "%s": 1, "jobs": [{"title": "%s"}]}' % (value, value, value)).encode('utf-8')
+    title = json.loads('"%s"' % value)
+    assert list(iter_json_items(body, ('jobs',))) == [{'title': title}]
+
+
+def test_long_and_escaped_keys():
+    long_key = 'k' * 200
+    body = encode({long_key: [1, 2], 'a"b': [{'c': 'd'}], 'jobs': [{long_key: 1}]})
+    assert list(iter_json_items(body, ('jobs',))) == [{long_key: 1}]
+    assert list(iter_json_items(body, ('a"b',))) == [{'c': 'd'}]
+
+
+@pytest.mark.parametrize('window_size', [1, 3, 7, 64])
+def test_split_utf8_at_window_edges(window_size):
+    postings = [{'title': 'Ingénieur · 日本語 ' + '😀' * index, 'city': 'Zürich'} for index in range(20)]
+    assert read(encode(postings), window_size=window_size) == postings
+
+
+def test_window_grows_for_large_items():
+    postings = [{'id': 1}, {'id': 2, 'description': 'x' * 10000}, {'id': 3}]
+    assert read(encode(postings), window_size=16) == postings
+
+
+@pytest.mark.parametrize('window_size', [2, 5, 1 << 18])
+def test_whitespace_between_items(window_size):
+    body = b'[\n  {"id": 1} ,\n\n  {"id": 2}\t,{"id": 3}\n]\n'
+    assert read(body, window_size=window_size) == [{'id': 1}, {'id': 2}, {'id': 3}]
+
+
+def test_byte_order_mark():
+    body = BOM + encode({'jobs': POSTINGS})
+    assert list(iter_json_items(body, ('jobs',))) == POSTINGS
+
+
+@pytest.mark.parametrize('body, path', [
+    (b'{"error": "not found"}', ('jobs',)),
+    (b'{"results": {"count": 0}}', ('results', 'jobs')),
+    (b'{"jobs": {"id": 1}}', ('jobs',)),
+    (b'{"jobs": null}', ('jobs',)),
+    (b'"jobs"', ('jobs',)),
+    (b'{"error": "not found"}', ()),
+])
+def test_missing_path(body, path):
+    with pytest.raises(ValueError, match='No array'):
+        next(iter_json_items(body, path))
+
+
+@pytest.mark.parametrize('body', [
+    b'[{"id": 1}, {"id": 2}',
+    b'[{"id": 1} {"id": 2}]',
+    b'[{"id": 1}, {"id" 2}]',
+    b'[{"id": "unterminated}]',
+    b'{"meta": "unterminated, "jobs": []}',
+    b'{"meta": [1, 2, "jobs": []}',
+    b'{"meta" 1, "jobs": []}',
+])
+def test_malformed(body):
+    with pytest.raises(ValueError):
+        list(iter_json_items(body, ('jobs',) if body.startswith(b'{') else ()))
+
+
+@pytest.mark.parametrize('window_size', [4, 1 << 18])
+def test_malformed_with_small_windows(window_size):
+    with pytest.raises(ValueError):
+        read(b'[{"id": 1}, {"id": 2}, {"id": 3', window_size=window_size)
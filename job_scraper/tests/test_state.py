@@ -0,0 +1,46 @@
+from scrapy import Request
+from scrapy.http import Response
+
+from job_scraper.identity import posting_key
+from job_scraper.items import JobItem
+from job_scraper.state import PostingStateStore
+
+LISTED = 'https://jobs.4pt0.org/companies/acme/jobs/123-engineer'
+APPLY = 'https://job-boards.greenhouse.io/acme/jobs/4012345'
+
+
+def check(store, url, signature):
+    return store.check('getro_jobs', '4pt0', posting_key(url), url, signature)
+
+
+def test_signature_saved_once_item_is_produced(tmp_path):
+    store = PostingStateStore(str(tmp_path / 'postings.db'))
+    assert check(store, LISTED, 'a')
+    # The item was never produced, so the next crawl fetches the posting again
+    assert check(store, LISTED, 'a')
+
+    store.item_produced(JobItem(url=LISTED))
+    assert not check(store, LISTED, 'a')
+    assert check(store, LISTED, 'b')
+    store.close()
+
+
+def test_item_from_another_page_confirms_listed_posting(tmp_path):
+    store = PostingStateStore(str(tmp_path / 'postings.db'))
+    assert check(store, LISTED, 'a')
+    response = Response(APPLY, request=Request(APPLY, meta={'posting_url': LISTED}))
+    store.item_produced(JobItem(url=APPLY), response)
+    assert not check(store, LISTED, 'a')
+
+    # Closed postings report the URL their item had, which the change feed keys on
+    assert store.close_missing('getro_jobs', '4pt0', set()) == [APPLY]
+    store.close()
+
+
+def test_reopened_posting_is_new(tmp_path):
+    store = PostingStateStore(str(tmp_path / 'postings.db'))
+    check(store, LISTED, 'a')
+    store.item_produced(JobItem(url=LISTED))
+    assert store.close_missing('getro_jobs', '4pt0', set()) == [LISTED]
+    assert check(store, LISTED, 'a')
+    store.close()
@@ -0,0 +1,121 @@
+import random
+
+import pytest
+from scrapy import Request, Spider
+from scrapy.core.downloader import Slot
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+from twisted.internet.defer import Deferred
+
+from job_scraper import middlewares
+from job_scraper.middlewares import AdaptiveThrottleMiddleware
+from job_scraper.throttle import HostState, ThrottleStateStore
+
+HOST = 'api.lever.co'
+URL = f'https://{HOST}/v0/postings/acme'
+
+
+class FakeDownloader:
+    """The parts of Scrapy's Downloader the middleware reads: slot settings and slots"""
+
+    def __init__(self):
+        self.per_slot_settings = {}
+        self.slots = {}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(middlewares.time, 'time', clock.time)
+    return clock
+
+
+def make_middleware(tmp_path):
+    crawler = get_crawler(Spider, {
+        'THROTTLE_ENABLED': True,
+        'THROTTLE_STATE_PATH': str(tmp_path / 'throttle-state.json'),
+        'THROTTLE_FAILURE_THRESHOLD': 2,
+        'THROTTLE_COOLDOWN': 30.0,
+    })
+    crawler.spider = Spider('test')
+    crawler.engine = type('Engine', (), {'downloader': FakeDownloader()})()
+    middleware = AdaptiveThrottleMiddleware.from_crawler(crawler)
+    middleware.policy.rng = random.Random(0)
+    middleware.spider_opened(crawler.spider)
+    return middleware
+
+
+def test_learned_state_seeds_new_slots(tmp_path):
+    ThrottleStateStore(str(tmp_path / 'throttle-state.json')).save({HOST: HostState(1.5, 3)})
+    middleware = make_middleware(tmp_path)
+    assert middleware.crawler.engine.downloader.per_slot_settings[HOST] == {'delay': 1.5, 'concurrency': 3}
+
+
+def test_circuit_opens_and_closes(tmp_path, clock):
+    middleware = make_middleware(tmp_path)
+    downloader = middleware.crawler.engine.downloader
+    slot = downloader.slots[HOST] = Slot(2, 0.5)
+    waiting = Deferred()
+    slot.queue.append((Request(URL), waiting))
+    rejected = []
+    waiting.addErrback(lambda failure: rejected.append(failure.value))
+
+    request = Request(URL)
+    for _ in range(2):
+        assert middleware.process_request(request) is None
+        middleware.process_response(request, Response(URL, status=503, request=request))
+
+    # Open: new requests fail fast and the queued one is drained
+    with pytest.raises(IgnoreRequest):
+        middleware.process_request(Request(URL))
+    assert len(rejected) == 1 and isinstance(rejected[0], IgnoreRequest)
+    assert not slot.queue
+    assert slot.concurrency == 1
+
+    # Half-open after the cooldown: one probe goes through
+    clock.now += 60
+    assert middleware.process_request(request) is None
+    with pytest.raises(IgnoreRequest):
+        middleware.process_request(Request(URL))
+
+    # The probe succeeds and the circuit closes
+    request.meta['download_latency'] = 0.2
+    middleware.process_response(request, Response(URL, status=200, request=request))
+    assert middleware.process_request(Request(URL)) is None
+    assert middleware.process_request(Request(URL)) is None
+
+    stats = middleware.crawler.stats
+    assert stats.get_value('throttle/circuit_opened') == 1
+    # The drained request, the one sent while open and the second half-open one
+    assert stats.get_value('throttle/circuit_rejected') == 3
+
+
+def test_failed_probe_reopens_circuit(tmp_path, clock):
+    middleware = make_middleware(tmp_path)
+    request = Request(URL)
+    for _ in range(2):
+        middleware.process_response(request, Response(URL, status=429, request=request))
+
+    clock.now += 60
+    assert middleware.process_request(request) is None
+    middleware.process_exception(request, ConnectionRefusedError())
+    with pytest.raises(IgnoreRequest):
+        middleware.process_request(Request(URL))
+    assert middleware.crawler.stats.get_value('throttle/circuit_opened') == 2
+
+
+def test_state_saved_on_close(tmp_path):
+    middleware = make_middleware(tmp_path)
+    request = Request(URL, meta={'download_latency': 0.4})
+    middleware.process_response(request, Response(URL, status=200, request=request))
+    middleware.spider_closed(middleware.crawler.spider)
+    assert HOST in ThrottleStateStore(str(tmp_path / 'throttle-state.json')).load()
@@ -13,7 +13,7 @@ DOWNLOAD_DELAY = 2
 
 # Configure item pipelines
 ITEM_PIPELINES = {
-   # "job_scraper.pipelines.JobScraperPipeline": 300,
+   # "job_scraper.pipelines.JsonLinesShardPipeline": 300,
 }
 
 # Set settings whose default value is deprecated to a future-proof value